@@ -0,0 +1,95 @@
+import time
+import unittest
+import numpy as np
+from barometer import FAST_MAX_ERROR, BaroProcessor, data_bar_batch
+from test_data_bar import data_bar
+
+
+class TestBaroProcessor(unittest.TestCase):
+  def test_window_matches_data_bar(self):
+    baro_data = [1000, 1002, 1001, 999, 1003]
+    temp_data = [20, 22, 21, 19, 23]
+    processor = BaroProcessor(window=3)
+    for pressure, temperature in zip(baro_data, temp_data):
+      result = processor.update(pressure, temperature)
+
+    expected = data_bar(baro_data[-3:], temp_data[-3:])
+    self.assertAlmostEqual(result["pressure"], expected["pressure"], places=9)
+    self.assertAlmostEqual(result["altitude"], expected["altitude"], places=6)
+
+  def test_partial_window(self):
+    processor = BaroProcessor(window=10)
+    processor.update(1000, 20)
+    result = processor.update(1002, 22)
+    expected = data_bar([1000, 1002], [20, 22])
+    self.assertAlmostEqual(result["altitude"], expected["altitude"], places=6)
+
+  def test_ema(self):
+    processor = BaroProcessor(alpha=0.5)
+    processor.update(1000, 20)
+    processor.update(1002, 22)
+    self.assertAlmostEqual(processor.pressure, 1001.0)
+    self.assertAlmostEqual(processor.temperature, 21.0)
+
+  def test_long_run_stays_accurate(self):
+    processor = BaroProcessor(window=7)
+    for i in range(10000):
+      result = processor.update(1000 + (i % 13) * 0.1, 20)
+    tail = [1000 + (i % 13) * 0.1 for i in range(10000 - 7, 10000)]
+    expected = data_bar(tail, [20] * 7)
+    self.assertAlmostEqual(result["pressure"], expected["pressure"], places=9)
+
+  def test_invalid_arguments(self):
+    with self.assertRaises(ValueError):
+      BaroProcessor()
+    with self.assertRaises(ValueError):
+      BaroProcessor(window=5, alpha=0.1)
+    with self.assertRaises(ValueError):
+      BaroProcessor(alpha=1.5)
+
+class TestDataBarBatch(unittest.TestCase):
+  def test_matches_data_bar_per_sample(self):
+    baro_data = [1000, 1002, 1001]
+    temp_data = [20, 22, 21]
+    result = data_bar_batch(baro_data, temp_data)
+    for i in range(3):
+      expected = data_bar([baro_data[i]], [temp_data[i]])
+      self.assertAlmostEqual(result["pressure"][i], expected["pressure"])
+      self.assertAlmostEqual(result["altitude"][i], expected["altitude"])
+
+  def test_fast_mode_error_bound(self):
+    pressure = np.linspace(300, 1100, 200001)
+    temperature = np.zeros_like(pressure)
+    for sea_level_pressure in (950.0, 1013.25, 1050.0):
+      exact = data_bar_batch(pressure, temperature, sea_level_pressure)
+      fast = data_bar_batch(pressure, temperature, sea_level_pressure, fast=True)
+      error = np.abs(fast["altitude"] - exact["altitude"]).max()
+      self.assertLess(error, FAST_MAX_ERROR)
+
+  def test_fast_mode_out_of_range(self):
+    result = data_bar_batch([100.0, 1013.25, 2000.0], [0, 0, 0], fast=True)
+    exact = data_bar_batch([100.0, 1013.25, 2000.0], [0, 0, 0])
+    np.testing.assert_allclose(result["altitude"], exact["altitude"], atol=FAST_MAX_ERROR)
+
+  def test_fast_mode_is_faster(self):
+    pressure = np.random.default_rng(0).uniform(300, 1100, 2000000)
+    temperature = np.full_like(pressure, 20.0)
+
+    def best(fast):
+      timings = []
+      for _ in range(5):
+        start = time.perf_counter()
+        data_bar_batch(pressure, temperature, fast=fast)
+        timings.append(time.perf_counter() - start)
+      return min(timings)
+
+    self.assertLess(best(True), best(False))
+
+  def test_sea_level_per_flight(self):
+    pressure = np.array([1000.0, 1000.0])
+    result = data_bar_batch(pressure, [0, 0], sea_level_pressure=np.array([1000.0, 1013.25]))
+    self.assertAlmostEqual(result["altitude"][0], 0.0)
+    self.assertGreater(result["altitude"][1], 100)
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,118 @@
+from gps_module import ROLLOVER_THRESHOLD, SECONDS_PER_DAY, UtcClock, parse_nmea
+
+# Поля объединённого решения (отсутствующие в эпохе остаются None)
+FIX_FIELDS = (
+    "latitude", "longitude", "altitude", "speed", "course",
+    "fix_quality", "satellites", "hdop", "timestamp",
+)
+
+
+class GpsFuser:
+    """
+    Инкрементальное объединение GGA и RMC одной эпохи UTC в единое решение.
+
+    Предложения группируются по времени суток UTC (дата есть только в RMC,
+    поэтому GGA до первого RMC может получить другие сутки); метка времени
+    решения берётся из RMC, если он есть. Как только эпоха содержит
+    все требуемые типы, решение выдаётся сразу. Незавершённые эпохи
+    выдаются по таймауту или при превышении max_pending, поэтому память
+    ограничена. Предложения без времени (VTG, GSA) дополняют последнюю
+    открытую эпоху.
+    """
+
+    def __init__(self, timeout=1.0, max_pending=8, required=("GGA", "RMC"), clock=None):
+        """
+        Args:
+            timeout: Через сколько секунд (по времени эпох) незавершённая
+                эпоха выдаётся как есть.
+            max_pending: Максимальное число одновременно открытых эпох.
+            required: Типы предложений, образующие полное решение.
+            clock: UtcClock для меток времени (по умолчанию - собственный).
+        """
+        if max_pending < 1:
+            raise ValueError("max_pending должен быть положительным")
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.required = frozenset(required)
+        self.clock = clock if clock is not None else UtcClock()
+        self.pending = {}  # метка эпохи -> (решение, набор типов); порядок вставки
+        self.errors = 0
+
+    def _new_fix(self):
+        fix = dict.fromkeys(FIX_FIELDS)
+        fix["complete"] = False
+        return fix
+
+    def _emit(self, key):
+        fix, sources = self.pending.pop(key)
+        fix["complete"] = self.required <= sources
+        return fix
+
+    def feed(self, sentence):
+        """
+        Добавляет одно предложение NMEA.
+
+        Returns:
+            Список решений, завершённых этим предложением (обычно 0 или 1),
+            в порядке следования эпох.
+        """
+        try:
+            parsed = parse_nmea(sentence, self.clock)
+        except (ValueError, IndexError):
+            self.errors += 1
+            return []
+
+        timestamp = parsed["timestamp"]
+        if timestamp is None:
+            if not self.pending:
+                return []
+            key = next(reversed(self.pending))
+        else:
+            key = round(timestamp % SECONDS_PER_DAY, 3)
+        if key not in self.pending:
+            self.pending[key] = (self._new_fix(), set())
+
+        fix, sources = self.pending[key]
+        for name in FIX_FIELDS:
+            value = parsed.get(name)
+            if value is not None and fix[name] is None:
+                fix[name] = value
+        if parsed["type"] == "RMC":
+            fix["timestamp"] = timestamp
+        sources.add(parsed["type"])
+
+        ready = []
+        for other in list(self.pending):
+            # Возраст эпохи с учётом перехода через полночь
+            age = (key - other) % SECONDS_PER_DAY
+            stale = timestamp is not None and self.timeout < age < ROLLOVER_THRESHOLD
+            # Эпохи старше завершённой выдаются раньше неё, чтобы порядок сохранялся
+            if other != key and (stale or len(self.pending) > self.max_pending
+                                 or self.required <= sources):
+                ready.append(self._emit(other))
+            elif other == key:
+                break
+        if self.required <= sources:
+            ready.append(self._emit(key))
+        return ready
+
+    def flush(self):
+        """Выдаёт все открытые эпохи (например, в конце файла)."""
+        return [self._emit(key) for key in list(self.pending)]
+
+
+def fuse(sentences, **kwargs):
+    """
+    Генератор объединённых решений из последовательности предложений.
+
+    Args:
+        sentences: Итерируемый набор строк NMEA (например, nmea_stream.iter_sentences).
+        **kwargs: Параметры GpsFuser.
+
+    Yields:
+        Словари с полями FIX_FIELDS и признаком complete.
+    """
+    fuser = GpsFuser(**kwargs)
+    for sentence in sentences:
+        yield from fuser.feed(sentence)
+    yield from fuser.flush()
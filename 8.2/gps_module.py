@@ -1,63 +1,291 @@
+import string
 import time
+from functools import lru_cache, reduce
+from operator import xor
+
+SECONDS_PER_DAY = 86400
+# Скачок времени суток назад больше чем на полсуток считается переходом через полночь
+ROLLOVER_THRESHOLD = SECONDS_PER_DAY / 2
+# Коэффициенты перевода скорости в м/с
+KNOTS_TO_MS = 0.514444
+KMH_TO_MS = 1 / 3.6
 
 def convert_to_decimal(degree_str, direction):
-    """Преобразует строку с градусами в десятичный формат.""" 
+    """Преобразует строку с градусами в десятичный формат."""
     # Преобразуем строку в float
     degree_value = float(degree_str)
     degrees = int(degree_value // 100)
-    minutes = degree_value % 100 
-    decimal = degrees + (minutes / 60.0) 
+    minutes = degree_value % 100
+    decimal = degrees + (minutes / 60.0)
     if direction in ['S', 'W']:
-        decimal *= -1 
+        decimal *= -1
     return decimal
 
+def days_from_civil(year, month, day):
+    """Число суток от 1970-01-01 до заданной даты (григорианский календарь).
+
+    Только целочисленная арифметика, поэтому функция одинаково работает
+    со скалярами и с массивами NumPy.
+    """
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + 12 * (month <= 2) - 3) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+def time_of_day(time_str):
+    """Преобразует время NMEA hhmmss.sss в секунды от начала суток UTC."""
+    hours = int(time_str[0:2])
+    minutes = int(time_str[2:4])
+    seconds = float(time_str[4:])
+    if len(time_str) < 6 or hours > 23 or minutes > 59 or not 0 <= seconds < 61:
+        raise ValueError(f"Некорректное время NMEA: {time_str}")
+    return hours * 3600 + minutes * 60 + seconds
+
+@lru_cache(maxsize=64)
+def date_epoch(date_str):
+    """Преобразует дату NMEA ddmmyy в метку UTC начала суток (секунды)."""
+    if len(date_str) != 6 or not date_str.isdigit():
+        raise ValueError(f"Некорректная дата NMEA: {date_str}")
+    day, month, year = int(date_str[0:2]), int(date_str[2:4]), int(date_str[4:6])
+    if not 1 <= month <= 12 or not 1 <= day <= 31:
+        raise ValueError(f"Некорректная дата NMEA: {date_str}")
+    # В NMEA год двузначный; GPS-даты раньше 1980 года невозможны
+    year += 1900 if year >= 80 else 2000
+    return days_from_civil(year, month, day) * SECONDS_PER_DAY
+
+class UtcClock:
+    """
+    Преобразование времени NMEA в метки UTC без strptime/mktime.
+
+    Хранит начало текущих суток UTC: дата из RMC задаёт его явно, а для
+    предложений без даты переход через полночь определяется по скачку
+    времени суток назад.
+    """
+
+    def __init__(self, day_epoch=None):
+        """
+        Args:
+            day_epoch: Начало суток UTC (секунды). По умолчанию - текущие сутки.
+        """
+        if day_epoch is None:
+            day_epoch = time.time() // SECONDS_PER_DAY * SECONDS_PER_DAY
+        self.day_epoch = day_epoch
+        self.last_time_of_day = None
+
+    def timestamp(self, time_str, date_str=None):
+        """
+        Args:
+            time_str: Время hhmmss.sss.
+            date_str: Дата ddmmyy (из RMC) или None.
+
+        Returns:
+            Метка времени UTC в секундах.
+        """
+        seconds = time_of_day(time_str)
+        if date_str:
+            self.day_epoch = date_epoch(date_str)
+        elif (self.last_time_of_day is not None
+              and seconds < self.last_time_of_day - ROLLOVER_THRESHOLD):
+            self.day_epoch += SECONDS_PER_DAY
+        self.last_time_of_day = seconds
+        return self.day_epoch + seconds
+
+# Реестр разборщиков: тип предложения (GGA, RMC, ...) -> функция(fields, clock)
+PARSERS = {}
+
+def register_parser(sentence_type):
+    """Декоратор регистрации разборщика для типа предложения NMEA.
+
+    Разборщик получает список полей (fields[0] - адрес, например "GNGGA")
+    и UtcClock, и возвращает словарь с данными предложения.
+    """
+    def decorator(parser):
+        PARSERS[sentence_type] = parser
+        return parser
+    return decorator
+
+def nmea_checksum(body):
+    """Контрольная сумма NMEA: XOR всех символов между '$' и '*'."""
+    return reduce(xor, body.encode("ascii", "replace"), 0)
+
+def split_sentence(sentence):
+    """Проверяет контрольную сумму и разбивает предложение на поля.
+
+    Контрольная сумма проверяется до разбора полей; предложения без
+    '*hh' принимаются (поле необязательно в старых версиях NMEA 0183).
+
+    Returns:
+        Список полей; fields[0] - адрес (идентификатор источника + тип).
+    """
+    if not sentence.startswith("$"):
+        raise ValueError("Предложение NMEA должно начинаться с '$'")
+    star = sentence.rfind("*")
+    if star == -1:
+        body = sentence[1:]
+    else:
+        body = sentence[1:star]
+        # Ровно две шестнадцатеричные цифры, как в nmea_batch._checksum_ok
+        checksum = sentence[star + 1:star + 3]
+        if len(checksum) != 2 or not all(c in string.hexdigits for c in checksum):
+            raise ValueError("Некорректная контрольная сумма NMEA")
+        if nmea_checksum(body) != int(checksum, 16):
+            raise ValueError("Неверная контрольная сумма NMEA")
+    return body.split(",")
+
+def _float(field):
+    """Число из поля или None для пустого поля."""
+    return float(field) if field else None
+
+def _int(field):
+    """Целое из поля или None для пустого поля."""
+    return int(field) if field else None
+
+def _fix(latitude=None, longitude=None, altitude=None, speed=None, timestamp=None, **extra):
+    """Словарь результата: поля data_gps всегда присутствуют, остальные - по типу."""
+    result = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "altitude": altitude,
+        "speed": speed,
+        "timestamp": timestamp
+        }
+    result.update(extra)
+    return result
+
+@register_parser("GGA")
+def parse_gga(fields, clock):
+    """GGA: время, координаты, качество решения и высота."""
+    return _fix(
+        latitude=convert_to_decimal(fields[2], fields[3]),
+        longitude=convert_to_decimal(fields[4], fields[5]),
+        altitude=float(fields[9]),
+        speed=None, # Скорость не доступна в GGA
+        # В GGA нет даты: используются сутки, известные часам
+        timestamp=clock.timestamp(fields[1]),
+        fix_quality=_int(fields[6]),
+        satellites=_int(fields[7]),
+        hdop=_float(fields[8]),
+        )
+
+@register_parser("RMC")
+def parse_rmc(fields, clock):
+    """RMC: время, дата, координаты, скорость и курс."""
+    return _fix(
+        latitude=convert_to_decimal(fields[3], fields[4]),
+        longitude=convert_to_decimal(fields[5], fields[6]),
+        altitude=None, # Высота недоступна в RMC
+        speed=float(fields[7]) * KNOTS_TO_MS, # Преобразуем узлы в м/с
+        # Дата ddmmyy из RMC
+        timestamp=clock.timestamp(fields[1], fields[9]),
+        status=fields[2],
+        course=_float(fields[8]),
+        )
+
+@register_parser("VTG")
+def parse_vtg(fields, clock):
+    """VTG: курс и скорость относительно земли."""
+    speed_kmh = _float(fields[7])
+    speed_knots = _float(fields[5])
+    if speed_kmh is not None:
+        speed = speed_kmh * KMH_TO_MS
+    elif speed_knots is not None:
+        speed = speed_knots * KNOTS_TO_MS
+    else:
+        speed = None
+    return _fix(speed=speed, course=_float(fields[1]), course_magnetic=_float(fields[3]))
+
+@register_parser("GSA")
+def parse_gsa(fields, clock):
+    """GSA: тип решения, используемые спутники и факторы точности."""
+    return _fix(
+        mode=fields[1],
+        fix_type=_int(fields[2]),
+        satellite_ids=[int(prn) for prn in fields[3:15] if prn],
+        pdop=_float(fields[15]),
+        hdop=_float(fields[16]),
+        vdop=_float(fields[17]),
+        )
+
+@register_parser("GSV")
+def parse_gsv(fields, clock):
+    """
+    GSV: видимые спутники (по 4 спутника в предложении).
+
+    Сведения о спутниках возвращаются в satellites_info: поле satellites
+    занято числом спутников решения из GGA.
+    """
+    satellites = []
+    for i in range(4, len(fields) - 3, 4):
+        if fields[i]:
+            satellites.append({
+                "prn": int(fields[i]),
+                "elevation": _int(fields[i + 1]),
+                "azimuth": _int(fields[i + 2]),
+                "snr": _int(fields[i + 3]),
+                })
+    return _fix(
+        message_count=int(fields[1]),
+        message_number=int(fields[2]),
+        satellites_in_view=int(fields[3]),
+        satellites_info=satellites,
+        )
+
+def parse_nmea(sentence, clock=None):
+    """Разбор предложения NMEA любого зарегистрированного типа.
+
+    Контрольная сумма проверяется до разбора полей. Идентификатор источника
+    (GP, GN, GL, GA, ...) не учитывается при выборе разборщика.
+
+    Args:
+        sentence: Строка NMEA.
+        clock: UtcClock для меток времени. По умолчанию создаются новые часы:
+            состояние суток не переносится между вызовами, поэтому поток
+            предложений должен передавать собственный UtcClock.
+
+    Returns:
+        Словарь с полями data_gps, а также type, talker и полями типа.
+    """
+    if clock is None:
+        clock = UtcClock()
+    fields = split_sentence(sentence)
+    address = fields[0]
+    parser = PARSERS.get(address[2:])
+    if parser is None:
+        raise ValueError("Неизвестный формат NMEA")
+    result = parser(fields, clock)
+    result["type"] = address[2:]
+    result["talker"] = address[:2]
+    return result
+
+def parse_gps(gps_data, clock=None):
+    """Разбор одной строки NMEA без перехвата ошибок.
+
+    В отличие от data_gps, при некорректных данных выбрасывает исключение
+    (ValueError, IndexError), а не печатает его. Используется там, где
+    строк много и ошибки нужно пропускать молча (см. nmea_stream).
+
+    Args:
+        gps_data: Строка данных в формате NMEA.
+        clock: UtcClock для меток времени; по умолчанию - новые часы (см. parse_nmea).
+    """
+    return parse_nmea(gps_data, clock)
+
 def data_gps(gps_data):
+    """Обработка данных с GPS.
+
+    Args:
+        gps_data: Строка данных в формате NMEA любого зарегистрированного
+            типа (GGA, RMC, VTG, GSA, GSV) от любого источника (GP, GN, ...).
+
+    Returns:
+        Словарь с обработанными данными (latitude, longitude, altitude,
+        speed, timestamp и поля конкретного типа) или None при ошибке.
+    """
     try:
-# Разделение строки NMEA по запятым 
-        data_parts = gps_data.split(",")
-
-# Проверка на формат GGA
-        if data_parts[0] == "$GPGGA":
-            timestamp_str = data_parts[1] # Время фиксируется 
-            latitude = convert_to_decimal(data_parts[2], data_parts[3])
-            longitude = convert_to_decimal(data_parts[4], data_parts[5]) 
-            altitude = float(data_parts[9])
-            speed = None # Скорость не доступна в GGA
-            
-            # Форматирование даты для mktime 
-            current_time = time.localtime()
-            year, month, day = current_time.tm_year, current_time.tm_mon, current_time.tm_mday 
-            timestamp = time.strptime(f"{timestamp_str},{year},{month},{day}","%H%M%S.%f,%Y,%m,%d")
-            timestamp_seconds = time.mktime(timestamp)
-        elif data_parts[0] == "$GPRMC": 
-            timestamp_str = data_parts[1]
-            latitude = convert_to_decimal(data_parts[3], data_parts[4]) 
-            longitude = convert_to_decimal(data_parts[5], data_parts[6])
-            speed = float(data_parts[7]) * 0.514444 # Преобразуем узлы в м/с
-            altitude = None # Высота недоступна в RMC
-
-            # Форматирование даты для mktime
-            current_time = time.localtime()
-            year, month, day = current_time.tm_year, current_time.tm_mon, current_time.tm_mday
-            timestamp = time.strptime(f"{timestamp_str},{year},{month},{day}",
-            "%H%M%S.%f,%Y,%m,%d")
-            timestamp_seconds = time.mktime(timestamp)
-
-        else:
-            raise ValueError("Неизвестный формат NMEA")
-
-            # Возвращение обработанных данных
-        return {
-            "latitude": latitude,
-              "longitude": longitude, 
-              "altitude": altitude,
-                "speed": speed,
-            "timestamp": timestamp_seconds
-            }
+        return parse_gps(gps_data)
 
     except Exception as e:
         print("Ошибка при обработке данных GPS:", e)
         return None
-        
-        
-        
\ No newline at end of file
@@ -2,7 +2,7 @@ import unittest
 from gps_module import data_gps
 class TestGPSIntegration(unittest.TestCase):
      def test_gga_data_integration(self):
-        gps_data_gga = "$GPGGA,123519.487,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*47"
+        gps_data_gga = "$GPGGA,123519.487,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*4F"
         expected_output = {
         "latitude": 37.90978333333333,
         "longitude": -145.11726666666667,
@@ -0,0 +1,110 @@
+import argparse
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from gps_module import UtcClock
+from nmea_batch import GPS_DTYPE, decode_fields, utc_timestamps
+
+# Размер фрагмента архива, передаваемого одному процессу (байт)
+CHUNK_SIZE = 32 * 1024 * 1024
+
+
+def split_chunks(path, chunk_size=CHUNK_SIZE):
+    """
+    Разбиение файла на фрагменты по границам строк.
+
+    Args:
+        path: Путь к архиву NMEA.
+        chunk_size: Желаемый размер фрагмента в байтах.
+
+    Returns:
+        Список пар (start, end) смещений; каждый фрагмент заканчивается
+        переводом строки (кроме последнего).
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        chunks = []
+        start = 0
+        while start < size:
+            end = data.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if end == -1 else end + 1
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def decode_chunk(path, start, end):
+    """
+    Декодирование фрагмента [start, end) архива в отдельном процессе.
+
+    Файл отображается в память заново в каждом процессе, поэтому между
+    процессами передаются только смещения и результат.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return decode_fields(data[start:end])
+
+
+def decode_archive(path, workers=None, chunk_size=CHUNK_SIZE, day_epoch=None):
+    """
+    Параллельное декодирование архива NMEA в столбцы.
+
+    Args:
+        path: Путь к архиву NMEA.
+        workers: Число процессов (по умолчанию - число ядер).
+        chunk_size: Размер фрагмента в байтах.
+        day_epoch: Начало суток UTC для строк до первого RMC с датой.
+
+    Returns:
+        Кортеж (data, valid), как у nmea_batch.decode_batch, с записями
+        в порядке следования в архиве.
+    """
+    chunks = split_chunks(path, chunk_size)
+    if not chunks:
+        return np.zeros(0, dtype=GPS_DTYPE), np.zeros(0, dtype=bool)
+
+    if len(chunks) == 1 or workers == 1:
+        parts = [decode_chunk(path, start, end) for start, end in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(decode_chunk, [path] * len(chunks),
+                                  *zip(*chunks)))
+
+    # Метки времени рассчитываются после объединения: переход через
+    # полночь и дата RMC переносятся через границы фрагментов
+    data, valid, dates = (np.concatenate(column) for column in zip(*parts))
+    if day_epoch is None:
+        day_epoch = UtcClock().day_epoch
+    data["timestamp"] = utc_timestamps(data["timestamp"], dates, day_epoch)
+    return data, valid
+
+
+def save_columns(output, data, valid):
+    """Сохраняет результат в .npz: по массиву на каждое поле и маску valid."""
+    columns = {name: data[name] for name in data.dtype.names}
+    np.savez(output, valid=valid, **columns)
+
+
+def main(argv=None):
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Параллельное декодирование архива NMEA в столбцы .npz")
+    parser.add_argument("archive", help="Файл с предложениями NMEA")
+    parser.add_argument("-o", "--output", required=True, help="Выходной файл .npz")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Число процессов (по умолчанию - число ядер)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="Размер фрагмента в байтах")
+    args = parser.parse_args(argv)
+
+    data, valid = decode_archive(args.archive, args.workers, args.chunk_size)
+    save_columns(args.output, data, valid)
+    print(f"Записей: {len(data)}, корректных: {int(valid.sum())}")
+
+
+if __name__ == "__main__":
+    main()
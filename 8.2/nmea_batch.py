@@ -0,0 +1,307 @@
+import numpy as np
+
+from gps_module import ROLLOVER_THRESHOLD, SECONDS_PER_DAY, UtcClock, days_from_civil
+
+# Коэффициент перевода узлов в м/с (как в gps_module.data_gps)
+KNOTS_TO_MS = 0.514444
+
+# Максимальная ширина числового поля NMEA (символов)
+FIELD_WIDTH = 16
+
+# Количество строк, обрабатываемых за один проход (ограничивает память)
+BLOCK_LINES = 1 << 18
+
+# Структура записи пакетного декодера
+GPS_DTYPE = np.dtype([
+    ("kind", "S3"),        # Тип предложения: b"GGA", b"RMC" или b""
+    ("latitude", "f8"),    # Широта (градусы)
+    ("longitude", "f8"),   # Долгота (градусы)
+    ("altitude", "f8"),    # Высота (метры), NaN для RMC
+    ("speed", "f8"),       # Скорость (м/с), NaN для GGA
+    ("timestamp", "f8"),   # Время (секунды)
+])
+
+_FLOAT_FIELDS = ("latitude", "longitude", "altitude", "speed", "timestamp")
+
+_NEWLINE = ord("\n")
+_CR = ord("\r")
+_COMMA = ord(",")
+_POINT = ord(".")
+_MINUS = ord("-")
+_ZERO = ord("0")
+_NINE = ord("9")
+
+# Значения шестнадцатеричных цифр по коду символа (-1 - не цифра)
+_HEX_DIGITS = np.full(256, -1, dtype=np.int16)
+for _digit, _char in enumerate(b"0123456789ABCDEF"):
+    _HEX_DIGITS[_char] = _digit
+    _HEX_DIGITS[ord(chr(_char).lower())] = _digit
+
+
+def _as_bytes(buffer):
+    """Приводит буфер (bytes, str, список строк) к непрерывному массиву байтов."""
+    if isinstance(buffer, (list, tuple)):
+        buffer = "\n".join(buffer)
+    if isinstance(buffer, str):
+        buffer = buffer.encode("ascii", "replace")
+    return np.frombuffer(buffer, dtype=np.uint8)
+
+
+def _index_lines(chars):
+    """Границы непустых строк буфера (конец строки - без CR/LF)."""
+    newlines = np.flatnonzero(chars == _NEWLINE)
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(chars)]))
+    has_cr = (ends > starts) & (chars[np.maximum(ends - 1, 0)] == _CR)
+    ends = ends - has_cr
+    keep = ends > starts
+    return starts[keep], ends[keep]
+
+
+def _field_bounds(commas, first, count, index):
+    """
+    Начало и конец поля с номером index (1 - первое поле после заголовка).
+
+    Поле считается присутствующим, только если за ним следует запятая,
+    поэтому для последнего поля строки (с контрольной суммой) не годится.
+    """
+    present = count > index
+    last = max(len(commas) - 1, 0)
+    start = commas[np.minimum(first + index - 1, last)] + 1
+    end = commas[np.minimum(first + index, last)]
+    return np.where(present, start, 0), np.where(present, end, 0), present
+
+
+def _gather(chars, start, width):
+    """Матрица символов (строки x FIELD_WIDTH) начиная с позиции start."""
+    # Буфер дополнен FIELD_WIDTH нулями (см. decode_batch), поэтому окно
+    # из любой позиции строки не выходит за его пределы
+    windows = np.lib.stride_tricks.sliding_window_view(chars, FIELD_WIDTH)
+    return windows[start], np.arange(FIELD_WIDTH) < width[:, None]
+
+
+def _parse_number(chars, start, end, present):
+    """
+    Векторный разбор десятичных чисел из полей [start, end).
+
+    Поля копируются в матрицу фиксированной ширины и преобразуются в float
+    одним вызовом astype; некорректные поля отсекаются маской заранее.
+
+    Returns:
+        Кортеж (values, ok): значения (NaN там, где разбор невозможен)
+        и маска корректно разобранных полей.
+    """
+    width = end - start
+    ok = present & (width > 0) & (width <= FIELD_WIDTH)
+    window, in_field = _gather(chars, start, width)
+    window = np.where(in_field, window, 0)
+
+    digits = (window >= _ZERO) & (window <= _NINE)
+    points = window == _POINT
+    allowed = digits | points | ~in_field
+    allowed[:, 0] |= window[:, 0] == _MINUS
+    ok &= allowed.all(axis=1) & digits.any(axis=1) & (points.sum(axis=1) <= 1)
+
+    window[~ok] = 0
+    window[~ok, 0] = _ZERO
+    values = window.view(f"S{FIELD_WIDTH}")[:, 0].astype(np.float64)
+    return np.where(ok, values, np.nan), ok
+
+
+def _parse_coordinate(chars, commas, first, count, index):
+    """Векторное преобразование пары полей ddmm.mmmm,H в десятичные градусы."""
+    value, ok = _parse_number(chars, *_field_bounds(commas, first, count, index))
+    degrees = np.floor(value / 100)
+    decimal = degrees + (value - degrees * 100) / 60.0
+
+    start, end, present = _field_bounds(commas, first, count, index + 1)
+    hemisphere = np.where(present & (end - start == 1), chars[start], 0)
+    negative = (hemisphere == ord("S")) | (hemisphere == ord("W"))
+    ok &= np.isin(hemisphere, [ord("N"), ord("S"), ord("E"), ord("W")])
+    return np.where(negative, -decimal, decimal), ok
+
+
+def _parse_time_of_day(chars, commas, first, count):
+    """Векторный разбор поля hhmmss.sss в секунды от начала суток."""
+    value, ok = _parse_number(chars, *_field_bounds(commas, first, count, 1))
+    hours = np.floor(value / 10000)
+    minutes = np.floor(value / 100) - hours * 100
+    seconds = value - hours * 10000 - minutes * 100
+    ok &= (hours < 24) & (minutes < 60) & (seconds < 61)
+    return hours * 3600 + minutes * 60 + seconds, ok
+
+
+def _parse_date(chars, commas, first, count):
+    """Векторный разбор даты ddmmyy из RMC в начало суток UTC (NaN, если даты нет)."""
+    start, end, present = _field_bounds(commas, first, count, 9)
+    value, ok = _parse_number(chars, start, end, present & (end - start == 6))
+    value = np.where(ok, value, 0).astype(np.int64)
+    day, month, year = value // 10000, value // 100 % 100, value % 100
+    ok &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    year = year + np.where(year >= 80, 1900, 2000)
+    epoch = days_from_civil(year, month, day) * SECONDS_PER_DAY
+    return np.where(ok, epoch, np.nan)
+
+
+def utc_timestamps(time_of_day, day_epochs, day_epoch):
+    """
+    Векторный расчёт меток UTC по времени суток с учётом даты и полуночи.
+
+    Та же логика, что и в gps_module.UtcClock: дата RMC задаёт сутки явно,
+    а в строках без даты переход через полночь определяется по скачку
+    времени назад больше чем на полсуток.
+
+    Args:
+        time_of_day: Секунды от начала суток для каждой строки (NaN - пропуск).
+        day_epochs: Начало суток из даты RMC (NaN, если даты нет).
+        day_epoch: Начало суток UTC до первой строки с датой.
+
+    Returns:
+        Метки времени UTC (NaN там, где time_of_day - NaN).
+    """
+    known = ~np.isnan(time_of_day)
+    tod = time_of_day[known]
+    rollovers = np.concatenate(([0], np.cumsum(np.diff(tod) < -ROLLOVER_THRESHOLD)))
+    # Смещение суток фиксируется в строках с датой и переносится вперёд
+    dates = day_epochs[known]
+    anchors = ~np.isnan(dates)
+    offsets = np.where(anchors, dates - rollovers * SECONDS_PER_DAY, day_epoch)
+    last_anchor = np.maximum.accumulate(np.where(anchors, np.arange(len(tod)), -1))
+    offsets = np.where(last_anchor >= 0, offsets[np.maximum(last_anchor, 0)], day_epoch)
+
+    timestamps = np.full(len(time_of_day), np.nan)
+    timestamps[known] = offsets + rollovers * SECONDS_PER_DAY + tod
+    return timestamps
+
+
+def _sentence_type(chars, starts, ends, sentence_type):
+    """Маска строк вида $ttXXX с типом sentence_type (b"GGA") и любым источником."""
+    columns = np.arange(3, 6)
+    index = np.minimum(starts[:, None] + columns, len(chars) - 1)
+    header = np.frombuffer(sentence_type, dtype=np.uint8)
+    return ((ends - starts > 6) & (chars[starts] == ord("$"))
+            & (chars[index] == header).all(axis=1))
+
+
+def _checksum_ok(chars, starts, ends):
+    """
+    Векторная проверка контрольной суммы *hh для каждой строки.
+
+    XOR символов между '$' и '*' получается из префиксного XOR всего буфера
+    двумя обращениями на строку. Строки без '*' считаются корректными
+    (как в gps_module.split_sentence).
+    """
+    prefix = np.bitwise_xor.accumulate(chars)
+    stars = np.flatnonzero(chars == ord("*"))
+    last = np.searchsorted(stars, ends) - 1
+    star = stars[np.maximum(last, 0)] if len(stars) else np.zeros_like(starts)
+    has_star = (last >= 0) & (star > starts)
+    star = np.where(has_star, star, starts + 1)
+
+    body = prefix[star - 1] ^ prefix[starts]
+    high = _HEX_DIGITS[chars[np.minimum(star + 1, len(chars) - 1)]]
+    low = _HEX_DIGITS[chars[np.minimum(star + 2, len(chars) - 1)]]
+    matches = (star + 2 < ends) & (high >= 0) & (low >= 0) & (body == high * 16 + low)
+    return ~has_star | matches
+
+
+def _decode_block(chars, commas, starts, ends, checksum_ok):
+    """
+    Декодирование одного блока строк.
+
+    В поле timestamp записывается время суток; метки UTC рассчитываются
+    после объединения блоков, чтобы переход через полночь не терялся
+    на их границах.
+    """
+    data = np.zeros(len(starts), dtype=GPS_DTYPE)
+    for name in _FLOAT_FIELDS:
+        data[name] = np.nan
+    valid = np.zeros(len(starts), dtype=bool)
+    dates = np.full(len(starts), np.nan)
+    if not len(commas):
+        # Без запятых нет ни одного поля: все строки некорректны
+        return data, valid, dates
+
+    first = np.searchsorted(commas, starts)
+    count = np.searchsorted(commas, ends) - first
+
+    # Номера полей координат в GGA и RMC отличаются на единицу,
+    # поэтому каждый тип разбирается только на своих строках
+    for kind, lat_field, value_field in ((b"GGA", 2, 9), (b"RMC", 3, 7)):
+        rows = np.flatnonzero(_sentence_type(chars, starts, ends, kind) & checksum_ok)
+        if not len(rows):
+            continue
+        data["kind"][rows] = kind
+        row_first, row_count = first[rows], count[rows]
+
+        tod, ok = _parse_time_of_day(chars, commas, row_first, row_count)
+        latitude, lat_ok = _parse_coordinate(chars, commas, row_first, row_count, lat_field)
+        longitude, lon_ok = _parse_coordinate(chars, commas, row_first, row_count, lat_field + 2)
+        value, value_ok = _parse_number(
+            chars, *_field_bounds(commas, row_first, row_count, value_field))
+        ok &= lat_ok & lon_ok & value_ok
+
+        good = rows[ok]
+        valid[good] = True
+        data["timestamp"][good] = tod[ok]
+        data["latitude"][good] = latitude[ok]
+        data["longitude"][good] = longitude[ok]
+        if kind == b"GGA":
+            data["altitude"][good] = value[ok]
+        else:
+            data["speed"][good] = value[ok] * KNOTS_TO_MS
+            dates[good] = _parse_date(chars, commas, row_first, row_count)[ok]
+    return data, valid, dates
+
+
+def decode_fields(buffer):
+    """
+    Декодирование буфера без расчёта меток времени.
+
+    Returns:
+        Кортеж (data, valid, dates): как в decode_batch, но в поле timestamp
+        записано время суток, а dates содержит начало суток из RMC.
+    """
+    chars = _as_bytes(buffer)
+    if not len(chars):
+        return np.zeros(0, dtype=GPS_DTYPE), np.zeros(0, dtype=bool), np.zeros(0)
+
+    starts, ends = _index_lines(chars)
+    chars = np.concatenate((chars, np.zeros(FIELD_WIDTH, dtype=np.uint8)))
+    commas = np.flatnonzero(chars == _COMMA)
+    checksum_ok = _checksum_ok(chars, starts, ends)
+
+    blocks = [
+        _decode_block(chars, commas, starts[i:i + BLOCK_LINES], ends[i:i + BLOCK_LINES],
+                      checksum_ok[i:i + BLOCK_LINES])
+        for i in range(0, len(starts), BLOCK_LINES)
+    ]
+    if not blocks:
+        return np.zeros(0, dtype=GPS_DTYPE), np.zeros(0, dtype=bool), np.zeros(0)
+    return tuple(np.concatenate(parts) for parts in zip(*blocks))
+
+
+def decode_batch(buffer, day_epoch=None):
+    """
+    Пакетное декодирование предложений GGA и RMC от любого источника
+    ($GP, $GN, $GL, $GA, ...). Строки с неверной контрольной суммой
+    помечаются как некорректные без разбора полей.
+
+    Args:
+        buffer: Байты или строка с предложениями NMEA, разделёнными
+            переводом строки, либо список строк.
+        day_epoch: Начало суток UTC для строк до первого RMC с датой;
+            по умолчанию - текущие сутки.
+
+    Returns:
+        Кортеж (data, valid):
+            • data: структурированный массив GPS_DTYPE, одна запись на каждую
+              непустую строку буфера в исходном порядке;
+            • valid: булева маска корректно разобранных записей.
+        Некорректные записи заполнены NaN и не печатаются.
+    """
+    data, valid, dates = decode_fields(buffer)
+    if day_epoch is None:
+        day_epoch = UtcClock().day_epoch
+    data["timestamp"] = utc_timestamps(data["timestamp"], dates, day_epoch)
+    return data, valid
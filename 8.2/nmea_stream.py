@@ -0,0 +1,81 @@
+import os
+
+from gps_module import UtcClock, parse_gps
+
+# Размер блока, читаемого из потока за один вызов (байт)
+CHUNK_SIZE = 64 * 1024
+
+
+def _make_reader(stream):
+    """Возвращает функцию read(n) для файла, сокета или дескриптора pty."""
+    if isinstance(stream, int):
+        return lambda size: os.read(stream, size)
+    if hasattr(stream, "recv"):
+        return stream.recv
+    # read1 возвращает уже доступные данные и не ждёт заполнения всего блока,
+    # что важно для pty и последовательных портов с частотой 10 Гц
+    if hasattr(stream, "read1"):
+        return stream.read1
+    return stream.read
+
+
+def iter_sentences(stream, chunk_size=CHUNK_SIZE):
+    """
+    Инкрементальное разбиение байтового потока на предложения NMEA.
+
+    Args:
+        stream: Файл, открытый в режиме 'rb', сокет или дескриптор pty
+            (в блокирующем режиме).
+        chunk_size: Размер блока чтения в байтах.
+
+    Yields:
+        Предложения NMEA (str) от символа '$' до конца строки без CR/LF.
+        Неполная строка в конце блока сохраняется до следующего чтения.
+    """
+    read = _make_reader(stream)
+    buffer = bytearray()
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:  # конец файла или закрытое соединение
+            break
+        buffer += chunk
+
+        start = 0
+        end = buffer.find(b"\n", start)
+        while end != -1:
+            dollar = buffer.find(b"$", start, end)
+            if dollar != -1:
+                stop = end - 1 if buffer[end - 1] == 0x0D else end
+                yield buffer[dollar:stop].decode("ascii", "replace")
+            start = end + 1
+            end = buffer.find(b"\n", start)
+        # Хвост буфера сдвигается один раз на блок, а не на каждую строку
+        del buffer[:start]
+
+    # Последняя строка без завершающего перевода строки
+    dollar = buffer.find(b"$")
+    if dollar != -1:
+        yield buffer[dollar:].rstrip(b"\r").decode("ascii", "replace")
+
+
+def iter_gps(stream, chunk_size=CHUNK_SIZE, clock=None):
+    """
+    Потоковая обработка данных GPS из файла, pty или сокета.
+
+    Args:
+        stream: Источник байтов NMEA (см. iter_sentences).
+        chunk_size: Размер блока чтения в байтах.
+        clock: UtcClock для меток времени; по умолчанию - собственные часы
+            потока, чтобы переход через полночь не зависел от других потоков.
+
+    Yields:
+        Словари в формате data_gps. Некорректные и неизвестные
+        предложения пропускаются без вывода сообщений.
+    """
+    if clock is None:
+        clock = UtcClock()
+    for sentence in iter_sentences(stream, chunk_size):
+        try:
+            yield parse_gps(sentence, clock)
+        except (ValueError, IndexError):
+            continue
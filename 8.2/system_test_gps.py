@@ -2,7 +2,7 @@ import unittest
 from gps_module import data_gps
 class TestGPSSystem(unittest.TestCase):
      def test_valid_gga_data(self):
-        gps_data_gga = "$GPGGA,123456.78,4916.45,N,12311.12,W,1,12,0.5,30.0,M,0.0,M,,*47"
+        gps_data_gga = "$GPGGA,123456.78,4916.45,N,12311.12,W,1,12,0.5,30.0,M,0.0,M,,*7B"
         expected_output = {
         "latitude": 49 + (16.45 / 60), # 49.27425
         "longitude": -(123 + (11.12 / 60)), # -123.18533333333334
@@ -1,8 +1,10 @@
+import calendar
 import unittest
-from gps_module import data_gps
+import gps_module
+from gps_module import PARSERS, UtcClock, data_gps, parse_gps, parse_nmea, register_parser
 class TestGPSFunctions(unittest.TestCase):
      def test_gga_data(self):
-        gps_data_gga ="$GPGGA,123519.487,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*47"
+        gps_data_gga ="$GPGGA,123519.487,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*4F"
         expected_output = {
         "latitude": 37.90978333333333,
         "longitude": -145.11726666666667,
@@ -37,6 +39,83 @@ class TestGPSFunctions(unittest.TestCase):
         self.assertIsNone(output["altitude"])
         self.assertEqual(output["speed"], expected_output["speed"])
 
+class TestUtcClock(unittest.TestCase):
+    def test_rmc_date(self):
+        clock = UtcClock(day_epoch=0)
+        output = parse_gps("$GPRMC,123519.487,A,3754.587,N,14507.036,W,000.0,360.0,120419,,,D", clock)
+        expected = calendar.timegm((2019, 4, 12, 12, 35, 19)) + 0.487
+        self.assertAlmostEqual(output["timestamp"], expected, places=3)
+
+    def test_gga_uses_last_rmc_date(self):
+        clock = UtcClock(day_epoch=0)
+        parse_gps("$GPRMC,123519.000,A,3754.587,N,14507.036,W,000.0,360.0,120419,,,D", clock)
+        output = parse_gps("$GPGGA,123520.000,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*4E", clock)
+        self.assertEqual(output["timestamp"], calendar.timegm((2019, 4, 12, 12, 35, 20)))
+
+    def test_midnight_rollover(self):
+        clock = UtcClock(day_epoch=calendar.timegm((2024, 2, 28, 0, 0, 0)))
+        before = clock.timestamp("235959.500")
+        after = clock.timestamp("000000.500")
+        self.assertAlmostEqual(after - before, 1.0)
+        self.assertEqual(after, calendar.timegm((2024, 2, 29, 0, 0, 0)) + 0.5)
+
+    def test_invalid_time(self):
+        with self.assertRaises(ValueError):
+            UtcClock().timestamp("256000.000")
+
+class TestNmeaRegistry(unittest.TestCase):
+    def test_bad_checksum_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_nmea("$GPGGA,123519.487,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*47")
+
+    def test_checksum_needs_two_digits(self):
+        body = "$GPGGA,123519.487,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,E,"
+        self.assertEqual(parse_nmea(body + "*0A")["altitude"], 545.4)
+        with self.assertRaises(ValueError):
+            parse_nmea(body + "*A")
+        with self.assertRaises(ValueError):
+            parse_nmea(body + "*+A")
+
+    def test_any_talker(self):
+        output = data_gps("$GNGGA,123519.487,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*51")
+        self.assertAlmostEqual(output["latitude"], 37.90978333333333, places=7)
+        self.assertEqual(output["talker"], "GN")
+        self.assertEqual(output["type"], "GGA")
+        self.assertEqual(output["fix_quality"], 1)
+        self.assertEqual(output["satellites"], 8)
+
+    def test_vtg(self):
+        output = parse_nmea("$GNVTG,054.7,T,034.4,M,005.5,N,010.2,K,A*3B")
+        self.assertAlmostEqual(output["speed"], 10.2 / 3.6)
+        self.assertEqual(output["course"], 54.7)
+        self.assertIsNone(output["latitude"])
+
+    def test_gsa(self):
+        output = parse_nmea("$GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1*39")
+        self.assertEqual(output["fix_type"], 3)
+        self.assertEqual(output["satellite_ids"], [4, 5, 9, 12, 24])
+        self.assertEqual((output["pdop"], output["hdop"], output["vdop"]), (2.5, 1.3, 2.1))
+
+    def test_gsv(self):
+        output = parse_nmea("$GPGSV,2,1,08,01,40,083,46,02,17,308,41,12,07,344,39,14,22,228,45*75")
+        self.assertEqual(output["satellites_in_view"], 8)
+        self.assertEqual(len(output["satellites_info"]), 4)
+        self.assertEqual(output["satellites_info"][0],
+                         {"prn": 1, "elevation": 40, "azimuth": 83, "snr": 46})
+        self.assertNotIn("satellites", output)
+
+    def test_register_parser(self):
+        self.assertIsNone(data_gps("$GPXTE,A,A,0.67,L,N*6F"))
+
+        @register_parser("XTE")
+        def parse_xte(fields, clock):
+            return gps_module._fix(cross_track_error=float(fields[3]))
+
+        try:
+            self.assertEqual(parse_nmea("$GPXTE,A,A,0.67,L,N*6F")["cross_track_error"], 0.67)
+        finally:
+            del PARSERS["XTE"]
+
 if __name__	== "__main__":
     unittest.main()
             
@@ -0,0 +1,66 @@
+import unittest
+from gps_fusion import GpsFuser, fuse
+
+GGA_19 = "$GPGGA,123519.000,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*44"
+RMC_19 = "$GPRMC,123519.000,A,3754.587,N,14507.036,W,010.0,084.4,120419,,,A*7A"
+GGA_20 = "$GPGGA,123520.000,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*4E"
+RMC_21 = "$GPRMC,123521.000,A,3754.587,N,14507.036,W,010.0,084.4,120419,,,A*71"
+GGA_22 = "$GPGGA,123522.000,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*4C"
+RMC_22 = "$GPRMC,123522.000,A,3754.587,N,14507.036,W,010.0,084.4,120419,,,A*72"
+GGA_19_NO_SATS = "$GPGGA,123519.000,3754.587,N,14507.036,W,1,,0.9,545.4,M,46.9,M,,*4C"
+GSV = "$GPGSV,2,1,08,01,40,083,46,02,17,308,41,12,07,344,39,14,22,228,45*75"
+
+
+class TestGpsFusion(unittest.TestCase):
+    def test_complete_epoch_emitted_immediately(self):
+        fuser = GpsFuser()
+        self.assertEqual(fuser.feed(RMC_19), [])
+        fixes = fuser.feed(GGA_19)
+        self.assertEqual(len(fixes), 1)
+        fix = fixes[0]
+        self.assertTrue(fix["complete"])
+        self.assertAlmostEqual(fix["latitude"], 37.90978333333333, places=7)
+        self.assertEqual(fix["altitude"], 545.4)
+        self.assertAlmostEqual(fix["speed"], 10.0 * 0.514444)
+        self.assertEqual(fix["course"], 84.4)
+        self.assertEqual(fix["fix_quality"], 1)
+        self.assertEqual(fuser.pending, {})
+
+    def test_gsv_does_not_fill_satellite_count(self):
+        # Число спутников берётся только из GGA, а не из списка спутников GSV
+        fuser = GpsFuser()
+        fuser.feed(GGA_19_NO_SATS)
+        fuser.feed(GSV)
+        fix = fuser.feed(RMC_19)[0]
+        self.assertIsNone(fix["satellites"])
+
+        fuser.feed(GGA_19)
+        fuser.feed(GSV)
+        fix = fuser.feed(RMC_19)[0]
+        self.assertEqual(fix["satellites"], 8)
+
+    def test_missing_sentence_times_out(self):
+        fuser = GpsFuser(timeout=1.0)
+        self.assertEqual(fuser.feed(GGA_20), [])
+        self.assertEqual(fuser.feed(RMC_21), [])
+        fixes = fuser.feed(RMC_22)
+        self.assertEqual(len(fixes), 1)
+        self.assertFalse(fixes[0]["complete"])
+        self.assertIsNone(fixes[0]["speed"])
+        self.assertEqual(fixes[0]["altitude"], 545.4)
+
+    def test_bounded_pending(self):
+        fuser = GpsFuser(timeout=100, max_pending=2)
+        fuser.feed(GGA_19)
+        fuser.feed(GGA_20)
+        self.assertEqual(len(fuser.feed(RMC_21)), 1)
+        self.assertEqual(len(fuser.pending), 2)
+
+    def test_older_epochs_emitted_in_order(self):
+        fixes = list(fuse([RMC_19, GGA_20, "$GPGGA,bad*00", RMC_22, GGA_22]))
+        self.assertEqual([fix["complete"] for fix in fixes], [False, False, True])
+        timestamps = [fix["timestamp"] for fix in fixes]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from nmea_archive import decode_archive, main, split_chunks
+from nmea_batch import decode_batch
+
+LINES = [
+    "$GPRMC,235958.000,A,3754.587,N,14507.036,W,010.5,360.0,120419,,,D",
+    "$GPGGA,235959.000,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*48",
+    "$GPGGA,000000.500,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*4C",
+    "$GPGGA,12345,,N,,W,1,08,0.9,,,M,46.9,M,,47",
+    "$GPGGA,000001.000,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*48",
+]
+
+
+class TestNmeaArchive(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".nmea")
+        with os.fdopen(handle, "wb") as f:
+            f.write(("\r\n".join(LINES * 50) + "\r\n").encode())
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_split_chunks_at_line_boundaries(self):
+        chunks = split_chunks(self.path, chunk_size=100)
+        self.assertGreater(len(chunks), 1)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], len(data))
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[end - 1:end], b"\n")
+
+    def test_parallel_matches_single_buffer(self):
+        with open(self.path, "rb") as f:
+            expected, expected_valid = decode_batch(f.read(), day_epoch=0)
+        data, valid = decode_archive(self.path, workers=2, chunk_size=300, day_epoch=0)
+        np.testing.assert_array_equal(valid, expected_valid)
+        for name in ("latitude", "longitude", "altitude", "speed", "timestamp"):
+            np.testing.assert_array_equal(data[name], expected[name])
+        # Переход через полночь внутри каждого повтора и дата из RMC
+        self.assertEqual(data["timestamp"][2] - data["timestamp"][1], 1.5)
+
+    def test_chunk_without_commas(self):
+        # Фрагмент из одного мусора помечается некорректным, а не роняет разбор
+        with open(self.path, "ab") as f:
+            f.write(b"$GPGGA1\r\n" * 20)
+        data, valid = decode_archive(self.path, workers=2, chunk_size=100, day_epoch=0)
+        self.assertEqual(len(valid), len(LINES) * 50 + 20)
+        self.assertEqual(int(valid.sum()), 4 * 50)
+        self.assertFalse(valid[-20:].any())
+
+    def test_command_line(self):
+        output = self.path + ".npz"
+        try:
+            main([self.path, "-o", output, "-j", "2", "--chunk-size", "500"])
+            with np.load(output) as columns:
+                self.assertEqual(len(columns["latitude"]), len(LINES) * 50)
+                self.assertEqual(int(columns["valid"].sum()), 4 * 50)
+        finally:
+            os.remove(output)
+
+if __name__ == "__main__":
+    unittest.main()
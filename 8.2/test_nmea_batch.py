@@ -0,0 +1,84 @@
+import calendar
+import unittest
+import numpy as np
+from gps_module import UtcClock, parse_gps
+from nmea_batch import decode_batch
+
+GGA = "$GPGGA,123519.487,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*4F"
+RMC = "$GPRMC,123519.487,A,3754.587,N,14507.036,W,010.5,360.0,120419,,,D"
+
+
+class TestNmeaBatch(unittest.TestCase):
+    def test_matches_data_gps(self):
+        data, valid = decode_batch((GGA + "\r\n" + RMC + "\r\n").encode(), day_epoch=0)
+        clock = UtcClock(day_epoch=0)
+        self.assertTrue(valid.all())
+        self.assertEqual(list(data["kind"]), [b"GGA", b"RMC"])
+        for row, sentence in zip(data, [GGA, RMC]):
+            expected = parse_gps(sentence, clock)
+            self.assertAlmostEqual(row["latitude"], expected["latitude"], places=7)
+            self.assertAlmostEqual(row["longitude"], expected["longitude"], places=7)
+            self.assertAlmostEqual(row["timestamp"], expected["timestamp"], places=0)
+        self.assertEqual(data["altitude"][0], 545.4)
+        self.assertTrue(np.isnan(data["speed"][0]))
+        self.assertTrue(np.isnan(data["altitude"][1]))
+        self.assertAlmostEqual(data["speed"][1], 10.5 * 0.514444, places=7)
+
+    def test_invalid_rows_masked(self):
+        lines = [
+            GGA,
+            "$GPGGA,12345,,N,,W,1,08,0.9,,,M,46.9,M,,47",
+            "$GPGSV,3,1,11,03,03,111,00",
+            "$GPGGA,123519.487,37x4.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*02",
+            "$GPGGA,123519.487,3754.587,Q,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*50",
+            RMC,
+        ]
+        data, valid = decode_batch(lines)
+        self.assertEqual(list(valid), [True, False, False, False, False, True])
+        self.assertTrue(np.isnan(data["latitude"][~valid]).all())
+
+    def test_hemispheres_and_negative_altitude(self):
+        data, valid = decode_batch(
+            "$GPGGA,123456.78,4916.45,S,12311.12,E,1,12,0.5,-30.0,M,0.0,M,,*59")
+        self.assertTrue(valid[0])
+        self.assertAlmostEqual(data["latitude"][0], -(49 + 16.45 / 60), places=7)
+        self.assertAlmostEqual(data["longitude"][0], 123 + 11.12 / 60, places=7)
+        self.assertEqual(data["altitude"][0], -30.0)
+
+    def test_utc_timestamps_with_rollover(self):
+        lines = [
+            "$GPGGA,235959.000,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*48",
+            "$GPGGA,000000.500,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*4C",
+            "$GPRMC,000001.000,A,3754.587,N,14507.036,W,010.5,360.0,120419,,,D",
+            "$GPGGA,000002.000,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*4B",
+        ]
+        day = calendar.timegm((2019, 4, 11, 0, 0, 0))
+        data, valid = decode_batch(lines, day_epoch=day)
+        self.assertTrue(valid.all())
+        np.testing.assert_allclose(
+            data["timestamp"], [day + 86399, day + 86400.5, day + 86401, day + 86402])
+
+    def test_checksum_and_talkers(self):
+        lines = [
+            "$GNGGA,123519.487,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*51",
+            "$GNGGA,123519.487,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*47",
+            "$GNGGA,123519.487,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*5",
+        ]
+        data, valid = decode_batch(lines)
+        self.assertEqual(list(valid), [True, False, False])
+        self.assertEqual(data["altitude"][0], 545.4)
+
+    def test_buffer_without_commas(self):
+        data, valid = decode_batch(b"$GPGGA1\n")
+        self.assertEqual(list(valid), [False])
+
+        data, valid = decode_batch(b"$GPGGA1\r\n$GPRMC*00\r\n")
+        self.assertEqual(list(valid), [False, False])
+
+    def test_empty_buffer(self):
+        data, valid = decode_batch(b"\r\n\r\n")
+        self.assertEqual(len(data), 0)
+        self.assertEqual(len(valid), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import io
+import os
+import socket
+import calendar
+import unittest
+from nmea_stream import iter_sentences, iter_gps
+
+GGA = b"$GPGGA,123519.487,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,*4F"
+RMC = b"$GPRMC,123519.487,A,3754.587,N,14507.036,W,000.0,360.0,120419,,,D"
+
+
+class ChunkedStream:
+    """Поток, отдающий данные заданными порциями (имитация частичного чтения)."""
+    def __init__(self, data, size):
+        self.data = data
+        self.size = size
+
+    def read(self, n):
+        chunk, self.data = self.data[:self.size], self.data[self.size:]
+        return chunk
+
+
+class TestNmeaStream(unittest.TestCase):
+    def test_split_sentences(self):
+        stream = io.BytesIO(GGA + b"\r\n" + RMC + b"\r\n")
+        sentences = list(iter_sentences(stream))
+        self.assertEqual(sentences, [GGA.decode(), RMC.decode()])
+
+    def test_partial_reads(self):
+        data = (GGA + b"\r\n" + RMC + b"\n") * 3
+        sentences = list(iter_sentences(ChunkedStream(data, 7), chunk_size=7))
+        self.assertEqual(len(sentences), 6)
+        self.assertEqual(sentences[-1], RMC.decode())
+
+    def test_last_line_without_newline(self):
+        stream = io.BytesIO(GGA + b"\r\n" + RMC)
+        self.assertEqual(list(iter_sentences(stream))[-1], RMC.decode())
+
+    def test_garbage_before_sentence(self):
+        stream = io.BytesIO(b"\x00\xff" + GGA + b"\r\nnoise\r\n")
+        self.assertEqual(list(iter_sentences(stream)), [GGA.decode()])
+
+    def test_iter_gps_skips_invalid(self):
+        data = GGA + b"\r\n$GPGGA,12345,,N,,W,1,08,0.9,,,M,46.9,M,,47\r\n" + RMC + b"\r\n"
+        fixes = list(iter_gps(io.BytesIO(data)))
+        self.assertEqual(len(fixes), 2)
+        self.assertAlmostEqual(fixes[0]["latitude"], 37.90978333333333, places=7)
+        self.assertEqual(fixes[0]["altitude"], 545.4)
+        self.assertEqual(fixes[1]["speed"], 0.0)
+
+    def test_streams_have_own_clocks(self):
+        # Дата из RMC одного потока не влияет на метки времени другого
+        first = iter_gps(io.BytesIO(
+            b"$GPRMC,235959.000,A,3754.587,N,14507.036,W,000.0,360.0,120419,,,D\r\n"
+            b"$GPGGA,000001.000,3754.587,N,14507.036,W,1,08,0.9,545.4,M,46.9,M,,\r\n"))
+        second = iter_gps(io.BytesIO(
+            b"$GPRMC,120000.000,A,3754.587,N,14507.036,W,000.0,360.0,010120,,,D\r\n"))
+
+        next(first)
+        next(second)
+        after_midnight = next(first)
+
+        self.assertEqual(after_midnight["timestamp"],
+                         calendar.timegm((2019, 4, 13, 0, 0, 1)))
+
+    def test_socket_and_fd(self):
+        left, right = socket.socketpair()
+        left.sendall(GGA + b"\r\n")
+        left.close()
+        self.assertEqual(len(list(iter_gps(right))), 1)
+        right.close()
+
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, RMC + b"\r\n")
+        os.close(write_fd)
+        self.assertEqual(len(list(iter_gps(read_fd))), 1)
+        os.close(read_fd)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,316 @@
+# fleet_scheduler.py
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from mission_planner import MissionPlanner
+
+logger = logging.getLogger(__name__)
+
+# Состояния аппарата в ходе миссии
+PENDING = 'pending'
+UPLOAD = 'upload'  # Подключение и подготовка маршрута
+ARM = 'arm'
+TAKEOFF = 'takeoff'
+FLY = 'fly'
+RTL = 'rtl'
+DISARM = 'disarm'
+DONE = 'done'
+FAILED = 'failed'
+
+STATES = (PENDING, UPLOAD, ARM, TAKEOFF, FLY, RTL, DISARM, DONE, FAILED)
+
+# Допустимые переходы; в FAILED можно перейти из любого незавершённого состояния
+TRANSITIONS = {
+    PENDING: (UPLOAD,),
+    UPLOAD: (ARM,),
+    ARM: (TAKEOFF,),
+    TAKEOFF: (FLY,),
+    FLY: (FLY, RTL),
+    RTL: (DISARM,),
+    DISARM: (DONE,),
+    DONE: (),
+    FAILED: (),
+}
+
+# Методы UAVControl, отправляющие команды по каналу связи
+COMMAND_METHODS = ('arm', 'disarm', 'set_mode', 'takeoff', 'goto')
+# Аварийные режимы: set_mode с ними не ждёт токена
+PRIORITY_MODES = ('RTL',)
+
+RATE = 20.0  # Команд в секунду на весь канал
+BURST = 10  # Допустимая пачка команд
+
+
+class TokenBucket:
+    """
+    Ограничение частоты команд, общее для всех потоков.
+
+    Каждая команда забирает один токен; токены пополняются со скоростью
+    rate в секунду до burst.
+    """
+
+    def __init__(self, rate: float = RATE, burst: int = BURST):
+        """
+        Args:
+            rate (float): Скорость пополнения, токенов в секунду.
+            burst (int): Ёмкость корзины.
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("Скорость и ёмкость должны быть положительными")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Получение одного токена с ожиданием.
+
+        Returns:
+            float: Время ожидания в секундах.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimitedUAV:
+    """
+    Обёртка над UAVControl: перед каждой командой забирает токен из общей корзины.
+
+    Токен забирается один на вызов метода, а не на сообщение MAVLink:
+    goto отправляет MISSION_COUNT и MISSION_ITEM (с паузой в 1 с между
+    ними), takeoff - смену режима и COMMAND_LONG. Переход в режимы
+    PRIORITY_MODES (возврат домой при нарушении геозоны) выполняется без
+    ожидания. Чтение сообщений (recv_message, get_telemetry) не ограничивается.
+    """
+
+    def __init__(self, uav: Any, bucket: TokenBucket):
+        self._uav = uav
+        self._bucket = bucket
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._uav, name)
+        if name not in COMMAND_METHODS:
+            return attr
+
+        def command(*args: Any, **kwargs: Any) -> Any:
+            mode = args[0] if args else kwargs.get('mode')
+            if name != 'set_mode' or mode not in PRIORITY_MODES:
+                self._bucket.acquire()
+            return attr(*args, **kwargs)
+        return command
+
+
+class VehicleStatus:
+    """
+    Состояние миссии одного аппарата.
+    """
+
+    def __init__(self, vehicle_id: str, total: int):
+        self.vehicle_id = vehicle_id
+        self.state = PENDING
+        self.total = total  # Число точек миссии
+        self.reached = 0  # Число достигнутых точек
+        self.error: Optional[str] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def transition(self, state: str, reached: Optional[int] = None) -> None:
+        """
+        Переход в новое состояние.
+
+        Raises:
+            RuntimeError: Переход не допускается.
+        """
+        with self._lock:
+            allowed = TRANSITIONS[self.state] + (() if self.state in (DONE, FAILED) else (FAILED,))
+            if state not in allowed:
+                raise RuntimeError(f"{self.vehicle_id}: недопустимый переход {self.state} -> {state}")
+            self.state = state
+            if reached is not None:
+                self.reached = reached
+            if state == UPLOAD:
+                self.started = time.monotonic()
+            elif state in (DONE, FAILED):
+                self.finished = time.monotonic()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Копия состояния для отчёта."""
+        with self._lock:
+            return {
+                'state': self.state,
+                'reached': self.reached,
+                'total': self.total,
+                'error': self.error,
+                'duration': (None if self.started is None
+                             else (self.finished or time.monotonic()) - self.started),
+            }
+
+
+class FleetScheduler:
+    """
+    Одновременное выполнение миссий группы аппаратов.
+
+    Каждая миссия выполняется MissionPlanner в отдельном потоке и занимает
+    его на всё время полёта. По умолчанию (max_workers=None) поток
+    создаётся на каждый добавленный аппарат, и все миссии летят
+    одновременно; нагрузку на наземный канал ограничивает общий
+    TokenBucket, через который проходят команды всех аппаратов. При
+    заданном max_workers миссии выполняются в пуле из max_workers потоков,
+    а остальные ждут в очереди (в состоянии PENDING), пока не освободится
+    поток.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, rate: float = RATE, burst: int = BURST,
+                 planner_factory: Callable[[str], Any] = MissionPlanner):
+        """
+        Args:
+            max_workers (Optional[int]): Предел одновременно выполняемых миссий;
+                None - без предела, по потоку на аппарат.
+            rate (float): Команд в секунду на весь канал.
+            burst (int): Допустимая пачка команд.
+            planner_factory: Создание планировщика по строке подключения.
+        """
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("Число потоков должно быть положительным")
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate, burst)
+        self.planner_factory = planner_factory
+        self.vehicles: Dict[str, VehicleStatus] = {}
+        self._missions: Dict[str, Tuple[str, List[Tuple[float, float, float]], bool]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._started = False
+        self._futures: Dict[str, Future] = {}
+
+    def add(self, vehicle_id: str, connection_string: str,
+            waypoints: List[Tuple[float, float, float]], optimize: bool = False) -> None:
+        """
+        Добавление миссии аппарата.
+
+        Args:
+            vehicle_id (str): Идентификатор аппарата.
+            connection_string (str): Строка подключения MAVLink.
+            waypoints (List[Tuple[float, float, float]]): Список точек (lat, lon, alt).
+            optimize (bool): Переупорядочить точки перед выполнением.
+        """
+        if vehicle_id in self.vehicles:
+            raise ValueError(f"Аппарат {vehicle_id} уже добавлен")
+        if not waypoints:
+            raise ValueError(f"Пустая миссия аппарата {vehicle_id}")
+        self.vehicles[vehicle_id] = VehicleStatus(vehicle_id, len(waypoints))
+        self._missions[vehicle_id] = (connection_string, list(waypoints), optimize)
+        if self._started:
+            self._submit(vehicle_id)
+
+    def _submit(self, vehicle_id: str) -> None:
+        if self._executor is not None:
+            self._futures[vehicle_id] = self._executor.submit(self._run_mission, vehicle_id)
+            return
+        # Без предела каждая миссия получает собственный поток
+        future: Future = Future()
+
+        def run() -> None:
+            try:
+                self._run_mission(vehicle_id)
+            finally:
+                future.set_result(None)
+
+        threading.Thread(target=run, name=f'fleet-{vehicle_id}', daemon=True).start()
+        self._futures[vehicle_id] = future
+
+    def _run_mission(self, vehicle_id: str) -> None:
+        status = self.vehicles[vehicle_id]
+        connection_string, waypoints, optimize = self._missions[vehicle_id]
+        try:
+            status.transition(UPLOAD)
+            planner = self.planner_factory(connection_string)
+            planner.uav = RateLimitedUAV(planner.uav, self.bucket)
+            if optimize:
+                waypoints = planner.plan_route(waypoints)
+            planner.execute_mission(
+                waypoints, on_progress=lambda stage, reached: status.transition(stage, reached))
+            status.transition(DONE)
+            logger.info(f"Аппарат {vehicle_id}: миссия выполнена")
+        except Exception as e:
+            status.error = str(e)
+            status.transition(FAILED)
+            logger.error(f"Аппарат {vehicle_id}: ошибка миссии: {e}")
+
+    def start(self) -> None:
+        """Запуск всех добавленных миссий (без ожидания завершения)."""
+        if self.max_workers is not None and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='fleet')
+        self._started = True
+        for vehicle_id in self._missions:
+            if vehicle_id not in self._futures:
+                self._submit(vehicle_id)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Ожидание завершения запущенных миссий.
+
+        Args:
+            timeout (Optional[float]): Время ожидания в секундах.
+
+        Returns:
+            bool: True, если все миссии завершены.
+        """
+        _, not_done = wait(list(self._futures.values()), timeout=timeout)
+        if not not_done:
+            self._started = False
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        return not not_done
+
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Выполнение всех миссий с ожиданием завершения.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Состояние каждого аппарата.
+        """
+        self.start()
+        self.wait()
+        return {vehicle_id: status.as_dict() for vehicle_id, status in self.vehicles.items()}
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Сводное состояние группы.
+
+        Returns:
+            Dict[str, Any]: states - число аппаратов в каждом состоянии,
+            reached/total - достигнуто точек из общего числа, done - доля
+            завершённых миссий (успешно или с ошибкой).
+        """
+        states = dict.fromkeys(STATES, 0)
+        reached = total = 0
+        for status in self.vehicles.values():
+            snapshot = status.as_dict()
+            states[snapshot['state']] += 1
+            reached += snapshot['reached']
+            total += snapshot['total']
+        finished = states[DONE] + states[FAILED]
+        return {
+            'states': states,
+            'reached': reached,
+            'total': total,
+            'done': finished / len(self.vehicles) if self.vehicles else 1.0,
+        }
@@ -0,0 +1,312 @@
+# geofence.py
+
+import math
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from route_optimizer import EARTH_RADIUS
+
+logger = logging.getLogger(__name__)
+
+CELL_SIZE = 200.0  # Размер ячейки сеточного индекса, м
+
+
+class GeofenceBreach(Exception):
+    """Аппарат вошёл в запретную зону."""
+
+
+class Violation(NamedTuple):
+    """Нарушение геозоны миссией."""
+    index: int  # Номер точки или участка (участок i - от точки i до i + 1)
+    zone: str  # Название зоны
+    kind: str  # 'waypoint' или 'leg'
+
+
+class _Zone(ABC):
+    """Запретная зона в локальных координатах (x - на восток, y - на север, м)."""
+
+    def __init__(self, name: str, bbox: Tuple[float, float, float, float],
+                 min_alt: Optional[float], max_alt: Optional[float]):
+        self.name = name
+        self.bbox = bbox
+        self.min_alt = -math.inf if min_alt is None else min_alt
+        self.max_alt = math.inf if max_alt is None else max_alt
+
+    def in_band(self, alt: float) -> bool:
+        return self.min_alt <= alt <= self.max_alt
+
+    @abstractmethod
+    def contains(self, x: float, y: float) -> bool:
+        """Точка внутри зоны (без учёта высоты)."""
+
+    @abstractmethod
+    def contains_many(self, xy: np.ndarray) -> np.ndarray:
+        """Признак попадания в зону для каждой точки (N, 2)."""
+
+    @abstractmethod
+    def crosses_many(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """Признак пересечения зоны для каждого отрезка start[i] - end[i]."""
+
+
+class _Polygon(_Zone):
+    def __init__(self, name: str, vertices: np.ndarray, min_alt: Optional[float],
+                 max_alt: Optional[float]):
+        bbox = (vertices[:, 0].min(), vertices[:, 1].min(),
+                vertices[:, 0].max(), vertices[:, 1].max())
+        super().__init__(name, tuple(float(v) for v in bbox), min_alt, max_alt)
+        self.a = vertices
+        self.b = np.roll(vertices, -1, axis=0)
+        # Рёбра кортежами: для одиночной точки цикл быстрее вызовов numpy
+        self.edges = [(float(x1), float(y1), float(x2), float(y2))
+                      for (x1, y1), (x2, y2) in zip(self.a, self.b)]
+
+    def contains(self, x: float, y: float) -> bool:
+        inside = False
+        for x1, y1, x2, y2 in self.edges:
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+        return inside
+
+    def contains_many(self, xy: np.ndarray) -> np.ndarray:
+        x = xy[:, 0, None]
+        y = xy[:, 1, None]
+        x1, y1 = self.a[:, 0], self.a[:, 1]
+        x2, y2 = self.b[:, 0], self.b[:, 1]
+        straddles = (y1 > y) != (y2 > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing = x < x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        return (np.count_nonzero(straddles & crossing, axis=1) % 2) == 1
+
+    def crosses_many(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        # Участок пересекает ребро или целиком лежит внутри
+        p, r = start[:, None, :], (end - start)[:, None, :]
+        q, s = self.a[None, :, :], (self.b - self.a)[None, :, :]
+
+        def cross(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+            return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+        denom = cross(r, s)
+        qp = q - p
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = cross(qp, s) / denom
+            u = cross(qp, r) / denom
+        hits = (denom != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+        return hits.any(axis=1) | self.contains_many(start) | self.contains_many(end)
+
+
+class _Cylinder(_Zone):
+    def __init__(self, name: str, centre: Tuple[float, float], radius: float,
+                 min_alt: Optional[float], max_alt: Optional[float]):
+        cx, cy = centre
+        super().__init__(name, (cx - radius, cy - radius, cx + radius, cy + radius),
+                         min_alt, max_alt)
+        self.centre = np.array(centre)
+        self.radius = radius
+
+    def contains(self, x: float, y: float) -> bool:
+        return (x - self.centre[0]) ** 2 + (y - self.centre[1]) ** 2 <= self.radius ** 2
+
+    def contains_many(self, xy: np.ndarray) -> np.ndarray:
+        return ((xy - self.centre) ** 2).sum(axis=1) <= self.radius ** 2
+
+    def crosses_many(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        # Расстояние от центра до ближайшей точки участка
+        d = end - start
+        length2 = (d ** 2).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.where(length2 > 0, ((self.centre - start) * d).sum(axis=1) / length2, 0.0)
+        closest = start + np.clip(t, 0.0, 1.0)[:, None] * d
+        return ((closest - self.centre) ** 2).sum(axis=1) <= self.radius ** 2
+
+
+class Geofence:
+    """
+    Набор запретных зон (многоугольники и цилиндры) с сеточным индексом.
+
+    Координаты переводятся в метры равнопромежуточной проекцией вокруг
+    origin; каждая зона регистрируется во всех ячейках сетки, которые
+    покрывает её ограничивающий прямоугольник. Проверка точки
+    просматривает только зоны своей ячейки.
+    """
+
+    def __init__(self, origin: Optional[Tuple[float, float]] = None,
+                 cell_size: float = CELL_SIZE):
+        """
+        Args:
+            origin (Optional[Tuple[float, float]]): Центр проекции (lat, lon);
+                по умолчанию - первая точка первой добавленной зоны.
+            cell_size (float): Размер ячейки сетки в метрах.
+        """
+        self.origin = origin
+        self.cell_size = cell_size
+        self.zones: List[_Zone] = []
+        self._grid: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self._set_projection()
+
+    def _set_projection(self) -> None:
+        if self.origin is None:
+            return
+        self._lat0 = math.radians(self.origin[0])
+        self._lon0 = math.radians(self.origin[1])
+        self._kx = EARTH_RADIUS * math.cos(self._lat0)
+
+    def _xy(self, lat: float, lon: float) -> Tuple[float, float]:
+        return ((math.radians(lon) - self._lon0) * self._kx,
+                (math.radians(lat) - self._lat0) * EARTH_RADIUS)
+
+    def _xy_many(self, latlon: np.ndarray) -> np.ndarray:
+        lat = np.radians(latlon[:, 0])
+        lon = np.radians(latlon[:, 1])
+        return np.column_stack(((lon - self._lon0) * self._kx, (lat - self._lat0) * EARTH_RADIUS))
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _cells(self, bbox: Tuple[float, float, float, float]) -> List[Tuple[int, int]]:
+        x0, y0 = self._cell(bbox[0], bbox[1])
+        x1, y1 = self._cell(bbox[2], bbox[3])
+        return [(i, j) for i in range(x0, x1 + 1) for j in range(y0, y1 + 1)]
+
+    def _segment_cells(self, x0: float, y0: float, x1: float, y1: float) -> List[Tuple[int, int]]:
+        """Ячейки, через которые проходит отрезок (обход сетки вдоль отрезка)."""
+        i, j = self._cell(x0, y0)
+        i1, j1 = self._cell(x1, y1)
+        dx, dy = x1 - x0, y1 - y0
+        step_i = 1 if dx > 0 else -1
+        step_j = 1 if dy > 0 else -1
+        # Параметр t (0..1) ближайшего пересечения границы ячейки по каждой оси
+        next_x = (i + (step_i > 0)) * self.cell_size
+        next_y = (j + (step_j > 0)) * self.cell_size
+        t_x = (next_x - x0) / dx if dx else math.inf
+        t_y = (next_y - y0) / dy if dy else math.inf
+        dt_x = self.cell_size / abs(dx) if dx else math.inf
+        dt_y = self.cell_size / abs(dy) if dy else math.inf
+        cells = [(i, j)]
+        for _ in range(abs(i1 - i) + abs(j1 - j)):
+            if t_x < t_y:
+                i += step_i
+                t_x += dt_x
+            else:
+                j += step_j
+                t_y += dt_y
+            cells.append((i, j))
+        return cells
+
+    def _register(self, zone: _Zone) -> None:
+        self.zones.append(zone)
+        for cell in self._cells(zone.bbox):
+            self._grid[cell].append(len(self.zones) - 1)
+
+    def add_polygon(self, name: str, vertices: Sequence[Tuple[float, float]],
+                    min_alt: Optional[float] = None, max_alt: Optional[float] = None) -> None:
+        """
+        Добавление многоугольной зоны.
+
+        Args:
+            name (str): Название зоны.
+            vertices (Sequence[Tuple[float, float]]): Вершины (lat, lon), не менее трёх.
+            min_alt (Optional[float]): Нижняя граница зоны, м (None - от земли).
+            max_alt (Optional[float]): Верхняя граница зоны, м (None - без ограничения).
+        """
+        if len(vertices) < 3:
+            raise ValueError("Многоугольник должен иметь не менее трёх вершин")
+        if self.origin is None:
+            self.origin = tuple(vertices[0])
+            self._set_projection()
+        xy = self._xy_many(np.asarray(vertices, dtype=np.float64))
+        self._register(_Polygon(name, xy, min_alt, max_alt))
+
+    def add_cylinder(self, name: str, lat: float, lon: float, radius: float,
+                     min_alt: Optional[float] = None, max_alt: Optional[float] = None) -> None:
+        """
+        Добавление цилиндрической зоны.
+
+        Args:
+            name (str): Название зоны.
+            lat, lon (float): Центр зоны в градусах.
+            radius (float): Радиус зоны, м.
+            min_alt (Optional[float]): Нижняя граница зоны, м (None - от земли).
+            max_alt (Optional[float]): Верхняя граница зоны, м (None - без ограничения).
+        """
+        if radius <= 0:
+            raise ValueError("Радиус зоны должен быть положительным")
+        if self.origin is None:
+            self.origin = (lat, lon)
+            self._set_projection()
+        self._register(_Cylinder(name, self._xy(lat, lon), radius, min_alt, max_alt))
+
+    def check(self, lat: float, lon: float, alt: float) -> Optional[str]:
+        """
+        Проверка одной позиции (для потока телеметрии).
+
+        Args:
+            lat, lon (float): Координаты в градусах.
+            alt (float): Высота, м.
+
+        Returns:
+            Optional[str]: Название зоны, в которой находится точка, или None.
+        """
+        if not self.zones:
+            return None
+        x, y = self._xy(lat, lon)
+        for index in self._grid.get(self._cell(x, y), ()):
+            zone = self.zones[index]
+            x0, y0, x1, y1 = zone.bbox
+            if x0 <= x <= x1 and y0 <= y <= y1 and zone.in_band(alt) and zone.contains(x, y):
+                return zone.name
+        return None
+
+    def validate_mission(self, waypoints: Sequence[Tuple[float, float, float]]) -> List[Violation]:
+        """
+        Проверка всех точек миссии и участков между ними.
+
+        Для участка проверяется пересечение с зоной на плоскости и
+        пересечение диапазона высот участка с диапазоном высот зоны
+        (оценка с запасом).
+
+        Args:
+            waypoints (Sequence[Tuple[float, float, float]]): Точки (lat, lon, alt).
+
+        Returns:
+            List[Violation]: Нарушения, упорядоченные по номеру точки или участка.
+        """
+        if not self.zones or not waypoints:
+            return []
+        points = np.asarray(waypoints, dtype=np.float64).reshape(-1, 3)
+        xy = self._xy_many(points)
+        alt = points[:, 2]
+
+        # Кандидаты: зона -> номера точек и участков в её ячейках
+        point_candidates: Dict[int, List[int]] = defaultdict(list)
+        for i, (x, y) in enumerate(xy):
+            for index in self._grid.get(self._cell(x, y), ()):
+                point_candidates[index].append(i)
+        leg_candidates: Dict[int, set] = defaultdict(set)
+        for i in range(len(xy) - 1):
+            for cell in self._segment_cells(xy[i, 0], xy[i, 1], xy[i + 1, 0], xy[i + 1, 1]):
+                for index in self._grid.get(cell, ()):
+                    leg_candidates[index].add(i)
+
+        violations = []
+        for index, candidates in point_candidates.items():
+            zone = self.zones[index]
+            idx = np.array(candidates)
+            band = (alt[idx] >= zone.min_alt) & (alt[idx] <= zone.max_alt)
+            idx = idx[band]
+            if len(idx):
+                inside = zone.contains_many(xy[idx])
+                violations += [Violation(int(i), zone.name, 'waypoint') for i in idx[inside]]
+        for index, candidates in leg_candidates.items():
+            zone = self.zones[index]
+            idx = np.array(sorted(candidates))
+            low = np.minimum(alt[idx], alt[idx + 1])
+            high = np.maximum(alt[idx], alt[idx + 1])
+            idx = idx[(high >= zone.min_alt) & (low <= zone.max_alt)]
+            if len(idx):
+                crosses = zone.crosses_many(xy[idx], xy[idx + 1])
+                violations += [Violation(int(i), zone.name, 'leg') for i in idx[crosses]]
+        return sorted(violations)
@@ -1,70 +1,286 @@
 # mission_planner.py
 
 from uav_control import UAVControl
+from route_optimizer import EARTH_RADIUS, optimize_route
+from geofence import Geofence, GeofenceBreach
+from simplify import simplify_route
+import math
 import time
-from typing import List, Tuple
+from typing import Any, Callable, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+ARRIVAL_RADIUS = 2.0  # Допустимое расстояние до точки по горизонтали, м
+ALT_TOLERANCE = 1.0  # Допустимое отклонение по высоте, м
+# MISSION_ITEM_REACHED и MISSION_CURRENT засчитываются только вблизи точки:
+# запоздавшее сообщение о предыдущей точке не должно завершать следующий участок
+REACHED_RADIUS = 20.0
+CRUISE_SPEED = 5.0  # Скорость по умолчанию до первого VFR_HUD (WPNAV_SPEED), м/с
+CLIMB_RATE = 2.5  # Скорость набора высоты по умолчанию (WPNAV_SPEED_UP), м/с
+TIMEOUT_FACTOR = 2.0  # Запас времени относительно расчётного времени участка
+TIMEOUT_MIN = 10.0  # Минимальное время на участок, с
+POLL_TIMEOUT = 1.0  # Максимальное ожидание одного сообщения, с
+LANDING_WAIT = 5  # Ожидание посадки после перехода в RTL, с
+
+# Сообщения, по которым отслеживается выполнение миссии
+PROGRESS_TYPES = ['MISSION_ITEM_REACHED', 'MISSION_CURRENT', 'GLOBAL_POSITION_INT', 'VFR_HUD']
+
+
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Расстояние по поверхности Земли между двумя точками.
+
+    Args:
+        lat1, lon1 (float): Координаты первой точки в градусах.
+        lat2, lon2 (float): Координаты второй точки в градусах.
+
+    Returns:
+        float: Расстояние в метрах.
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
 
 class MissionPlanner:
     """
     Класс для планирования и выполнения миссий БПЛА.
+
+    Переход к следующей точке выполняется сразу по достижении текущей:
+    планировщик читает поток MISSION_ITEM_REACHED, MISSION_CURRENT,
+    GLOBAL_POSITION_INT и VFR_HUD вместо опроса с фиксированными паузами.
     """
 
-    def __init__(self, connection_string: str):
+    def __init__(self, connection_string: str, arrival_radius: float = ARRIVAL_RADIUS,
+                 alt_tolerance: float = ALT_TOLERANCE, geofence: Optional[Geofence] = None):
         """
         Инициализация планировщика миссий.
 
         Args:
             connection_string (str): Строка подключения MAVLink.
+            arrival_radius (float): Допустимое расстояние до точки по горизонтали, м.
+            alt_tolerance (float): Допустимое отклонение по высоте, м.
+            geofence (Optional[Geofence]): Запретные зоны (высоты - над точкой взлёта).
         """
         self.uav = UAVControl(connection_string)
+        self.arrival_radius = arrival_radius
+        self.alt_tolerance = alt_tolerance
+        self.geofence = geofence
+        if geofence is not None:
+            self.uav.geofence = geofence
+        self.position: Optional[Tuple[float, float, float]] = None  # Последняя позиция
+        self.groundspeed: Optional[float] = None  # Последняя путевая скорость, м/с
+        self.mission_seq: Optional[int] = None  # Текущий пункт миссии на аппарате
+
+    def _handle(self, msg: Any) -> None:
+        """Обновление позиции, скорости и текущего пункта по сообщению."""
+        msg_type = msg.get_type()
+        if msg_type == 'GLOBAL_POSITION_INT':
+            self.position = (msg.lat / 1e7, msg.lon / 1e7, msg.relative_alt / 1000)
+        elif msg_type == 'VFR_HUD':
+            self.groundspeed = msg.groundspeed
+        elif msg_type == 'MISSION_CURRENT':
+            self.mission_seq = msg.seq
+
+    def _distance(self, waypoint: Tuple[float, float, float]) -> Tuple[float, float]:
+        """Расстояние от последней позиции до точки: по горизонтали и по высоте, м."""
+        lat, lon, alt = self.position
+        return haversine(lat, lon, waypoint[0], waypoint[1]), abs(alt - waypoint[2])
+
+    def leg_timeout(self, waypoint: Tuple[float, float, float]) -> float:
+        """
+        Время на участок от последней позиции до точки.
+
+        Оценивается по длине участка, путевой скорости (или CRUISE_SPEED)
+        и скорости набора высоты с запасом TIMEOUT_FACTOR.
+
+        Args:
+            waypoint (Tuple[float, float, float]): Точка (lat, lon, alt).
+
+        Returns:
+            float: Время ожидания в секундах.
+        """
+        if self.position is None:
+            return TIMEOUT_MIN
+        horizontal, vertical = self._distance(waypoint)
+        speed = max(self.groundspeed or 0.0, CRUISE_SPEED)
+        return max(TIMEOUT_MIN, TIMEOUT_FACTOR * (horizontal / speed + vertical / CLIMB_RATE))
+
+    def check_geofence(self) -> None:
+        """
+        Проверка последней позиции по запретным зонам.
+
+        При нарушении аппарат сразу переводится в RTL.
+
+        Raises:
+            GeofenceBreach: Аппарат находится в запретной зоне.
+        """
+        zone = self.geofence.check(*self.position)
+        if zone is not None:
+            logger.error(f"Нарушение геозоны {zone} в точке {self.position}, возврат домой")
+            self.uav.set_mode('RTL')
+            raise GeofenceBreach(f"Нарушение геозоны {zone}")
 
-    def execute_mission(self, waypoints: List[Tuple[float, float, float]]) -> None:
+    def wait_arrival(self, waypoint: Tuple[float, float, float], seq: int = 0,
+                     horizontal: bool = True) -> bool:
+        """
+        Ожидание достижения точки.
+
+        Точка считается достигнутой по MISSION_ITEM_REACHED с номером seq,
+        по замеченному на этом участке переходу MISSION_CURRENT с seq
+        на seq + 1 (в обоих случаях в пределах REACHED_RADIUS и alt_tolerance)
+        или по позиции в пределах arrival_radius и alt_tolerance. Время
+        ожидания определяется длиной участка от позиции, известной на его начало.
+
+        Args:
+            waypoint (Tuple[float, float, float]): Точка (lat, lon, alt).
+            seq (int): Номер пункта миссии на аппарате.
+            horizontal (bool): Проверять положение по горизонтали (False - только высоту).
+
+        Returns:
+            bool: True, если точка достигнута, False по таймауту.
+        """
+        # Пока позиция неизвестна, длина участка не определена: TIMEOUT_MIN
+        deadline = time.monotonic() + self.leg_timeout(waypoint)
+        leg_known = self.position is not None
+        # Переход MISSION_CURRENT учитывается только в пределах участка
+        self.mission_seq = None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            msg = self.uav.recv_message(PROGRESS_TYPES, timeout=min(remaining, POLL_TIMEOUT))
+            if msg is None:
+                continue
+            previous_seq = self.mission_seq
+            self._handle(msg)
+            if self.position is None:
+                continue
+            if self.geofence is not None and msg.get_type() == 'GLOBAL_POSITION_INT':
+                self.check_geofence()
+            if not leg_known:
+                deadline = time.monotonic() + self.leg_timeout(waypoint)
+                leg_known = True
+
+            distance, alt_diff = self._distance(waypoint)
+            msg_type = msg.get_type()
+            if not horizontal:
+                if msg_type == 'GLOBAL_POSITION_INT' and alt_diff <= self.alt_tolerance:
+                    return True
+            elif msg_type == 'MISSION_ITEM_REACHED':
+                if (msg.seq == seq and distance <= REACHED_RADIUS
+                        and alt_diff <= self.alt_tolerance):
+                    return True
+            elif msg_type == 'MISSION_CURRENT':
+                if (previous_seq == seq and msg.seq == seq + 1 and distance <= REACHED_RADIUS
+                        and alt_diff <= self.alt_tolerance):
+                    return True
+            elif msg_type == 'GLOBAL_POSITION_INT':
+                if distance <= self.arrival_radius and alt_diff <= self.alt_tolerance:
+                    return True
+
+    def plan_route(self, waypoints: List[Tuple[float, float, float]], end: Optional[int] = None,
+                   time_limit: Optional[float] = None) -> List[Tuple[float, float, float]]:
+        """
+        Упорядочивание точек для сокращения длины маршрута.
+
+        Первая точка остаётся первой (к ней выполняется взлёт).
+
+        Args:
+            waypoints (List[Tuple[float, float, float]]): Список точек (lat, lon, alt).
+            end (Optional[int]): Индекс точки, которая должна быть последней.
+            time_limit (Optional[float]): Ограничение времени оптимизации в секундах.
+
+        Returns:
+            List[Tuple[float, float, float]]: Точки в новом порядке.
+        """
+        order, length = optimize_route(waypoints, start=0, end=end, time_limit=time_limit)
+        logger.info(f"Длина маршрута после оптимизации: {length:.0f} м")
+        return [waypoints[index] for index in order]
+
+    def simplify(self, waypoints: List[Tuple[float, float, float]],
+                 tolerance: float) -> List[Tuple[float, float, float]]:
+        """
+        Удаление почти коллинеарных точек плотного маршрута (трека GPS).
+
+        Args:
+            waypoints (List[Tuple[float, float, float]]): Список точек (lat, lon, alt).
+            tolerance (float): Допустимое отклонение от исходного маршрута, м.
+
+        Returns:
+            List[Tuple[float, float, float]]: Оставшиеся точки в исходном порядке.
+        """
+        kept, deviation = simplify_route(waypoints, tolerance)
+        logger.info(f"Точек миссии: {len(waypoints)} -> {len(kept)}, "
+                    f"максимальное отклонение {deviation:.2f} м")
+        return [waypoints[index] for index in kept]
+
+    def execute_mission(self, waypoints: List[Tuple[float, float, float]],
+                        optimize: bool = False,
+                        on_progress: Optional[Callable[[str, int], None]] = None,
+                        tolerance: Optional[float] = None) -> None:
         """
         Выполнение миссии по заданным точкам.
 
         Args:
             waypoints (List[Tuple[float, float, float]]): Список точек (lat, lon, alt).
+            optimize (bool): Переупорядочить точки перед выполнением (plan_route).
+            on_progress: Вызывается с названием этапа ('arm', 'takeoff', 'fly',
+                'rtl', 'disarm') и числом достигнутых точек.
+            tolerance (Optional[float]): Упростить маршрут с этим допуском, м (simplify).
         """
+        def progress(stage: str, reached: int = 0) -> None:
+            if on_progress is not None:
+                on_progress(stage, reached)
+
+        if tolerance is not None:
+            waypoints = self.simplify(waypoints, tolerance)
+        if optimize:
+            waypoints = self.plan_route(waypoints)
+        if self.geofence is not None:
+            violations = self.geofence.validate_mission(waypoints)
+            if violations:
+                details = ", ".join(f"{v.kind} {v.index + 1}: {v.zone}" for v in violations)
+                raise ValueError(f"Миссия пересекает запретные зоны: {details}")
         try:
+            progress('arm')
             self.uav.arm()
+            progress('takeoff')
             self.uav.set_mode('GUIDED')
             self.uav.takeoff(waypoints[0][2])
 
             # Ожидание набора высоты
-            time.sleep(5)
+            if not self.wait_arrival(waypoints[0], horizontal=False):
+                raise Exception("Не удалось набрать высоту взлёта")
 
+            progress('fly')
             for idx, waypoint in enumerate(waypoints):
                 logger.info(f"Переходим к точке {idx+1}: {waypoint}")
                 self.uav.goto(*waypoint)
 
-                # Ожидание достижения точки с проверкой телеметрии
-                reached = False
-                for _ in range(5):  # Максимум 5 проверок
-                    telemetry = self.uav.get_telemetry()
-                    if telemetry:
-                        lat_diff = abs(telemetry.get('lat', 0.0) - waypoint[0])
-                        lon_diff = abs(telemetry.get('lon', 0.0) - waypoint[1])
-                        alt_diff = abs(telemetry.get('alt', 0.0) - waypoint[2])
-                        if lat_diff < 0.0001 and lon_diff < 0.0001 and alt_diff < 1.0:
-                            reached = True
-                            logger.info(f"Достигнута точка {idx+1}")
-                            break
-                    time.sleep(1)
-                if not reached:
+                if not self.wait_arrival(waypoint):
                     logger.error(f"Не удалось достичь точки {idx+1}")
                     raise Exception(f"Не удалось достичь точки {idx+1}")
+                logger.info(f"Достигнута точка {idx+1}")
+                progress('fly', idx + 1)
 
             # Возвращение и посадка
+            progress('rtl', len(waypoints))
             self.uav.set_mode('RTL')
             logger.info("Возвращение домой и посадка")
 
             # Ожидание посадки
-            time.sleep(5)
+            time.sleep(LANDING_WAIT)
+            progress('disarm', len(waypoints))
             self.uav.disarm()
+        except GeofenceBreach as e:
+            # Аппарат уже возвращается домой, разоружать его в воздухе нельзя
+            logger.error(f"Миссия прервана: {e}")
+            raise
         except Exception as e:
             logger.error(f"Ошибка во время выполнения миссии: {e}")
             self.uav.disarm()
@@ -0,0 +1,215 @@
+# route_optimizer.py
+
+import time
+from typing import List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS = 6371000.0  # Средний радиус Земли, м
+OR_OPT_SEGMENT = 3  # Максимальная длина переносимого участка в Or-opt
+EPSILON = 1e-9  # Минимальное улучшение длины маршрута, м
+
+
+def distance_matrix(waypoints: Sequence[Tuple[float, float, float]]) -> np.ndarray:
+    """
+    Матрица расстояний между всеми точками.
+
+    Горизонтальное расстояние считается по формуле гаверсинуса,
+    перепад высот добавляется как катет.
+
+    Args:
+        waypoints (Sequence[Tuple[float, float, float]]): Точки (lat, lon, alt).
+
+    Returns:
+        np.ndarray: Матрица (N, N) расстояний в метрах.
+    """
+    points = np.asarray(waypoints, dtype=np.float64).reshape(-1, 3)
+    lat = np.radians(points[:, 0])
+    lon = np.radians(points[:, 1])
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    horizontal = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    vertical = points[:, 2][:, None] - points[:, 2][None, :]
+    return np.hypot(horizontal, vertical)
+
+
+def route_length(matrix: np.ndarray, order: Sequence[int]) -> float:
+    """
+    Длина маршрута, проходящего точки в заданном порядке.
+
+    Args:
+        matrix (np.ndarray): Матрица расстояний.
+        order (Sequence[int]): Порядок обхода точек.
+
+    Returns:
+        float: Длина маршрута в метрах.
+    """
+    order = np.asarray(order, dtype=np.intp)
+    return float(matrix[order[:-1], order[1:]].sum())
+
+
+def nearest_neighbour(matrix: np.ndarray, start: int = 0, end: Optional[int] = None) -> List[int]:
+    """
+    Начальный маршрут: из каждой точки в ближайшую непосещённую.
+
+    Args:
+        matrix (np.ndarray): Матрица расстояний.
+        start (int): Первая точка маршрута.
+        end (Optional[int]): Последняя точка маршрута (None - любая).
+
+    Returns:
+        List[int]: Порядок обхода точек.
+    """
+    count = len(matrix)
+    visited = np.zeros(count, dtype=bool)
+    visited[start] = True
+    if end is not None and end != start:
+        visited[end] = True
+    order = [start]
+    current = start
+    for _ in range(count - visited.sum()):
+        distances = np.where(visited, np.inf, matrix[current])
+        current = int(np.argmin(distances))
+        visited[current] = True
+        order.append(current)
+    if end is not None and end != start:
+        order.append(end)
+    return order
+
+
+def _two_opt_pass(matrix: np.ndarray, order: np.ndarray, lo: int, hi: int) -> bool:
+    """
+    Проход 2-opt: разворот участков order[i..j] при lo <= i < j < hi.
+
+    Returns:
+        bool: Маршрут улучшен.
+    """
+    improved = False
+    count = len(order)
+    for i in range(lo, hi - 1):
+        j = np.arange(i + 1, hi)
+        first = order[i]
+        last = order[j]
+        delta = np.zeros(len(j))
+        if i > 0:
+            prev = order[i - 1]
+            delta += matrix[prev, last] - matrix[prev, first]
+        inner = j < count - 1
+        following = order[np.minimum(j + 1, count - 1)]
+        delta += np.where(inner, matrix[first, following] - matrix[last, following], 0.0)
+        best = int(np.argmin(delta))
+        if delta[best] < -EPSILON:
+            order[i:j[best] + 1] = order[i:j[best] + 1][::-1].copy()
+            improved = True
+    return improved
+
+
+def _insertion_costs(matrix: np.ndarray, rest: np.ndarray, head: int, tail: int) -> np.ndarray:
+    """Прирост длины при вставке участка head..tail перед каждой позицией rest (и в конец)."""
+    count = len(rest)
+    costs = np.empty(count + 1)
+    costs[0] = matrix[tail, rest[0]] if count else 0.0
+    costs[count] = matrix[rest[-1], head] if count else 0.0
+    if count > 1:
+        left = rest[:-1]
+        right = rest[1:]
+        costs[1:count] = matrix[left, head] + matrix[tail, right] - matrix[left, right]
+    return costs
+
+
+def _or_opt_pass(matrix: np.ndarray, order: np.ndarray, lo: int,
+                 hi: int) -> Tuple[np.ndarray, bool]:
+    """
+    Проход Or-opt: перенос участков до OR_OPT_SEGMENT точек (в прямом
+    или обратном порядке) в лучшее место маршрута внутри [lo, hi).
+
+    Returns:
+        Tuple[np.ndarray, bool]: Новый порядок и признак улучшения.
+    """
+    improved = False
+    for length in range(1, OR_OPT_SEGMENT + 1):
+        i = lo
+        while i + length <= hi:
+            count = len(order)
+            segment = order[i:i + length]
+            rest = np.concatenate((order[:i], order[i + length:]))
+            # Выигрыш от удаления участка
+            gain = 0.0
+            if i > 0:
+                gain += matrix[order[i - 1], segment[0]]
+            if i + length < count:
+                gain += matrix[segment[-1], order[i + length]]
+            if 0 < i and i + length < count:
+                gain -= matrix[order[i - 1], order[i + length]]
+
+            # Допустимые позиции вставки: не раньше lo и не позже hi - length
+            positions = slice(lo, hi - length + 1)
+            forward = _insertion_costs(matrix, rest, segment[0], segment[-1])[positions]
+            backward = _insertion_costs(matrix, rest, segment[-1], segment[0])[positions]
+            best_forward = int(np.argmin(forward))
+            best_backward = int(np.argmin(backward))
+            if backward[best_backward] < forward[best_forward]:
+                cost, position, segment = backward[best_backward], best_backward, segment[::-1]
+            else:
+                cost, position = forward[best_forward], best_forward
+            position += lo
+
+            if cost - gain < -EPSILON:
+                order = np.concatenate((rest[:position], segment, rest[position:]))
+                improved = True
+            else:
+                i += 1
+    return order, improved
+
+
+def optimize_route(waypoints: Sequence[Tuple[float, float, float]], start: Optional[int] = 0,
+                   end: Optional[int] = None, max_iterations: int = 100,
+                   time_limit: Optional[float] = None) -> Tuple[List[int], float]:
+    """
+    Порядок обхода точек, близкий к кратчайшему.
+
+    Начальный маршрут строится методом ближайшего соседа и улучшается
+    проходами 2-opt и Or-opt, пока они сокращают маршрут и не исчерпан бюджет.
+
+    Args:
+        waypoints (Sequence[Tuple[float, float, float]]): Точки (lat, lon, alt).
+        start (Optional[int]): Индекс обязательной первой точки (None - любая).
+        end (Optional[int]): Индекс обязательной последней точки (None - любая).
+        max_iterations (int): Максимальное число проходов улучшения.
+        time_limit (Optional[float]): Ограничение времени улучшения в секундах.
+
+    Returns:
+        Tuple[List[int], float]: Порядок обхода и длина маршрута в метрах.
+    """
+    count = len(waypoints)
+    if count == 0:
+        return [], 0.0
+    if start is not None and end is not None and start == end and count > 1:
+        raise ValueError("Начальная и конечная точки совпадают")
+    started = time.monotonic()
+    matrix = distance_matrix(waypoints)
+
+    if start is None and end is not None:
+        # Маршрут строится от конца и разворачивается
+        order = np.array(nearest_neighbour(matrix, end)[::-1], dtype=np.intp)
+    else:
+        order = np.array(nearest_neighbour(matrix, start or 0, end), dtype=np.intp)
+    initial = route_length(matrix, order)
+
+    lo = 1 if start is not None else 0
+    hi = count - 1 if end is not None else count
+    for _ in range(max_iterations):
+        if time_limit is not None and time.monotonic() - started >= time_limit:
+            break
+        improved = _two_opt_pass(matrix, order, lo, hi)
+        order, moved = _or_opt_pass(matrix, order, lo, hi)
+        if not (improved or moved):
+            break
+
+    length = route_length(matrix, order)
+    logger.info(f"Маршрут из {count} точек: {initial:.0f} м -> {length:.0f} м")
+    return [int(index) for index in order], length
@@ -0,0 +1,113 @@
+# simplify.py
+
+from typing import List, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from route_optimizer import EARTH_RADIUS
+
+logger = logging.getLogger(__name__)
+
+
+def to_local(waypoints: Sequence[Tuple[float, float, float]]) -> np.ndarray:
+    """
+    Перевод точек в локальные метры относительно первой точки.
+
+    Args:
+        waypoints (Sequence[Tuple[float, float, float]]): Точки (lat, lon, alt).
+
+    Returns:
+        np.ndarray: Массив (N, 3): на восток, на север и высота, м.
+    """
+    points = np.asarray(waypoints, dtype=np.float64).reshape(-1, 3)
+    lat = np.radians(points[:, 0])
+    lon = np.radians(points[:, 1])
+    x = (lon - lon[0]) * EARTH_RADIUS * np.cos(lat[0])
+    y = (lat - lat[0]) * EARTH_RADIUS
+    return np.column_stack((x, y, points[:, 2]))
+
+
+def _segment_distances(points: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """
+    Расстояние от каждой точки до своего отрезка.
+
+    Координаты передаются по строкам (3, M): суммы по первой оси
+    быстрее, чем по короткой второй оси массива (M, 3).
+
+    Args:
+        points (np.ndarray): Точки (3, M) в метрах.
+        start (np.ndarray): Начала отрезков (3, M).
+        end (np.ndarray): Концы отрезков (3, M).
+
+    Returns:
+        np.ndarray: Расстояния (M,).
+    """
+    d = end - start
+    offset = points - start
+    length2 = (d ** 2).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(length2 > 0, (offset * d).sum(axis=0) / length2, 0.0)
+    offset -= np.clip(t, 0.0, 1.0) * d
+    return np.sqrt((offset ** 2).sum(axis=0))
+
+
+def simplify_route(waypoints: Sequence[Tuple[float, float, float]],
+                   tolerance: float) -> Tuple[List[int], float]:
+    """
+    Упрощение маршрута алгоритмом Дугласа - Пекера.
+
+    Отклонение считается в трёхмерном пространстве (метры по горизонтали
+    и высота), поэтому точки, задающие набор или снижение высоты,
+    сохраняются так же, как повороты. Все участки обрабатываются
+    одновременно: на каждом шаге для каждого участка с отклонением больше
+    tolerance сохраняется самая удалённая от него точка. Расстояния
+    пересчитываются только для точек разделённых участков, поэтому объём
+    работы на шаге уменьшается по мере упрощения.
+
+    Args:
+        waypoints (Sequence[Tuple[float, float, float]]): Точки (lat, lon, alt).
+        tolerance (float): Допустимое отклонение от исходного маршрута, м.
+
+    Returns:
+        Tuple[List[int], float]: Номера сохранённых точек и максимальное
+        отклонение удалённых точек от упрощённого маршрута, м.
+    """
+    if tolerance < 0:
+        raise ValueError("Допуск должен быть неотрицательным")
+    count = len(waypoints)
+    if count <= 2:
+        return list(range(count)), 0.0
+
+    points = to_local(waypoints).T.copy()
+    keep = np.zeros(count, dtype=bool)
+    keep[[0, -1]] = True
+    # Точки участков [kept[i], kept[i + 1]), которые ещё могут разделиться;
+    # каждый такой участок начинается своей сохранённой точкой
+    active = np.arange(count - 1)
+    deviation = 0.0
+    while active.size:
+        kept = np.flatnonzero(keep)
+        bounds = np.flatnonzero(keep[active])  # Начала участков в active
+        sizes = np.diff(bounds, append=len(active))
+        first = active[bounds]
+        last = kept[np.searchsorted(kept, first, side='right')]
+        # np.take и np.repeat заметно быстрее индексации points[:, index]
+        distances = _segment_distances(np.take(points, active, axis=1),
+                                       np.repeat(np.take(points, first, axis=1), sizes, axis=1),
+                                       np.repeat(np.take(points, last, axis=1), sizes, axis=1))
+        worst = np.maximum.reduceat(distances, bounds)
+        split = worst > tolerance
+        if not split.all():
+            deviation = max(deviation, float(worst[~split].max()))
+        selected = np.repeat(split, sizes)
+        candidates = np.flatnonzero(selected & (distances == np.repeat(worst, sizes)))
+        # Первая из равноудалённых точек участка
+        segment = np.searchsorted(bounds, candidates, side='right')
+        _, farthest = np.unique(segment, return_index=True)
+        keep[active[candidates[farthest]]] = True
+        active = active[selected]
+
+    kept = np.flatnonzero(keep)
+    logger.info(f"Маршрут упрощён: {count} -> {len(kept)} точек, отклонение {deviation:.2f} м")
+    return [int(index) for index in kept], deviation
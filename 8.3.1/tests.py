@@ -1,9 +1,18 @@
 # test_uav_control.py
 
+import itertools
+import math
+import threading
+import time
 import unittest
 from pymavlink import mavutil
 from unittest.mock import MagicMock, patch, call
-from mission_planner import MissionPlanner
+from mission_planner import MissionPlanner, haversine
+from geofence import Geofence, GeofenceBreach, Violation
+from fleet_scheduler import (DONE, FAILED, FLY, PENDING, FleetScheduler, RateLimitedUAV,
+                             TokenBucket, VehicleStatus)
+from simplify import simplify_route, to_local
+from route_optimizer import distance_matrix, nearest_neighbour, optimize_route, route_length
 from uav_control import UAVControl
 class TestUAVControl(unittest.TestCase):
     def setUp(self):
@@ -115,6 +124,22 @@ class TestUAVControl(unittest.TestCase):
 
         result = self.uav.wait_command_ack(mavutil.mavlink.MAV_CMD_NAV_TAKEOFF, timeout=1)
         self.assertFalse(result)
+    def test_recv_message(self):
+        # Проверка ожидания сообщения заданных типов
+        self.mock_master.recv_match.return_value = None
+
+        self.assertIsNone(self.uav.recv_message(['MISSION_CURRENT', 'VFR_HUD'], timeout=0.5))
+        self.mock_master.recv_match.assert_called_with(
+            type=['MISSION_CURRENT', 'VFR_HUD'], blocking=True, timeout=0.5)
+
+    def test_goto_into_geofence(self):
+        # Точка в запретной зоне отклоняется до отправки
+        self.uav.geofence = Geofence()
+        self.uav.geofence.add_cylinder('tower', 55.0, 37.0, 50)
+
+        with self.assertRaises(ValueError):
+            self.uav.goto(55.0, 37.0, 100.0)
+        self.mock_master.mav.mission_count_send.assert_not_called()
 
 # test_mission_planner.py
 class TestMissionPlanner(unittest.TestCase):
@@ -131,23 +156,30 @@ class TestMissionPlanner(unittest.TestCase):
         self.patcher.stop()
 
     def test_execute_mission_success(self):
-        # Тест успешного выполнения миссии
+        # Тест успешного выполнения миссии: переход к следующей точке по событиям
         waypoints = [
             (55.0, 37.0, 10.0),
             (55.0001, 37.0001, 20.0),
             (55.0002, 37.0002, 15.0)
         ]
 
-        # Настройка side_effect для get_telemetry
-        telemetry_data = iter([
-            {'lat': 55.0, 'lon': 37.0, 'alt': 10.0},
-            {'lat': 55.0001, 'lon': 37.0001, 'alt': 20.0},
-            {'lat': 55.0002, 'lon': 37.0002, 'alt': 15.0}
+        messages = iter([
+            # Набор высоты
+            position_msg(55.0, 37.0, 0.0),
+            position_msg(55.0, 37.0, 9.5),
+            # Точка 1 достигнута по позиции
+            position_msg(55.0, 37.0, 10.0),
+            # Точка 2 достигнута по MISSION_ITEM_REACHED
+            message('VFR_HUD', groundspeed=5.0),
+            position_msg(55.00008, 37.00008, 19.0),
+            message('MISSION_ITEM_REACHED', seq=0),
+            # Точка 3 достигнута по позиции в пределах допуска
+            position_msg(55.00019, 37.0002, 15.5),
         ])
+        self.mock_uav.recv_message.side_effect = lambda *args, **kwargs: next(messages, None)
 
-        self.mock_uav.get_telemetry.side_effect = lambda: next(telemetry_data, None)
-
-        self.planner.execute_mission(waypoints)
+        with patch('mission_planner.time.sleep') as mock_sleep:
+            self.planner.execute_mission(waypoints)
 
         self.mock_uav.arm.assert_called_once()
         self.mock_uav.set_mode.assert_any_call('GUIDED')
@@ -159,27 +191,467 @@ class TestMissionPlanner(unittest.TestCase):
 
         self.mock_uav.set_mode.assert_any_call('RTL')
         self.mock_uav.disarm.assert_called_once()
+        # Паузы только перед посадкой, не между точками
+        mock_sleep.assert_called_once()
+        self.assertEqual(next(messages, None), None)
 
     def test_execute_mission_failure(self):
         # Тест провала выполнения миссии из-за недостижения точки
         waypoints = [
-            (55.0, 37.0, 10.0),
-            (55.0001, 37.0001, 20.0)
+            (55.001, 37.0, 10.0),
+            (55.002, 37.0, 20.0)
         ]
 
-        # Настройка get_telemetry для возвращения неизменных координат
-        self.mock_uav.get_telemetry.return_value = {
-            'lat': 55.0,
-            'lon': 37.0,
-            'alt': 10.0
-        }
+        # Аппарат висит на месте, время идёт по секунде на сообщение
+        self.mock_uav.recv_message.return_value = position_msg(55.0, 37.0, 10.0)
 
-        with self.assertRaises(Exception) as context:
-            self.planner.execute_mission(waypoints)
+        with patch('mission_planner.time.monotonic', side_effect=itertools.count()):
+            with self.assertRaises(Exception) as context:
+                self.planner.execute_mission(waypoints)
 
         self.assertIn('Не удалось достичь точки 1', str(context.exception))
         self.mock_uav.disarm.assert_called_once()
 
+    def test_leg_timeout_depends_on_distance(self):
+        # Время на участок растёт с его длиной
+        self.planner.position = (55.0, 37.0, 10.0)
+        short_leg = self.planner.leg_timeout((55.0001, 37.0, 10.0))
+        long_leg = self.planner.leg_timeout((55.1, 37.0, 10.0))
+
+        self.assertEqual(short_leg, 10.0)
+        self.assertAlmostEqual(long_leg, 2 * 11119.5 / 5.0, delta=1.0)
+
+    def test_stale_reached_ignored(self):
+        # MISSION_ITEM_REACHED далеко от точки не завершает участок
+        messages = iter([
+            position_msg(55.0, 37.0, 10.0),
+            message('MISSION_ITEM_REACHED', seq=0),
+            position_msg(55.001, 37.0, 10.0),
+        ])
+        self.mock_uav.recv_message.side_effect = lambda *args, **kwargs: next(messages, None)
+
+        self.assertTrue(self.planner.wait_arrival((55.001, 37.0, 10.0)))
+        self.assertEqual(self.planner.position, (55.001, 37.0, 10.0))
+
+    def test_constant_mission_current_ignored(self):
+        # Постоянный MISSION_CURRENT без перехода seq -> seq + 1 в 15 м от точки
+        # не завершает участок
+        self.mock_uav.recv_message.return_value = message('MISSION_CURRENT', seq=1)
+        self.planner.position = (55.0, 37.0, 10.0)
+
+        with patch('mission_planner.time.monotonic', side_effect=itertools.count()):
+            self.assertFalse(self.planner.wait_arrival((55.000135, 37.0, 10.0)))
+
+    def test_mission_current_transition(self):
+        # Переход MISSION_CURRENT с seq на seq + 1 завершает участок,
+        # если высота в пределах допуска
+        messages = iter([
+            position_msg(55.0001, 37.0, 5.0),
+            message('MISSION_CURRENT', seq=0),
+            message('MISSION_CURRENT', seq=1),
+            position_msg(55.0001, 37.0, 10.0),
+            message('MISSION_CURRENT', seq=0),
+            message('MISSION_CURRENT', seq=1),
+        ])
+        self.mock_uav.recv_message.side_effect = lambda *args, **kwargs: next(messages, None)
+
+        self.assertTrue(self.planner.wait_arrival((55.0, 37.0, 10.0)))
+        self.assertEqual(next(messages, None), None)
+
+    def test_haversine(self):
+        # Один градус широты - около 111.2 км
+        self.assertAlmostEqual(haversine(55.0, 37.0, 56.0, 37.0), 111195, delta=1)
+        self.assertEqual(haversine(55.0, 37.0, 55.0, 37.0), 0.0)
+
+
+    def test_execute_mission_optimized(self):
+        # Точки облетаются в порядке, сокращающем маршрут; первая остаётся первой
+        waypoints = [(55.0, 37.0, 10.0), (55.002, 37.0, 10.0), (55.001, 37.0, 10.0)]
+        self.planner.wait_arrival = MagicMock(return_value=True)
+
+        with patch('mission_planner.time.sleep'):
+            self.planner.execute_mission(waypoints, optimize=True)
+
+        self.mock_uav.goto.assert_has_calls([call(*waypoints[0]), call(*waypoints[2]),
+                                             call(*waypoints[1])])
+
+
+# test_route_optimizer.py
+class TestRouteOptimizer(unittest.TestCase):
+    def setUp(self):
+        # Точки на одном меридиане в перемешанном порядке: оптимум - проход по прямой
+        latitudes = [55.0 + i * 0.001 for i in range(40)]
+        shuffled = latitudes[::2] + latitudes[1::2][::-1]
+        self.waypoints = [(lat, 37.0, 50.0) for lat in shuffled]
+        self.optimal = haversine(latitudes[0], 37.0, latitudes[-1], 37.0)
+
+    def test_distance_matrix(self):
+        # Матрица совпадает с формулой гаверсинуса и учитывает высоту
+        waypoints = [(55.0, 37.0, 10.0), (55.001, 37.002, 10.0), (55.0, 37.0, 40.0)]
+        matrix = distance_matrix(waypoints)
+
+        self.assertAlmostEqual(matrix[0, 1], haversine(55.0, 37.0, 55.001, 37.002), places=6)
+        self.assertAlmostEqual(matrix[0, 2], 30.0, places=6)
+        self.assertTrue((matrix == matrix.T).all())
+
+    def test_optimized_route_is_shorter(self):
+        # Оптимизация находит проход по прямой и не хуже ближайшего соседа
+        matrix = distance_matrix(self.waypoints)
+        seed = route_length(matrix, nearest_neighbour(matrix))
+
+        order, length = optimize_route(self.waypoints, start=None)
+
+        self.assertEqual(sorted(order), list(range(len(self.waypoints))))
+        self.assertLessEqual(length, seed)
+        self.assertAlmostEqual(length, self.optimal, delta=1e-6 * self.optimal)
+
+    def test_fixed_start_and_end(self):
+        # Заданные первая и последняя точки остаются на местах
+        order, _ = optimize_route(self.waypoints, start=5, end=7)
+
+        self.assertEqual(order[0], 5)
+        self.assertEqual(order[-1], 7)
+        self.assertEqual(sorted(order), list(range(len(self.waypoints))))
+
+        order, _ = optimize_route(self.waypoints, start=None, end=3)
+        self.assertEqual(order[-1], 3)
+
+    def test_budget(self):
+        # При нулевом бюджете возвращается начальный маршрут ближайшего соседа
+        matrix = distance_matrix(self.waypoints)
+        order, length = optimize_route(self.waypoints, time_limit=0)
+
+        self.assertEqual(order, nearest_neighbour(matrix))
+        self.assertAlmostEqual(length, route_length(matrix, order))
+
+    def test_trivial_routes(self):
+        # Пустой маршрут и маршрут из одной точки
+        self.assertEqual(optimize_route([]), ([], 0.0))
+        self.assertEqual(optimize_route([(55.0, 37.0, 10.0)]), ([0], 0.0))
+        with self.assertRaises(ValueError):
+            optimize_route(self.waypoints, start=1, end=1)
+
+
+# test_fleet_scheduler.py
+class TestFleetScheduler(unittest.TestCase):
+    def setUp(self):
+        # Каждый планировщик получает свой mock UAVControl
+        self.patchers = [
+            patch('mission_planner.UAVControl', side_effect=lambda conn: MagicMock()),
+            patch('mission_planner.LANDING_WAIT', 0),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        self.waypoints = [(55.0, 37.0, 10.0), (55.001, 37.0, 10.0), (55.002, 37.0, 10.0)]
+        self.uavs = {}
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def factory(self, leg_time=0.0):
+        # Планировщик, у которого каждый участок длится leg_time секунд
+        def make_planner(connection_string):
+            planner = MissionPlanner(connection_string)
+
+            def wait_arrival(waypoint, seq=0, horizontal=True):
+                time.sleep(leg_time)
+                return 'bad' not in connection_string
+
+            planner.wait_arrival = wait_arrival
+            with self.lock:
+                self.uavs[connection_string] = planner.uav
+            return planner
+        return make_planner
+
+    def test_run_fleet(self):
+        # Все миссии выполняются, сводка показывает достигнутые точки
+        scheduler = FleetScheduler(max_workers=4, rate=1000, burst=100,
+                                   planner_factory=self.factory())
+        for i in range(6):
+            scheduler.add(f'uav{i}', f'udp:127.0.0.1:{14550 + i}', self.waypoints)
+        self.assertEqual(scheduler.progress()['states'][PENDING], 6)
+
+        result = scheduler.run()
+
+        self.assertTrue(all(status['state'] == DONE for status in result.values()))
+        progress = scheduler.progress()
+        self.assertEqual(progress['states'][DONE], 6)
+        self.assertEqual((progress['reached'], progress['total']), (18, 18))
+        self.assertEqual(progress['done'], 1.0)
+        uav = self.uavs['udp:127.0.0.1:14550']
+        self.assertEqual(uav.goto.call_count, 3)
+        uav.set_mode.assert_called_with('RTL')
+
+    def test_failed_vehicle_does_not_stop_fleet(self):
+        # Ошибка одного аппарата не влияет на остальные
+        scheduler = FleetScheduler(rate=1000, burst=100, planner_factory=self.factory())
+        scheduler.add('good', 'udp:good', self.waypoints)
+        scheduler.add('bad', 'udp:bad', self.waypoints)
+
+        result = scheduler.run()
+
+        self.assertEqual(result['good']['state'], DONE)
+        self.assertEqual(result['bad']['state'], FAILED)
+        self.assertIn('Не удалось набрать высоту', result['bad']['error'])
+        self.uavs['udp:bad'].disarm.assert_called_once()
+
+    def test_missions_run_concurrently(self):
+        # Восемь аппаратов при восьми потоках летают не дольше двух последовательных миссий
+        scheduler = FleetScheduler(max_workers=8, rate=1000, burst=100,
+                                   planner_factory=self.factory(leg_time=0.05))
+        for i in range(8):
+            scheduler.add(f'uav{i}', f'udp:{i}', self.waypoints)
+
+        started = time.monotonic()
+        scheduler.run()
+        elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 2 * 4 * 0.05 + 0.2)
+
+    def test_default_runs_whole_fleet_at_once(self):
+        # Без предела потоков двенадцать аппаратов летают одновременно, а не волнами
+        scheduler = FleetScheduler(rate=1000, burst=100, planner_factory=self.factory(leg_time=0.05))
+        for i in range(12):
+            scheduler.add(f'uav{i}', f'udp:{i}', self.waypoints)
+
+        started = time.monotonic()
+        result = scheduler.run()
+        elapsed = time.monotonic() - started
+
+        self.assertTrue(all(status['state'] == DONE for status in result.values()))
+        self.assertLess(elapsed, 2 * 4 * 0.05 + 0.2)
+
+    def test_missions_beyond_max_workers_queue(self):
+        # При заданном пределе лишние миссии ждут свободного потока
+        scheduler = FleetScheduler(max_workers=2, rate=1000, burst=100,
+                                   planner_factory=self.factory(leg_time=0.1))
+        for i in range(4):
+            scheduler.add(f'uav{i}', f'udp:{i}', self.waypoints)
+
+        scheduler.start()
+        time.sleep(0.05)
+        self.assertEqual(scheduler.progress()['states'][PENDING], 2)
+        self.assertTrue(scheduler.wait(timeout=10))
+        self.assertEqual(scheduler.progress()['states'][DONE], 4)
+        with self.assertRaises(ValueError):
+            FleetScheduler(max_workers=0)
+
+    def test_rate_limit_shared_by_fleet(self):
+        # Команды всех аппаратов проходят через одну корзину токенов
+        scheduler = FleetScheduler(max_workers=4, rate=100, burst=1,
+                                   planner_factory=self.factory())
+        for i in range(4):
+            scheduler.add(f'uav{i}', f'udp:{i}', self.waypoints)
+
+        started = time.monotonic()
+        scheduler.run()
+
+        # 4 аппарата по 7 команд (arm, set_mode, takeoff, 3 goto, disarm); RTL без токена
+        self.assertGreaterEqual(time.monotonic() - started, 27 / 100)
+
+    def test_rtl_bypasses_rate_limit(self):
+        # Возврат домой не ждёт токена, остальные команды ждут
+        bucket = TokenBucket(rate=1, burst=1)
+        uav = RateLimitedUAV(MagicMock(), bucket)
+        bucket.acquire()
+
+        started = time.monotonic()
+        uav.set_mode('RTL')
+        self.assertLess(time.monotonic() - started, 0.1)
+        uav._uav.set_mode.assert_called_once_with('RTL')
+
+        uav.set_mode('GUIDED')
+        self.assertGreaterEqual(time.monotonic() - started, 0.9)
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=50, burst=2)
+        started = time.monotonic()
+        for _ in range(7):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 5 / 50 - 0.01)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+    def test_state_machine(self):
+        # Пропуск этапов запрещён, переход в FAILED - из любого незавершённого
+        status = VehicleStatus('uav', 3)
+        with self.assertRaises(RuntimeError):
+            status.transition(FLY)
+        status.transition('upload')
+        status.transition(FAILED)
+        with self.assertRaises(RuntimeError):
+            status.transition(FAILED)
+
+    def test_duplicate_vehicle(self):
+        scheduler = FleetScheduler()
+        scheduler.add('uav', 'udp:1', self.waypoints)
+        with self.assertRaises(ValueError):
+            scheduler.add('uav', 'udp:2', self.waypoints)
+
+
+# test_geofence.py
+class TestGeofence(unittest.TestCase):
+    def setUp(self):
+        self.geofence = Geofence()
+        # Квадрат около 111 x 64 м до высоты 120 м и цилиндр радиусом 100 м
+        self.geofence.add_polygon('field', [(55.0, 37.0), (55.001, 37.0), (55.001, 37.001),
+                                            (55.0, 37.001)], max_alt=120)
+        self.geofence.add_cylinder('tower', 55.01, 37.0, 100)
+
+    def test_check(self):
+        self.assertEqual(self.geofence.check(55.0005, 37.0005, 50), 'field')
+        self.assertIsNone(self.geofence.check(55.0005, 37.0005, 150))  # Выше зоны
+        self.assertIsNone(self.geofence.check(55.0005, 37.0015, 50))
+        self.assertEqual(self.geofence.check(55.0105, 37.0, 500), 'tower')  # ~56 м от центра
+        self.assertIsNone(self.geofence.check(55.0110, 37.0, 50))  # ~111 м от центра
+
+    def test_validate_mission(self):
+        # Точка внутри зоны и участок, пересекающий зону между точками вне её
+        waypoints = [
+            (54.999, 37.0005, 50),
+            (55.002, 37.0005, 50),  # Участок 0 проходит через 'field'
+            (55.0005, 37.0005, 50),  # Точка 2 внутри 'field'
+            (55.0005, 37.0005, 150),  # Над зоной; участок 2 задевает её по высоте
+            (55.0005, 37.003, 150),
+        ]
+
+        violations = self.geofence.validate_mission(waypoints)
+
+        self.assertEqual(violations, [
+            Violation(0, 'field', 'leg'),
+            Violation(1, 'field', 'leg'),
+            Violation(2, 'field', 'leg'),
+            Violation(2, 'field', 'waypoint'),
+        ])
+        self.assertEqual(self.geofence.validate_mission([(55.02, 37.0, 50), (55.02, 37.01, 50)]), [])
+
+    def test_leg_through_cylinder(self):
+        # Участок проходит рядом с центром цилиндра, обе точки далеко
+        violations = self.geofence.validate_mission([(55.01, 36.99, 50), (55.01, 37.01, 50)])
+        self.assertEqual(violations, [Violation(0, 'tower', 'leg')])
+
+    def test_check_many_zones(self):
+        # Проверка позиции среди тысяч зон занимает микросекунды
+        geofence = Geofence(origin=(55.0, 37.0))
+        for i in range(50):
+            for j in range(50):
+                lat, lon = 55.0 + i * 0.01, 37.0 + j * 0.01
+                geofence.add_polygon(f'zone{i}_{j}', [(lat, lon), (lat + 0.003, lon),
+                                                      (lat + 0.003, lon + 0.003), (lat, lon + 0.003)])
+        self.assertEqual(geofence.check(55.0115, 37.0215, 10), 'zone1_2')
+
+        started = time.perf_counter()
+        for k in range(10000):
+            geofence.check(55.0 + k * 4e-5, 37.0 + k * 3e-5, 10)
+        self.assertLess((time.perf_counter() - started) / 10000, 50e-6)
+
+    def test_invalid_zones(self):
+        with self.assertRaises(ValueError):
+            self.geofence.add_polygon('line', [(55.0, 37.0), (55.1, 37.0)])
+        with self.assertRaises(ValueError):
+            self.geofence.add_cylinder('point', 55.0, 37.0, 0)
+
+    def test_mission_rejected_before_arming(self):
+        with patch('mission_planner.UAVControl'):
+            planner = MissionPlanner('udp:127.0.0.1:14550', geofence=self.geofence)
+        with self.assertRaises(ValueError):
+            planner.execute_mission([(55.0005, 37.0005, 50)])
+        planner.uav.arm.assert_not_called()
+
+    def test_breach_triggers_rtl(self):
+        # Вход в зону в полёте: RTL сразу, без разоружения в воздухе
+        with patch('mission_planner.UAVControl'):
+            planner = MissionPlanner('udp:127.0.0.1:14550', geofence=self.geofence)
+        messages = iter([position_msg(54.999, 37.0005, 50), position_msg(55.0001, 37.0005, 50)])
+        planner.uav.recv_message.side_effect = lambda *args, **kwargs: next(messages, None)
+
+        with self.assertRaises(GeofenceBreach):
+            planner.execute_mission([(54.999, 37.0005, 50), (54.999, 37.003, 50)])
+
+        planner.uav.set_mode.assert_called_with('RTL')
+        planner.uav.disarm.assert_not_called()
+
+
+# test_simplify.py
+class TestSimplify(unittest.TestCase):
+    def test_collinear_points_removed(self):
+        # Точки на прямой с постоянным набором высоты сводятся к концам
+        waypoints = [(55.0 + i * 1e-5, 37.0, 10.0 + i * 0.1) for i in range(1000)]
+
+        kept, deviation = simplify_route(waypoints, tolerance=0.5)
+
+        self.assertEqual(kept, [0, 999])
+        self.assertLess(deviation, 0.5)
+
+    def test_corners_and_altitude_kept(self):
+        # Поворот и ступенька высоты сохраняются, промежуточные точки - нет
+        leg1 = [(55.0 + i * 1e-4, 37.0, 20.0) for i in range(11)]
+        leg2 = [(55.001, 37.0 + i * 1e-4, 20.0) for i in range(1, 11)]
+        leg3 = [(55.001, 37.001 + i * 1e-4, 40.0) for i in range(1, 11)]
+
+        kept, _ = simplify_route(leg1 + leg2 + leg3, tolerance=1.0)
+
+        self.assertEqual(kept, [0, 10, 20, 21, 30])
+
+    def test_deviation_within_tolerance(self):
+        # Отклонение удалённых точек не превышает допуска и считается честно
+        t = [i / 2000 for i in range(2001)]
+        waypoints = [(55.75 + 0.02 * x, 48.74 + 0.01 * math.sin(6 * x), 50 + 20 * x) for x in t]
+
+        kept, deviation = simplify_route(waypoints, tolerance=2.0)
+        self.assertLess(len(kept), 100)
+        self.assertLessEqual(deviation, 2.0)
+
+        # Проверка отклонения независимым расчётом для каждой удалённой точки
+        points = to_local(waypoints)
+        worst = 0.0
+        for a, b in zip(kept[:-1], kept[1:]):
+            d = points[b] - points[a]
+            for i in range(a + 1, b):
+                u = max(0.0, min(1.0, float((points[i] - points[a]) @ d / (d @ d))))
+                worst = max(worst, float(((points[a] + u * d - points[i]) ** 2).sum() ** 0.5))
+        self.assertAlmostEqual(deviation, worst, places=6)
+
+    def test_short_routes(self):
+        self.assertEqual(simplify_route([], 1.0), ([], 0.0))
+        self.assertEqual(simplify_route([(55.0, 37.0, 10.0)] * 2, 1.0), ([0, 1], 0.0))
+        with self.assertRaises(ValueError):
+            simplify_route([(55.0, 37.0, 10.0)] * 3, -1.0)
+
+    def test_zero_tolerance_terminates(self):
+        # Ошибка округления в последней точке не выбирает её повторно
+        waypoints = [(54.9999, 36.9998, 7.0288), (55.0001, 36.9998, 2.0518),
+                     (55.0003, 36.9998, 0.8515)]
+
+        self.assertEqual(simplify_route(waypoints, 0.0), ([0, 1, 2], 0.0))
+
+    def test_execute_mission_simplified(self):
+        # Плотный трек облетается по упрощённому маршруту
+        with patch('mission_planner.UAVControl'):
+            planner = MissionPlanner('udp:127.0.0.1:14550')
+        planner.wait_arrival = MagicMock(return_value=True)
+        waypoints = [(55.0 + i * 1e-5, 37.0, 10.0) for i in range(500)]
+
+        with patch('mission_planner.LANDING_WAIT', 0):
+            planner.execute_mission(waypoints, tolerance=1.0)
+
+        planner.uav.goto.assert_has_calls([call(*waypoints[0]), call(*waypoints[-1])])
+        self.assertEqual(planner.uav.goto.call_count, 2)
+
+def message(msg_type, **fields):
+    # Сообщение MAVLink-заглушка
+    msg = MagicMock(**fields)
+    msg.get_type.return_value = msg_type
+    return msg
+
+
+def position_msg(lat, lon, alt):
+    # GLOBAL_POSITION_INT с высотой относительно точки взлёта
+    return message('GLOBAL_POSITION_INT', lat=int(round(lat * 1e7)), lon=int(round(lon * 1e7)),
+                   relative_alt=int(alt * 1000))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -3,7 +3,7 @@
 from pymavlink import mavutil
 import time
 import math
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -15,6 +15,9 @@ class UAVControl:
     Класс для управления БПЛА через MAVLink.
     """
 
+    # Запретные зоны (geofence.Geofence); None - цели goto не проверяются
+    geofence: Optional[Any] = None
+
     def __init__(self, connection_string: str):
         """
         Инициализация подключения к БПЛА.
@@ -155,6 +158,19 @@ class UAVControl:
             logger.error(f"Ошибка получения телеметрии: {e}")
             return None
 
+    def recv_message(self, msg_types: Union[str, List[str]], timeout: float = 1) -> Optional[Any]:
+        """
+        Ожидание следующего сообщения заданных типов.
+
+        Args:
+            msg_types (Union[str, List[str]]): Тип или список типов сообщений MAVLink.
+            timeout (float): Время ожидания в секундах.
+
+        Returns:
+            Optional[Any]: Сообщение или None по таймауту.
+        """
+        return self.master.recv_match(type=msg_types, blocking=True, timeout=timeout)
+
     def wait_command_ack(self, command: int, timeout: int = 10) -> bool:
         """
         Ожидание подтверждения выполнения команды.
@@ -188,6 +204,11 @@ class UAVControl:
             lon (float): Долгота целевой точки.
             alt (float): Высота целевой точки в метрах.
         """
+        if self.geofence is not None:
+            zone = self.geofence.check(lat, lon, alt)
+            if zone is not None:
+                raise ValueError(f"Точка ({lat}, {lon}, {alt}) в запретной зоне {zone}")
+
         try:
             # Отправка количества миссий (1 пункт)
             self.master.mav.mission_count_send(
@@ -0,0 +1,175 @@
+"""
+Распределение COMMAND_ACK по ожидающим командам через Future.
+"""
+
+import threading
+import time
+import logging
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, NamedTuple, Optional, Tuple
+
+from pymavlink import mavutil
+
+logger = logging.getLogger(__name__)
+
+# Число последних задержек, хранимых по каждой команде
+LATENCY_HISTORY = 100
+
+
+class CommandAck(NamedTuple):
+    """Результат выполнения команды."""
+    command: int
+    result: int
+    latency: float  # Время от регистрации команды до подтверждения, с
+
+    @property
+    def accepted(self) -> bool:
+        """Команда принята автопилотом."""
+        return self.result == mavutil.mavlink.MAV_RESULT_ACCEPTED
+
+
+class _Pending(NamedTuple):
+    future: Future
+    sent_at: float
+
+
+class AckDispatcher:
+    """
+    Сопоставление входящих COMMAND_ACK с ожидающими командами.
+
+    Команда регистрируется до отправки (register), и подтверждение,
+    пришедшее в любой момент после этого, завершает её Future. Одновременно
+    может ожидаться несколько команд; остальной трафик не теряется, так как
+    сообщения читает TelemetryReader, а диспетчер лишь подписан на них.
+    """
+
+    def __init__(self, reader: Any = None):
+        """
+        Args:
+            reader: TelemetryReader, на сообщения которого подписывается
+                диспетчер; без него сообщения передаются в handle вручную.
+        """
+        self._pending: Dict[Tuple[int, Optional[int]], Deque[_Pending]] = defaultdict(deque)
+        self._expected: Dict[Tuple[int, Optional[int]], Deque[Future]] = defaultdict(deque)
+        self._latencies: Dict[int, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=LATENCY_HISTORY))
+        self._lock = threading.Lock()
+        if reader is not None:
+            reader.subscribe(self.handle)
+
+    def register(self, command: int, target_system: Optional[int] = None) -> Future:
+        """
+        Регистрация ожидаемого подтверждения (вызывать до отправки команды).
+
+        Args:
+            command (int): Код команды MAVLink.
+            target_system (Optional[int]): Система-получатель команды;
+                None - подтверждение принимается от любой системы.
+
+        Returns:
+            Future: Завершается значением CommandAck.
+        """
+        future: Future = Future()
+        with self._lock:
+            self._pending[(command, target_system)].append(_Pending(future, time.monotonic()))
+        return future
+
+    def expect(self, command: int, target_system: Optional[int] = None) -> Future:
+        """
+        Регистрация подтверждения, которое затем заберёт claim.
+
+        Позволяет отправить команду и ждать её подтверждения в разных местах
+        кода без потери ответа, пришедшего между ними. Если ожидание
+        не состоялось, future нужно отменить через discard.
+
+        Returns:
+            Future: Завершается значением CommandAck.
+        """
+        future = self.register(command, target_system)
+        with self._lock:
+            self._expected[(command, target_system)].append(future)
+        return future
+
+    def claim(self, command: int, target_system: Optional[int] = None) -> Future:
+        """
+        Future ранее ожидаемой (expect) команды или новая регистрация.
+
+        Returns:
+            Future: Завершается значением CommandAck.
+        """
+        with self._lock:
+            expected = self._expected.get((command, target_system))
+            if expected:
+                future = expected.popleft()
+                if not expected:
+                    del self._expected[(command, target_system)]
+                return future
+        return self.register(command, target_system)
+
+    def discard(self, future: Future) -> None:
+        """Отмена ожидания (например, по таймауту)."""
+        with self._lock:
+            for key, expected in list(self._expected.items()):
+                if future in expected:
+                    expected.remove(future)
+                    if not expected:
+                        del self._expected[key]
+            for key, entries in list(self._pending.items()):
+                for entry in entries:
+                    if entry.future is future:
+                        entries.remove(entry)
+                        if not entries:
+                            del self._pending[key]
+                        future.cancel()
+                        return
+
+    def handle(self, msg: Any) -> None:
+        """
+        Обработка входящего сообщения; все типы, кроме COMMAND_ACK, игнорируются.
+
+        Args:
+            msg: Сообщение MAVLink.
+        """
+        if msg.get_type() != 'COMMAND_ACK':
+            return
+        if msg.result == mavutil.mavlink.MAV_RESULT_IN_PROGRESS:
+            return  # Промежуточный ответ длительной команды
+        now = time.monotonic()
+        with self._lock:
+            # Сначала ожидание от конкретной системы, затем от любой
+            for key in ((msg.command, msg.get_srcSystem()), (msg.command, None)):
+                entries = self._pending.get(key)
+                if entries:
+                    entry = entries.popleft()
+                    if not entries:
+                        del self._pending[key]
+                    break
+            else:
+                logger.debug("Неожиданное подтверждение команды %s", msg.command)
+                return
+            latency = now - entry.sent_at
+            self._latencies[msg.command].append(latency)
+        entry.future.set_result(CommandAck(msg.command, msg.result, latency))
+
+    def pending_count(self) -> int:
+        """Число команд, ожидающих подтверждения."""
+        with self._lock:
+            return sum(len(entries) for entries in self._pending.values())
+
+    def latency_stats(self) -> Dict[int, Dict[str, float]]:
+        """
+        Returns:
+            Dict[int, Dict[str, float]]: Для каждой команды - count, min,
+            mean, max задержки подтверждения (с) по последним LATENCY_HISTORY.
+        """
+        with self._lock:
+            return {
+                command: {
+                    'count': len(values),
+                    'min': min(values),
+                    'mean': sum(values) / len(values),
+                    'max': max(values),
+                }
+                for command, values in self._latencies.items() if values
+            }
@@ -0,0 +1,406 @@
+"""
+Асинхронное управление БПЛА через MAVLink (asyncio).
+
+Все аппараты обслуживаются одним циклом событий: вместо блокирующих
+recv_match и time.sleep используются неблокирующие транспорты UDP/TCP
+и Future, которые завершаются при получении нужного сообщения.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymavlink import mavutil
+
+from ack_dispatcher import CommandAck
+from telemetry_reader import parse_telemetry
+
+logger = logging.getLogger(__name__)
+
+ACK_TIMEOUT = 3  # Время ожидания подтверждения одной попытки, с
+ACK_RETRIES = 2  # Число повторных отправок команды без подтверждения
+STATE_TIMEOUT = 10  # Время ожидания смены состояния (армирование, режим), с
+
+_Waiter = Tuple[str, Optional[Callable[[Any], bool]], 'asyncio.Future[Any]']
+
+
+def parse_address(connection_string: str) -> Tuple[str, str, int]:
+    """
+    Разбор строки подключения в формате mavutil.
+
+    Поддерживаются 'udpin:host:port' (или 'udp:'), 'udpout:host:port'
+    и 'tcp:host:port'.
+
+    Returns:
+        Tuple[str, str, int]: Тип транспорта, адрес и порт.
+    """
+    try:
+        kind, host, port = connection_string.split(':')
+        port_number = int(port)
+    except ValueError as e:
+        raise ValueError(f"Некорректная строка подключения: {connection_string}") from e
+    kind = 'udpin' if kind == 'udp' else kind
+    if kind not in ('udpin', 'udpout', 'tcp'):
+        raise ValueError(f"Неподдерживаемый транспорт: {kind}")
+    return kind, host, port_number
+
+
+class _MavlinkProtocol(asyncio.Protocol, asyncio.DatagramProtocol):
+    """Транспорт asyncio, передающий принятые байты в AsyncUAVControl."""
+
+    def __init__(self, datagram: bool):
+        """
+        Args:
+            datagram (bool): UDP (True) или TCP (False).
+        """
+        self.datagram = datagram
+        self.owner: Any = None  # AsyncUAVControl, получающий данные
+        self.transport: Any = None
+        self.peer: Optional[Tuple[str, int]] = None  # Адрес аппарата для udpin
+
+    def connection_made(self, transport: Any) -> None:
+        self.transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        self.owner.feed(data)
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        self.peer = addr
+        self.owner.feed(data)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if exc is not None:
+            logger.warning("Соединение потеряно: %s", exc)
+
+    def write(self, data: bytes) -> None:
+        """Отправка пакета (вызывается кодеком MAVLink)."""
+        if self.transport is None or self.transport.is_closing():
+            return
+        if self.datagram:
+            if self.peer is not None:
+                self.transport.sendto(data, self.peer)
+            elif self.transport.get_extra_info('peername') is not None:
+                self.transport.sendto(data)
+            # udpin до первого пакета от аппарата: адрес получателя неизвестен
+        else:
+            self.transport.write(data)
+
+
+class AsyncUAVControl:
+    """
+    Асинхронный аналог UAVControl.
+
+    Экземпляр создаётся через connect(); одновременно в одном процессе
+    могут работать сотни экземпляров без отдельных потоков.
+    """
+
+    def __init__(self, protocol: _MavlinkProtocol, source_system: int = 255):
+        """
+        Args:
+            protocol: Транспорт, созданный connect().
+            source_system (int): Идентификатор системы наземной станции.
+        """
+        self.protocol = protocol
+        protocol.owner = self
+        self.mav = mavutil.mavlink.MAVLink(protocol, srcSystem=source_system)
+        self.mav.robust_parsing = True
+        self.target_system = 1
+        self.target_component = 1
+        self.vehicle_type: Optional[int] = None
+        self.base_mode = 0
+        self.custom_mode: Optional[int] = None
+        self.seq = 0  # Последовательный номер пункта миссии
+        self._telemetry: Dict[str, float] = {}
+        self._messages: Dict[str, Any] = {}
+        self._waiters: List[_Waiter] = []
+
+    @classmethod
+    async def connect(cls, connection_string: str, source_system: int = 255,
+                      timeout: float = 10) -> 'AsyncUAVControl':
+        """
+        Подключение к БПЛА и ожидание первого HEARTBEAT.
+
+        Args:
+            connection_string (str): Строка подключения ('udpin:0.0.0.0:14550',
+                'udpout:127.0.0.1:14550', 'tcp:127.0.0.1:5760').
+            source_system (int): Идентификатор системы наземной станции.
+            timeout (float): Время ожидания HEARTBEAT, с.
+        """
+        loop = asyncio.get_running_loop()
+        uav = None
+        try:
+            kind, host, port = parse_address(connection_string)
+            protocol = _MavlinkProtocol(datagram=kind != 'tcp')
+            uav = cls(protocol, source_system)
+            if kind == 'tcp':
+                await loop.create_connection(lambda: protocol, host, port)
+            elif kind == 'udpout':
+                await loop.create_datagram_endpoint(lambda: protocol, remote_addr=(host, port))
+                # Аппарат узнаёт адрес станции по первому пакету
+                uav.send_heartbeat()
+            else:
+                await loop.create_datagram_endpoint(lambda: protocol, local_addr=(host, port))
+            await uav.wait_heartbeat(timeout)
+            logger.info("Соединение установлено: %s", connection_string)
+            return uav
+        except Exception as e:
+            if uav is not None:
+                uav.close()
+            logger.error("Ошибка подключения: %s", e)
+            raise ConnectionError(f"Failed to connect to UAV: {e}") from e
+
+    def close(self) -> None:
+        """Закрытие транспорта и отмена всех ожиданий."""
+        if self.protocol.transport is not None:
+            self.protocol.transport.close()
+        for _, _, future in self._waiters:
+            future.cancel()
+        self._waiters.clear()
+
+    def feed(self, data: bytes) -> None:
+        """Разбор принятых байтов и обработка сообщений."""
+        for msg in self.mav.parse_buffer(data) or ():
+            self.handle(msg)
+
+    def handle(self, msg: Any) -> None:
+        """
+        Обработка одного сообщения: кэш телеметрии, состояние и ожидающие Future.
+
+        Args:
+            msg: Сообщение MAVLink.
+        """
+        msg_type = msg.get_type()
+        if msg_type == 'BAD_DATA':
+            return
+        if msg_type == 'HEARTBEAT' and msg.type != mavutil.mavlink.MAV_TYPE_GCS:
+            self.target_system = msg.get_srcSystem()
+            self.target_component = msg.get_srcComponent()
+            self.vehicle_type = msg.type
+            self.base_mode = msg.base_mode
+            self.custom_mode = msg.custom_mode
+        try:
+            self._telemetry.update(parse_telemetry(msg))
+        except ValueError as e:
+            logger.warning("Ошибка в телеметрии: %s", e)
+        self._messages[msg_type] = msg
+
+        for waiter in list(self._waiters):
+            waiter_type, condition, future = waiter
+            if (waiter_type == msg_type and not future.done()
+                    and (condition is None or condition(msg))):
+                future.set_result(msg)
+                self._waiters.remove(waiter)
+
+    def expect(self, msg_type: str,
+               condition: Optional[Callable[[Any], bool]] = None) -> 'asyncio.Future[Any]':
+        """
+        Регистрация ожидания сообщения (до отправки запроса).
+
+        Returns:
+            asyncio.Future: Завершается первым подходящим сообщением.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((msg_type, condition, future))
+        return future
+
+    async def wait_for(self, future: 'asyncio.Future[Any]', timeout: float) -> Optional[Any]:
+        """Ожидание зарегистрированного сообщения; None по таймауту."""
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._waiters = [waiter for waiter in self._waiters if waiter[2] is not future]
+            return None
+
+    async def wait_message(self, msg_type: str,
+                           condition: Optional[Callable[[Any], bool]] = None,
+                           timeout: float = 5) -> Optional[Any]:
+        """Ожидание нового сообщения заданного типа; None по таймауту."""
+        return await self.wait_for(self.expect(msg_type, condition), timeout)
+
+    async def wait_heartbeat(self, timeout: float = 10) -> None:
+        """Ожидание HEARTBEAT от аппарата."""
+        msg = await self.wait_message(
+            'HEARTBEAT', lambda m: m.type != mavutil.mavlink.MAV_TYPE_GCS, timeout)
+        if msg is None:
+            raise TimeoutError("Нет HEARTBEAT от БПЛА")
+
+    def send_heartbeat(self) -> None:
+        """Отправка HEARTBEAT наземной станции."""
+        self.mav.heartbeat_send(mavutil.mavlink.MAV_TYPE_GCS,
+                                mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0)
+
+    @property
+    def armed(self) -> bool:
+        """Состояние армирования по последнему HEARTBEAT."""
+        return bool(self.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED)
+
+    async def send_command(self, command: int, *params: float, timeout: float = ACK_TIMEOUT,
+                           retries: int = ACK_RETRIES) -> Optional[CommandAck]:
+        """
+        Отправка COMMAND_LONG с ожиданием подтверждения и повторами.
+
+        Args:
+            command (int): Код команды MAVLink.
+            *params (float): До семи параметров команды (недостающие - 0).
+            timeout (float): Время ожидания подтверждения одной попытки, с.
+            retries (int): Число повторных отправок.
+
+        Returns:
+            Optional[CommandAck]: Результат с задержкой подтверждения или None.
+        """
+        loop = asyncio.get_running_loop()
+        values = list(params) + [0] * (7 - len(params))
+        for confirmation in range(retries + 1):
+            future = self.expect(
+                'COMMAND_ACK',
+                lambda m: (m.command == command
+                           and m.result != mavutil.mavlink.MAV_RESULT_IN_PROGRESS))
+            sent_at = loop.time()
+            self.mav.command_long_send(self.target_system, self.target_component,
+                                       command, confirmation, *values)
+            msg = await self.wait_for(future, timeout)
+            if msg is not None:
+                return CommandAck(command, msg.result, loop.time() - sent_at)
+            logger.warning("Нет подтверждения команды %s, попытка %s", command,
+                           confirmation + 1)
+        return None
+
+    async def _command(self, command: int, *params: float) -> None:
+        ack = await self.send_command(command, *params)
+        if ack is None:
+            raise RuntimeError(f"Команда {command} не подтверждена")
+        if not ack.accepted:
+            raise RuntimeError(f"Команда {command} отклонена с кодом {ack.result}")
+
+    async def _wait_state(self, condition: Callable[[], bool], timeout: float) -> None:
+        if condition():
+            return
+        msg = await self.wait_message('HEARTBEAT', lambda m: condition(), timeout)
+        if msg is None:
+            raise TimeoutError("Состояние БПЛА не изменилось")
+
+    async def arm(self) -> None:
+        """Arm БПЛА для начала работы двигателей."""
+        try:
+            await self._command(mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 1)
+            await self._wait_state(lambda: self.armed, STATE_TIMEOUT)
+            logger.info("БПЛА армирован")
+        except Exception as e:
+            logger.error("Ошибка армирования БПЛА: %s", e)
+            raise RuntimeError(f"Failed to arm UAV: {e}") from e
+
+    async def disarm(self) -> None:
+        """Disarm БПЛА для остановки двигателей."""
+        try:
+            await self._command(mavutil.mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 0)
+            await self._wait_state(lambda: not self.armed, STATE_TIMEOUT)
+            logger.info("БПЛА disarmed")
+        except Exception as e:
+            logger.error("Ошибка disarm БПЛА: %s", e)
+            raise RuntimeError(f"Failed to disarm UAV: {e}") from e
+
+    def mode_mapping(self) -> Dict[str, int]:
+        """Соответствие названий режимов номерам для типа аппарата."""
+        if self.vehicle_type is None:
+            return {}
+        return mavutil.mode_mapping_byname(self.vehicle_type) or {}
+
+    async def set_mode(self, mode: str) -> None:
+        """
+        Установка режима полёта БПЛА.
+
+        Args:
+            mode (str): Название режима (например, 'GUIDED', 'LAND').
+        """
+        mode_id = self.mode_mapping().get(mode)
+        if mode_id is None:
+            raise ValueError(f"Неизвестный режим: {mode}")
+        try:
+            await self._command(mavutil.mavlink.MAV_CMD_DO_SET_MODE,
+                                mavutil.mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED, mode_id)
+            await self._wait_state(lambda: self.custom_mode == mode_id, STATE_TIMEOUT)
+            logger.info("Режим установлен: %s", mode)
+        except Exception as e:
+            logger.error("Ошибка установки режима %s: %s", mode, e)
+            raise RuntimeError(f"Failed to set mode {mode}: {e}") from e
+
+    async def takeoff(self, altitude: float) -> None:
+        """
+        Команда на взлёт до заданной высоты.
+
+        Args:
+            altitude (float): Целевая высота взлёта в метрах.
+        """
+        if altitude <= 0:
+            raise ValueError("Высота должна быть положительной")
+        try:
+            await self.set_mode('GUIDED')
+            await self.arm()
+            msg = self._messages.get('GLOBAL_POSITION_INT')
+            if msg is None:
+                msg = await self.wait_message('GLOBAL_POSITION_INT', timeout=5)
+            if msg is None:
+                raise RuntimeError("Не удалось получить текущие координаты для взлёта")
+            await self._command(mavutil.mavlink.MAV_CMD_NAV_TAKEOFF, 0, 0, 0, 0,
+                                msg.lat / 1e7, msg.lon / 1e7, altitude)
+            logger.info("Взлёт на высоту %s метров", altitude)
+        except Exception as e:
+            logger.error("Ошибка взлёта: %s", e)
+            raise RuntimeError(f"Failed to take off: {e}") from e
+
+    async def land(self) -> None:
+        """Переход в режим посадки."""
+        try:
+            await self.set_mode('LAND')
+            logger.info("БПЛА выполняет посадку")
+        except Exception as e:
+            logger.error("Ошибка при посадке: %s", e)
+            raise RuntimeError(f"Failed to land: {e}") from e
+
+    async def goto(self, lat: float, lon: float, alt: float) -> None:
+        """
+        Полёт к заданным координатам в режиме GUIDED.
+
+        Отправляется MISSION_ITEM_INT с current=2 (точка GUIDED) и ожидается
+        MISSION_ACK, без фиксированных задержек.
+
+        Args:
+            lat (float): Широта целевой точки.
+            lon (float): Долгота целевой точки.
+            alt (float): Высота целевой точки в метрах.
+        """
+        try:
+            self.seq += 1
+            future = self.expect('MISSION_ACK')
+            self.mav.mission_item_int_send(
+                self.target_system, self.target_component,
+                self.seq,
+                mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT,
+                mavutil.mavlink.MAV_CMD_NAV_WAYPOINT,
+                2,  # current = 2: точка режима GUIDED
+                1,  # autocontinue
+                0, 0, 0, 0,
+                int(lat * 1e7), int(lon * 1e7), alt
+            )
+            msg = await self.wait_for(future, ACK_TIMEOUT)
+            if msg is None or msg.type != mavutil.mavlink.MAV_MISSION_ACCEPTED:
+                raise RuntimeError("Команда полёта к точке не подтверждена")
+            logger.info("Летим к точке (%s, %s, %s)", lat, lon, alt)
+        except Exception as e:
+            logger.error("Ошибка при полёте к точке: %s", e)
+            raise RuntimeError(f"Failed to go to waypoint: {e}") from e
+
+    async def get_telemetry(self, timeout: float = 0) -> Optional[Dict[str, float]]:
+        """
+        Последние значения телеметрии.
+
+        Args:
+            timeout (float): Сколько ждать первого GLOBAL_POSITION_INT, если
+                кэш пуст (0 - не ждать).
+
+        Returns:
+            Optional[Dict[str, float]]: Копия кэша телеметрии или None.
+        """
+        if not self._telemetry and timeout > 0:
+            await self.wait_message('GLOBAL_POSITION_INT', timeout=timeout)
+        return dict(self._telemetry) or None
@@ -0,0 +1,239 @@
+"""
+Протокол загрузки миссии MAVLink (MISSION_COUNT / MISSION_REQUEST_INT / MISSION_ACK).
+"""
+
+import time
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from pymavlink import mavutil
+
+from telemetry_reader import MessageStream
+
+logger = logging.getLogger(__name__)
+
+MISSION_TIMEOUT = 1.5  # Время ожидания запроса пункта до повторной отправки, с
+MISSION_RETRIES = 5  # Число повторных отправок подряд без ответа аппарата
+# Участки изменений с разрывом не больше MERGE_GAP пунктов отправляются одной
+# частичной записью: пересылка пары пунктов дешевле отдельного рукопожатия
+MERGE_GAP = 2
+
+
+class MissionItem(NamedTuple):
+    """Пункт миссии (поля MISSION_ITEM_INT без seq и current)."""
+    lat: float
+    lon: float
+    alt: float
+    command: int = mavutil.mavlink.MAV_CMD_NAV_WAYPOINT
+    frame: int = mavutil.mavlink.MAV_FRAME_GLOBAL_RELATIVE_ALT_INT
+    params: Tuple[float, float, float, float] = (0, 0, 0, 0)
+    autocontinue: int = 1
+
+
+def changed_ranges(old: Sequence[MissionItem], new: Sequence[MissionItem],
+                   merge_gap: int = MERGE_GAP) -> List[Tuple[int, int]]:
+    """
+    Участки [start, end) различающихся пунктов двух миссий одинаковой длины.
+
+    Соседние участки с разрывом не больше merge_gap объединяются.
+    """
+    if len(old) != len(new):
+        raise ValueError("Миссии разной длины сравниваются только целиком")
+    ranges: List[Tuple[int, int]] = []
+    for seq, (before, after) in enumerate(zip(old, new)):
+        if before == after:
+            continue
+        if ranges and seq - ranges[-1][1] <= merge_gap:
+            ranges[-1] = (ranges[-1][0], seq + 1)
+        else:
+            ranges.append((seq, seq + 1))
+    return ranges
+
+
+class MissionCache:
+    """
+    Копии миссий, последними подтверждённых каждым аппаратом (по target_system).
+
+    Запись удаляется при любой ошибке загрузки, так как состояние миссии
+    на аппарате после этого неизвестно.
+    """
+
+    def __init__(self) -> None:
+        self._missions: Dict[int, Tuple[MissionItem, ...]] = {}
+
+    def get(self, system: int) -> Optional[Tuple[MissionItem, ...]]:
+        """Подтверждённая миссия аппарата или None."""
+        return self._missions.get(system)
+
+    def store(self, system: int, items: Sequence[MissionItem]) -> None:
+        """Сохранение миссии, подтверждённой аппаратом."""
+        self._missions[system] = tuple(items)
+
+    def invalidate(self, system: int) -> None:
+        """Удаление записи аппарата."""
+        self._missions.pop(system, None)
+
+
+class MissionUploader:
+    """
+    Загрузка списка пунктов за одно рукопожатие.
+
+    После MISSION_COUNT аппарат запрашивает пункты (MISSION_REQUEST_INT),
+    и каждый запрос обслуживается сразу по приходу, без фиксированных пауз:
+    время загрузки определяется RTT канала. Если ответа нет дольше timeout,
+    последнее отправленное сообщение повторяется.
+    """
+
+    def __init__(self, master: Any, reader: Any = None, timeout: float = MISSION_TIMEOUT,
+                 retries: int = MISSION_RETRIES):
+        """
+        Args:
+            master: Соединение mavutil.
+            reader: TelemetryReader или None (чтение через recv_match).
+            timeout (float): Время ожидания ответа до повторной отправки, с.
+            retries (int): Число повторных отправок подряд.
+        """
+        self.master = master
+        self.reader = reader
+        self.timeout = timeout
+        self.retries = retries
+
+    def send_item(self, seq: int, item: MissionItem) -> None:
+        """Отправка одного пункта в формате MISSION_ITEM_INT."""
+        self.master.mav.mission_item_int_send(
+            self.master.target_system,
+            self.master.target_component,
+            seq,
+            item.frame,
+            item.command,
+            0,  # current
+            item.autocontinue,
+            *item.params,
+            int(round(item.lat * 1e7)),
+            int(round(item.lon * 1e7)),
+            item.alt
+        )
+
+    def upload(self, items: Sequence[MissionItem], start: int = 0,
+               send_start: Any = None) -> Dict[str, float]:
+        """
+        Загрузка пунктов start .. start + len(items) - 1.
+
+        Args:
+            items: Пункты миссии.
+            start (int): Номер первого пункта (для частичной записи).
+            send_start: Функция, начинающая обмен; по умолчанию MISSION_COUNT.
+
+        Returns:
+            Dict[str, float]: items - число пунктов, retransmissions - число
+            повторных отправок, duration - длительность загрузки, с.
+
+        Raises:
+            TimeoutError: Аппарат перестал отвечать.
+            RuntimeError: Аппарат отклонил миссию.
+        """
+        if send_start is None:
+            def send_start() -> None:
+                self.master.mav.mission_count_send(
+                    self.master.target_system, self.master.target_component, len(items))
+
+        end = start + len(items)
+        started_at = time.monotonic()
+        retransmissions = 0
+        retries_left = self.retries
+        last_sent: Optional[int] = None  # Номер последнего отправленного пункта
+        sent = set()  # Номера пунктов, отправленных хотя бы один раз
+        types = ('MISSION_REQUEST_INT', 'MISSION_REQUEST', 'MISSION_ACK')
+
+        with MessageStream(self.master, self.reader, types) as stream:
+            send_start()
+            while True:
+                msg = stream.get(self.timeout)
+                if msg is None:
+                    if retries_left == 0:
+                        raise TimeoutError("Аппарат не отвечает при загрузке миссии")
+                    retries_left -= 1
+                    retransmissions += 1
+                    if last_sent is None:
+                        send_start()
+                    else:
+                        self.send_item(last_sent, items[last_sent - start])
+                    continue
+
+                if msg.get_type() == 'MISSION_ACK':
+                    # Поток открыт до MISSION_COUNT, поэтому отказ относится
+                    # к этому обмену (например, MAV_MISSION_NO_SPACE сразу после него)
+                    if msg.type != mavutil.mavlink.MAV_MISSION_ACCEPTED:
+                        raise RuntimeError(f"Миссия отклонена с кодом {msg.type}")
+                    # Согласие до отправки всех пунктов - от прошлого обмена;
+                    # повторный запрос раннего пункта перед ACK его не отменяет
+                    if len(sent) < len(items):
+                        logger.warning("MISSION_ACK до отправки всех пунктов")
+                        continue
+                    break
+
+                retries_left = self.retries
+                if start <= msg.seq < end:
+                    self.send_item(msg.seq, items[msg.seq - start])
+                    last_sent = msg.seq
+                    sent.add(msg.seq)
+                else:
+                    logger.warning("Запрошен пункт вне диапазона: %s", msg.seq)
+
+        duration = time.monotonic() - started_at
+        logger.info("Миссия загружена: %s пунктов за %.3f с", len(items), duration)
+        return {'items': len(items), 'retransmissions': retransmissions, 'duration': duration}
+
+
+    def upload_partial(self, items: Sequence[MissionItem], start: int) -> Dict[str, float]:
+        """
+        Замена пунктов start .. start + len(items) - 1 через MISSION_WRITE_PARTIAL_LIST.
+
+        Длина миссии на аппарате не меняется; один пункт записывается
+        тем же обменом с start == end.
+        """
+        def send_start() -> None:
+            self.master.mav.mission_write_partial_list_send(
+                self.master.target_system, self.master.target_component,
+                start, start + len(items) - 1)
+
+        return self.upload(items, start, send_start)
+
+    def sync(self, items: Sequence[MissionItem], cache: MissionCache) -> Dict[str, float]:
+        """
+        Обновление миссии с передачей только изменённых пунктов.
+
+        Если подтверждённой копии нет или число пунктов изменилось, миссия
+        загружается целиком; иначе каждый участок изменений записывается
+        частичной записью.
+
+        Returns:
+            Dict[str, float]: items - число переданных пунктов, writes - число
+            обменов, retransmissions, duration, full - была ли полная загрузка.
+        """
+        items = list(items)
+        system = self.master.target_system
+        confirmed = cache.get(system)
+        started_at = time.monotonic()
+        try:
+            if confirmed is None or len(confirmed) != len(items):
+                stats = self.upload(items)
+                stats.update(writes=1, full=True)
+            else:
+                stats = {'items': 0, 'retransmissions': 0, 'writes': 0, 'full': False}
+                for start, end in changed_ranges(confirmed, items):
+                    partial = self.upload_partial(items[start:end], start)
+                    stats['items'] += partial['items']
+                    stats['retransmissions'] += partial['retransmissions']
+                    stats['writes'] += 1
+        except Exception:
+            cache.invalidate(system)
+            raise
+        cache.store(system, items)
+        stats['duration'] = time.monotonic() - started_at
+        return stats
+
+
+def items_from_waypoints(waypoints: Sequence[Tuple[float, float, float]]) -> List[MissionItem]:
+    """Пункты NAV_WAYPOINT из списка (lat, lon, alt)."""
+    return [MissionItem(lat, lon, alt) for lat, lon, alt in waypoints]
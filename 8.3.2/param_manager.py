@@ -0,0 +1,280 @@
+"""
+Параметры и режимы полёта аппарата с кэшем в памяти и на диске.
+"""
+
+import json
+import os
+import struct
+import time
+import logging
+from typing import Any, Dict, Optional
+
+from pymavlink import mavutil
+
+from telemetry_reader import MessageStream
+
+logger = logging.getLogger(__name__)
+
+PARAM_TIMEOUT = 1.0  # Пауза в потоке PARAM_VALUE, после которой запрашиваются пропуски, с
+PARAM_RETRIES = 3  # Число раундов дозапроса пропущенных параметров
+PARAM_SET_TIMEOUT = 2.0  # Время ожидания подтверждения записи параметра, с
+HASH_CHECK = '_HASH_CHECK'  # Псевдопараметр: хэш всех параметров (uint32 в битах float)
+
+
+class ParamManager:
+    """
+    Загрузка, хранение и изменение параметров аппарата.
+
+    Все параметры запрашиваются одним PARAM_REQUEST_LIST; потерянные
+    в потоке PARAM_VALUE дозапрашиваются по индексу (PARAM_REQUEST_READ).
+    Результат хранится в памяти и, если задан cache_dir, в файле, ключом
+    которого служат идентификатор системы и хэш прошивки: после
+    переподключения к тому же аппарату с той же прошивкой параметры
+    читаются с диска, если хэш их значений (_HASH_CHECK) не изменился.
+    Аппарат без _HASH_CHECK при проверке загружается заново: одинаковое
+    число параметров не означает, что их значения не менялись.
+    """
+
+    def __init__(self, master: Any, reader: Any = None, cache_dir: Optional[str] = None,
+                 timeout: float = PARAM_TIMEOUT, retries: int = PARAM_RETRIES):
+        """
+        Args:
+            master: Соединение mavutil.
+            reader: TelemetryReader или None (чтение через recv_match).
+            cache_dir (Optional[str]): Каталог кэша на диске; None - только в памяти.
+            timeout (float): Пауза в потоке PARAM_VALUE до дозапроса, с.
+            retries (int): Число раундов дозапроса.
+        """
+        self.master = master
+        self.reader = reader
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.retries = retries
+        self.params: Dict[str, float] = {}
+        self.types: Dict[str, int] = {}
+        self.count: Optional[int] = None
+        self.firmware: Optional[str] = None  # Хэш прошивки, к которой относится кэш
+        self.hash: Optional[int] = None  # _HASH_CHECK аппарата для текущих значений
+        self._modes: Optional[Dict[str, int]] = None
+
+    def _stream(self) -> MessageStream:
+        return MessageStream(self.master, self.reader, ['PARAM_VALUE'])
+
+    @staticmethod
+    def _name(msg: Any) -> str:
+        name = msg.param_id
+        if isinstance(name, bytes):
+            name = name.decode('ascii', 'replace').rstrip('\0')
+        return name
+
+    def _store(self, msg: Any) -> None:
+        name = self._name(msg)
+        self.params[name] = msg.param_value
+        self.types[name] = msg.param_type
+
+    def fetch_all(self) -> Dict[str, float]:
+        """
+        Загрузка всех параметров с аппарата.
+
+        Returns:
+            Dict[str, float]: Параметры по именам.
+
+        Raises:
+            TimeoutError: Не все параметры получены после всех дозапросов.
+        """
+        received: Dict[int, Any] = {}
+        count: Optional[int] = None
+
+        def collect(stream: MessageStream, wanted: Optional[set] = None) -> None:
+            nonlocal count
+            while True:
+                msg = stream.get(self.timeout)
+                if msg is None:
+                    return  # Поток прервался: дальше - дозапрос пропусков
+                count = msg.param_count
+                if 0 <= msg.param_index < count:
+                    received[msg.param_index] = msg
+                    if wanted is not None:
+                        wanted.discard(msg.param_index)
+                if len(received) >= count or wanted == set():
+                    return
+
+        with self._stream() as stream:
+            self.master.mav.param_request_list_send(
+                self.master.target_system, self.master.target_component)
+            collect(stream)
+            for _ in range(self.retries):
+                if count is None:
+                    self.master.mav.param_request_list_send(
+                        self.master.target_system, self.master.target_component)
+                    collect(stream)
+                    continue
+                missing = set(range(count)) - set(received)
+                if not missing:
+                    break
+                logger.info("Дозапрос %s параметров", len(missing))
+                for index in sorted(missing):
+                    self.master.mav.param_request_read_send(
+                        self.master.target_system, self.master.target_component, b'', index)
+                collect(stream, missing)
+
+        if count is None or len(received) < count:
+            raise TimeoutError(
+                f"Получено {len(received)} из {count if count is not None else '?'} параметров")
+        self.params.clear()
+        self.types.clear()
+        for index in range(count):
+            self._store(received[index])
+        self.count = count
+        logger.info("Загружено %s параметров", count)
+        return dict(self.params)
+
+    def firmware_hash(self, timeout: float = 5) -> str:
+        """
+        Идентификатор прошивки из AUTOPILOT_VERSION (версия и git-хэш сборки).
+        """
+        with MessageStream(self.master, self.reader, ['AUTOPILOT_VERSION']) as stream:
+            self.master.mav.command_long_send(
+                self.master.target_system, self.master.target_component,
+                mavutil.mavlink.MAV_CMD_REQUEST_MESSAGE, 0,
+                mavutil.mavlink.MAVLINK_MSG_ID_AUTOPILOT_VERSION, 0, 0, 0, 0, 0, 0)
+            msg = stream.get(timeout)
+        if msg is None:
+            raise TimeoutError("Нет AUTOPILOT_VERSION")
+        return f"{msg.flight_sw_version:08x}-{bytes(msg.flight_custom_version).hex()}"
+
+    def cache_path(self) -> Optional[str]:
+        """Файл кэша для текущего аппарата и прошивки (None без cache_dir)."""
+        if self.cache_dir is None or self.firmware is None:
+            return None
+        return os.path.join(self.cache_dir,
+                            f"params_{self.master.target_system}_{self.firmware}.json")
+
+    def _remote_hash(self) -> Optional[int]:
+        """
+        Хэш всех значений параметров на аппарате (_HASH_CHECK).
+
+        Returns:
+            Optional[int]: Хэш или None, если аппарат его не поддерживает.
+        """
+        with self._stream() as stream:
+            self.master.mav.param_request_read_send(
+                self.master.target_system, self.master.target_component,
+                HASH_CHECK.encode('ascii'), -1)
+            deadline = time.monotonic() + self.timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                msg = stream.get(remaining) if remaining > 0 else None
+                if msg is None:
+                    return None
+                if self._name(msg) == HASH_CHECK:
+                    return struct.unpack('<I', struct.pack('<f', msg.param_value))[0]
+
+    def load(self, firmware: Optional[str] = None, verify: bool = True) -> Dict[str, float]:
+        """
+        Параметры из кэша на диске или, если его нет или он устарел, с аппарата.
+
+        Args:
+            firmware (Optional[str]): Хэш прошивки; None - запросить у аппарата.
+            verify (bool): Сверить хэш значений (_HASH_CHECK) кэша с аппаратом;
+                False - значения из кэша не проверяются и могли устареть.
+
+        Returns:
+            Dict[str, float]: Параметры по именам.
+        """
+        if firmware is None and self.cache_dir is not None:
+            firmware = self.firmware_hash()
+        self.firmware = firmware
+        path = self.cache_path()
+        if path is not None and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            remote = self._remote_hash() if verify else None
+            if not verify or (remote is not None and remote == data.get('hash')):
+                self.params = {name: value for name, (value, _) in data['params'].items()}
+                self.types = {name: kind for name, (_, kind) in data['params'].items()}
+                self.count = data['count']
+                self.hash = data.get('hash')
+                if data.get('modes') is not None:
+                    self._modes = data['modes']
+                logger.info("Параметры загружены из кэша: %s", path)
+                return dict(self.params)
+            logger.info("Кэш параметров устарел: %s", path)
+
+        params = self.fetch_all()
+        if path is not None:
+            self.hash = self._remote_hash()
+        self.save()
+        return params
+
+    def save(self) -> None:
+        """Атомарная запись параметров и режимов в файл кэша (если он задан)."""
+        path = self.cache_path()
+        if path is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data = {
+            'count': self.count,
+            'hash': self.hash,
+            'params': {name: (value, self.types.get(name)) for name, value in self.params.items()},
+            'modes': self._modes,
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def get(self, name: str, default: Optional[float] = None) -> Optional[float]:
+        """Значение параметра из памяти (без обращения к аппарату)."""
+        return self.params.get(name, default)
+
+    def set(self, name: str, value: float, timeout: float = PARAM_SET_TIMEOUT) -> float:
+        """
+        Запись параметра с ожиданием подтверждения (ответного PARAM_VALUE).
+
+        Подтверждённое значение сохраняется в памяти и в кэше на диске.
+
+        Args:
+            name (str): Имя параметра.
+            value (float): Новое значение.
+            timeout (float): Общее время ожидания подтверждения, с; PARAM_VALUE
+                других параметров его не продлевают.
+
+        Returns:
+            float: Значение, подтверждённое аппаратом.
+        """
+        param_type = self.types.get(name, mavutil.mavlink.MAV_PARAM_TYPE_REAL32)
+        with self._stream() as stream:
+            self.master.mav.param_set_send(
+                self.master.target_system, self.master.target_component,
+                name.encode('ascii'), value, param_type)
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                msg = stream.get(remaining) if remaining > 0 else None
+                if msg is None:
+                    raise TimeoutError(f"Нет подтверждения параметра {name}")
+                if self._name(msg) == name:
+                    break
+        self._store(msg)
+        if self.hash is not None:
+            # Хэш кэша должен соответствовать новому значению
+            self.hash = self._remote_hash()
+        self.save()
+        return msg.param_value
+
+    def mode_mapping(self) -> Dict[str, int]:
+        """
+        Соответствие названий режимов номерам; вычисляется один раз.
+
+        Raises:
+            RuntimeError: Тип аппарата ещё неизвестен (не было HEARTBEAT).
+        """
+        if self._modes is None:
+            modes = self.master.mode_mapping()
+            if not isinstance(modes, dict):
+                raise RuntimeError("Не удалось получить список режимов полёта")
+            self._modes = dict(modes)
+            if self.count is not None:
+                self.save()
+        return self._modes
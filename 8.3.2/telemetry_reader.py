@@ -0,0 +1,238 @@
+"""
+Фоновое чтение MAVLink-соединения с кэшем последних значений телеметрии.
+"""
+
+import math
+import queue
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Типы сообщений, из которых извлекаются поля телеметрии
+TELEMETRY_TYPES = ('GLOBAL_POSITION_INT', 'ATTITUDE', 'VFR_HUD', 'SYS_STATUS')
+
+
+def parse_telemetry(msg: Any) -> Dict[str, float]:
+    """
+    Извлечение полей телеметрии из сообщения MAVLink.
+
+    Args:
+        msg: Сообщение MAVLink.
+
+    Returns:
+        Dict[str, float]: Поля телеметрии (пустой словарь для прочих типов).
+
+    Raises:
+        ValueError: Значения вне допустимых диапазонов.
+    """
+    telemetry = {}
+    msg_type = msg.get_type()
+    if msg_type == 'GLOBAL_POSITION_INT':
+        telemetry['lat'] = msg.lat / 1e7
+        telemetry['lon'] = msg.lon / 1e7
+        telemetry['alt'] = msg.alt / 1000
+        # Проверка диапазонов значений
+        if not -90.0 <= telemetry['lat'] <= 90.0:
+            raise ValueError("Некорректная широта")
+        if not -180.0 <= telemetry['lon'] <= 180.0:
+            raise ValueError("Некорректная долгота")
+    elif msg_type == 'ATTITUDE':
+        telemetry['roll'] = msg.roll
+        telemetry['pitch'] = msg.pitch
+        telemetry['yaw'] = msg.yaw
+        # Проверка диапазонов углов
+        if not -math.pi <= telemetry['roll'] <= math.pi:
+            raise ValueError("Некорректный крен")
+        if not -math.pi / 2 <= telemetry['pitch'] <= math.pi / 2:
+            raise ValueError("Некорректный тангаж")
+        if not -math.pi <= telemetry['yaw'] <= math.pi:
+            raise ValueError("Некорректное рыскание")
+    elif msg_type == 'VFR_HUD':
+        telemetry['groundspeed'] = msg.groundspeed
+        telemetry['airspeed'] = msg.airspeed
+        telemetry['heading'] = msg.heading
+    elif msg_type == 'SYS_STATUS':
+        telemetry['battery_voltage'] = msg.voltage_battery / 1000  # В вольтах
+        telemetry['battery_remaining'] = msg.battery_remaining  # В процентах
+    return telemetry
+
+
+class TelemetryReader:
+    """
+    Поток, непрерывно читающий соединение MAVLink.
+
+    Хранит последнее значение каждого поля телеметрии с меткой времени
+    и последнее сообщение каждого типа. Другие потоки не должны вызывать
+    recv_match у того же соединения: вместо этого они подписываются на
+    сообщения (subscribe) или ждут их через wait_message.
+    """
+
+    def __init__(self, master: Any, poll_timeout: float = 0.1):
+        """
+        Args:
+            master: Соединение mavutil.
+            poll_timeout (float): Таймаут одного вызова recv_match в секундах;
+                определяет задержку остановки потока.
+        """
+        self.master = master
+        self.poll_timeout = poll_timeout
+        self._values: Dict[str, float] = {}
+        self._times: Dict[str, float] = {}
+        self._messages: Dict[str, Any] = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'TelemetryReader':
+        """Запуск потока чтения."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='telemetry-reader',
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Остановка потока чтения."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                msg = self.master.recv_match(blocking=True, timeout=self.poll_timeout)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.error("Ошибка чтения MAVLink: %s", e)
+                self._stop.wait(self.poll_timeout)
+                continue
+            if msg is not None:
+                self.handle(msg)
+
+    def handle(self, msg: Any) -> None:
+        """
+        Обработка одного сообщения (вызывается потоком чтения).
+
+        Args:
+            msg: Сообщение MAVLink.
+        """
+        msg_type = msg.get_type()
+        if msg_type == 'BAD_DATA':
+            return
+        try:
+            fields = parse_telemetry(msg)
+        except ValueError as e:
+            logger.warning("Ошибка в телеметрии: %s", e)
+            fields = {}
+
+        now = time.time()
+        with self._lock:
+            self._messages[msg_type] = msg
+            self._values.update(fields)
+            self._times.update(dict.fromkeys(fields, now))
+            listeners = list(self._listeners)
+        for listener in listeners:
+            # Ошибка подписчика не должна останавливать поток чтения:
+            # без него замирают телеметрия, подтверждения и MessageStream
+            try:
+                listener(msg)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.error("Ошибка обработчика сообщения %s: %s", msg_type, e)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Согласованная копия последних значений всех полей (без ожидания)."""
+        with self._lock:
+            return dict(self._values)
+
+    def timestamps(self) -> Dict[str, float]:
+        """Время получения (time.time()) последнего значения каждого поля."""
+        with self._lock:
+            return dict(self._times)
+
+    def last_message(self, msg_type: str) -> Optional[Any]:
+        """Последнее полученное сообщение заданного типа или None."""
+        with self._lock:
+            return self._messages.get(msg_type)
+
+    def subscribe(self, listener: Callable[[Any], None]) -> None:
+        """Подписка на все сообщения; listener вызывается в потоке чтения."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[Any], None]) -> None:
+        """Отмена подписки."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def wait_message(self, msg_type: str,
+                     condition: Optional[Callable[[Any], bool]] = None,
+                     timeout: float = 5) -> Optional[Any]:
+        """
+        Ожидание нового сообщения заданного типа.
+
+        Args:
+            msg_type (str): Тип сообщения MAVLink.
+            condition: Дополнительное условие на сообщение.
+            timeout (float): Время ожидания в секундах.
+
+        Returns:
+            Первое подходящее сообщение, полученное после вызова, или None.
+        """
+        received = []
+        event = threading.Event()
+
+        def listener(msg: Any) -> None:
+            if (not event.is_set() and msg.get_type() == msg_type
+                    and (condition is None or condition(msg))):
+                received.append(msg)
+                event.set()
+
+        self.subscribe(listener)
+        try:
+            event.wait(timeout)
+        finally:
+            self.unsubscribe(listener)
+        return received[0] if received else None
+
+
+class MessageStream:
+    """
+    Очередь входящих сообщений заданных типов.
+
+    При работающем TelemetryReader подписывается на его сообщения (остальной
+    трафик продолжает обрабатываться), иначе читает соединение через recv_match.
+    """
+
+    def __init__(self, master: Any, reader: Any, types: Sequence[str]):
+        self.master = master
+        self.reader = reader
+        self.types = list(types)
+        self._queue: 'queue.Queue[Any]' = queue.Queue()
+
+    def _listener(self, msg: Any) -> None:
+        if msg.get_type() in self.types:
+            self._queue.put(msg)
+
+    def __enter__(self) -> 'MessageStream':
+        if self.reader is not None:
+            self.reader.subscribe(self._listener)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self.reader is not None:
+            self.reader.unsubscribe(self._listener)
+
+    def get(self, timeout: float) -> Optional[Any]:
+        """Следующее сообщение или None по таймауту."""
+        if self.reader is None:
+            return self.master.recv_match(type=self.types, blocking=True, timeout=timeout)
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
@@ -0,0 +1,186 @@
+# test_ack_dispatcher.py
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+import pytest
+from pymavlink import mavutil
+from ack_dispatcher import AckDispatcher
+from telemetry_reader import TelemetryReader
+from test_telemetry_reader import FakeMaster, make_msg, position
+from uav_control import UAVControl
+import logging
+
+logging.getLogger('uav_control').disabled = True
+
+ACCEPTED = mavutil.mavlink.MAV_RESULT_ACCEPTED
+DENIED = mavutil.mavlink.MAV_RESULT_DENIED
+TAKEOFF = mavutil.mavlink.MAV_CMD_NAV_TAKEOFF
+LAND = mavutil.mavlink.MAV_CMD_NAV_LAND
+
+
+def ack(command, result=ACCEPTED, src_system=1):
+    msg = make_msg('COMMAND_ACK', command=command, result=result)
+    msg.get_srcSystem.return_value = src_system
+    return msg
+
+
+class TestAckDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = AckDispatcher()
+
+    def test_routes_acks_to_pending_commands(self):
+        takeoff = self.dispatcher.register(TAKEOFF, 1)
+        land = self.dispatcher.register(LAND, 1)
+
+        self.dispatcher.handle(ack(LAND, DENIED))
+        self.dispatcher.handle(ack(TAKEOFF))
+
+        assert takeoff.result(0).accepted
+        assert land.result(0).result == DENIED
+        assert self.dispatcher.pending_count() == 0
+
+    def test_target_system_is_matched(self):
+        vehicle_1 = self.dispatcher.register(TAKEOFF, 1)
+        vehicle_2 = self.dispatcher.register(TAKEOFF, 2)
+
+        self.dispatcher.handle(ack(TAKEOFF, src_system=2))
+
+        assert vehicle_2.done()
+        assert not vehicle_1.done()
+
+    def test_in_progress_does_not_complete(self):
+        future = self.dispatcher.register(TAKEOFF)
+
+        self.dispatcher.handle(ack(TAKEOFF, mavutil.mavlink.MAV_RESULT_IN_PROGRESS))
+
+        assert not future.done()
+
+    def test_other_messages_ignored(self):
+        future = self.dispatcher.register(TAKEOFF)
+
+        self.dispatcher.handle(position())
+        self.dispatcher.handle(ack(LAND))
+
+        assert not future.done()
+
+    def test_expect_then_claim_keeps_early_ack(self):
+        self.dispatcher.expect(TAKEOFF, 1)
+        self.dispatcher.handle(ack(TAKEOFF))
+
+        assert self.dispatcher.claim(TAKEOFF, 1).result(0).accepted
+
+    def test_discard_expected(self):
+        future = self.dispatcher.expect(TAKEOFF, 1)
+
+        self.dispatcher.discard(future)
+        self.dispatcher.handle(ack(TAKEOFF))
+
+        assert self.dispatcher.pending_count() == 0
+        assert not self.dispatcher.claim(TAKEOFF, 1).done()
+
+    def test_discard(self):
+        future = self.dispatcher.register(TAKEOFF)
+
+        self.dispatcher.discard(future)
+
+        assert future.cancelled()
+        assert self.dispatcher.pending_count() == 0
+
+    def test_latency_stats(self):
+        for _ in range(3):
+            self.dispatcher.register(TAKEOFF)
+            self.dispatcher.handle(ack(TAKEOFF))
+
+        stats = self.dispatcher.latency_stats()[TAKEOFF]
+        assert stats['count'] == 3
+        assert 0 <= stats['min'] <= stats['mean'] <= stats['max']
+
+
+class TestUAVControlAcks(unittest.TestCase):
+    def setUp(self):
+        self.master = FakeMaster()
+        self.master.target_system = 1
+        self.master.target_component = 1
+        self.master.mav = MagicMock()
+        self.uav = UAVControl.__new__(UAVControl)
+        self.uav.master = self.master
+        self.uav.telemetry_reader = TelemetryReader(self.master, poll_timeout=0.01)
+        self.uav.ack_dispatcher = AckDispatcher(self.uav.telemetry_reader)
+        self.uav.telemetry_reader.start()
+
+    def tearDown(self):
+        self.uav.close()
+
+    def test_concurrent_commands(self):
+        results = {}
+
+        def send(command):
+            results[command] = self.uav.send_command(command, timeout=2, retries=0)
+
+        threads = [threading.Thread(target=send, args=(command,)) for command in (TAKEOFF, LAND)]
+        for thread in threads:
+            thread.start()
+        threading.Timer(0.05, lambda: [self.master.messages.put(ack(LAND)),
+                                       self.master.messages.put(position()),
+                                       self.master.messages.put(ack(TAKEOFF, DENIED))]).start()
+        for thread in threads:
+            thread.join()
+
+        assert results[LAND].accepted
+        assert results[TAKEOFF].result == DENIED
+        assert self.uav.get_telemetry()['lat'] == 50.0
+
+    def test_send_command_retransmits(self):
+        sends = []
+
+        def command_long_send(*args):
+            sends.append(args)
+            if len(sends) == 2:  # Первое подтверждение потеряно
+                self.master.messages.put(ack(TAKEOFF))
+
+        self.master.mav.command_long_send.side_effect = command_long_send
+
+        result = self.uav.send_command(TAKEOFF, 0, 0, 0, 0, 0, 0, 10, timeout=0.1, retries=2)
+
+        assert result.accepted
+        assert [args[3] for args in sends] == [0, 1]  # confirmation
+        assert sends[0][-1] == 10
+
+    def test_send_command_gives_up(self):
+        assert self.uav.send_command(TAKEOFF, timeout=0.01, retries=1) is None
+        assert self.master.mav.command_long_send.call_count == 2
+        assert self.uav.ack_dispatcher.pending_count() == 0
+
+    def test_ack_before_wait_is_not_lost(self):
+        self.uav.expect_ack(TAKEOFF)
+        self.uav.telemetry_reader.handle(ack(TAKEOFF))
+
+        assert self.uav.wait_command_ack(TAKEOFF, timeout=0.1) is True
+
+    def test_takeoff_send_failure_drops_expected_ack(self):
+        self.uav.set_mode = MagicMock()
+        self.uav.arm = MagicMock()
+        self.uav.recv_message = MagicMock(return_value=position())
+        self.master.mav.command_long_send.side_effect = OSError("link down")
+
+        with pytest.raises(RuntimeError, match="Failed to take off"):
+            self.uav.takeoff(10)
+
+        assert self.uav.ack_dispatcher.pending_count() == 0
+        assert not self.uav.ack_dispatcher.claim(TAKEOFF, 1).done()
+
+    def test_wait_command_ack_timeout(self):
+        assert self.uav.wait_command_ack(TAKEOFF, timeout=0.01) is False
+        assert self.uav.ack_dispatcher.pending_count() == 0
+
+    def test_send_command_requires_dispatcher(self):
+        uav = UAVControl.__new__(UAVControl)
+        uav.master = MagicMock()
+
+        with pytest.raises(RuntimeError):
+            uav.send_command(TAKEOFF)
+
+
+if __name__ == '__main__':
+    unittest.main()
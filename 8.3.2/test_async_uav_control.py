@@ -0,0 +1,203 @@
+# test_async_uav_control.py
+import asyncio
+import unittest
+
+import pytest
+from pymavlink import mavutil
+from async_uav_control import AsyncUAVControl, parse_address
+import logging
+
+logging.getLogger('async_uav_control').disabled = True
+
+mavlink = mavutil.mavlink
+GUIDED = 4
+LAND = 9
+
+
+class SimVehicle(asyncio.DatagramProtocol):
+    """Имитация автопилота ArduCopter на UDP для тестов."""
+
+    def __init__(self, system_id=1, drop_acks=0):
+        self.system_id = system_id
+        self.drop_acks = drop_acks  # Сколько первых подтверждений не отправлять
+        self.transport = None
+        self.gcs = None
+        self.mav = mavlink.MAVLink(self, srcSystem=system_id, srcComponent=1)
+        self.mav.robust_parsing = True
+        self.armed = False
+        self.custom_mode = 0
+        self.commands = []
+        self.mission_items = []
+        self.task = None
+
+    def write(self, data):
+        if self.gcs is not None:
+            self.transport.sendto(data, self.gcs)
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.task = asyncio.get_running_loop().create_task(self.stream())
+
+    def datagram_received(self, data, addr):
+        self.gcs = addr
+        for msg in self.mav.parse_buffer(data) or ():
+            self.handle(msg)
+
+    def handle(self, msg):
+        if msg.get_type() == 'COMMAND_LONG':
+            self.commands.append((msg.command, msg.confirmation))
+            if msg.command == mavlink.MAV_CMD_COMPONENT_ARM_DISARM:
+                self.armed = msg.param1 == 1
+            elif msg.command == mavlink.MAV_CMD_DO_SET_MODE:
+                self.custom_mode = int(msg.param2)
+            if self.drop_acks > 0:
+                self.drop_acks -= 1
+                return
+            self.mav.command_ack_send(msg.command, mavlink.MAV_RESULT_ACCEPTED)
+            self.heartbeat()
+        elif msg.get_type() == 'MISSION_ITEM_INT':
+            self.mission_items.append(msg)
+            self.mav.mission_ack_send(msg.get_srcSystem(), msg.get_srcComponent(),
+                                      mavlink.MAV_MISSION_ACCEPTED)
+
+    def heartbeat(self):
+        base_mode = mavlink.MAV_MODE_FLAG_CUSTOM_MODE_ENABLED
+        if self.armed:
+            base_mode |= mavlink.MAV_MODE_FLAG_SAFETY_ARMED
+        self.mav.heartbeat_send(mavlink.MAV_TYPE_QUADROTOR, mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+                                base_mode, self.custom_mode, mavlink.MAV_STATE_STANDBY)
+
+    async def stream(self):
+        while True:
+            self.heartbeat()
+            self.mav.global_position_int_send(0, 500000000, 500000000, 10000, 0, 0, 0, 0, 0)
+            await asyncio.sleep(0.05)
+
+    def close(self):
+        self.task.cancel()
+        self.transport.close()
+
+
+class SimVehicleTcp(SimVehicle, asyncio.Protocol):
+    """Тот же автопилот за TCP-сервером (как SITL на порту 5760)."""
+
+    def write(self, data):
+        self.transport.write(data)
+
+    def data_received(self, data):
+        for msg in self.mav.parse_buffer(data) or ():
+            self.handle(msg)
+
+
+async def start_vehicle(**kwargs):
+    loop = asyncio.get_running_loop()
+    _, vehicle = await loop.create_datagram_endpoint(
+        lambda: SimVehicle(**kwargs), local_addr=('127.0.0.1', 0))
+    port = vehicle.transport.get_extra_info('sockname')[1]
+    return vehicle, f'udpout:127.0.0.1:{port}'
+
+
+class TestAsyncUAVControl(unittest.IsolatedAsyncioTestCase):
+    async def test_parse_address(self):
+        assert parse_address('udp:0.0.0.0:14550') == ('udpin', '0.0.0.0', 14550)
+        assert parse_address('tcp:127.0.0.1:5760') == ('tcp', '127.0.0.1', 5760)
+        with pytest.raises(ValueError):
+            parse_address('serial:/dev/ttyUSB0')
+
+    async def test_connect_and_telemetry(self):
+        vehicle, address = await start_vehicle()
+        uav = await AsyncUAVControl.connect(address, timeout=2)
+        try:
+            telemetry = await uav.get_telemetry(timeout=2)
+            assert telemetry == {'lat': 50.0, 'lon': 50.0, 'alt': 10.0}
+            assert uav.mode_mapping()['GUIDED'] == GUIDED
+        finally:
+            uav.close()
+            vehicle.close()
+
+    async def test_tcp_transport(self):
+        vehicles = []
+
+        def factory():
+            vehicles.append(SimVehicleTcp())
+            return vehicles[-1]
+
+        server = await asyncio.get_running_loop().create_server(factory, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        uav = await AsyncUAVControl.connect(f'tcp:127.0.0.1:{port}', timeout=2)
+        try:
+            await uav.arm()
+            assert vehicles[0].armed
+        finally:
+            uav.close()
+            vehicles[0].task.cancel()
+            server.close()
+            await server.wait_closed()
+
+    async def test_connect_failure(self):
+        with pytest.raises(ConnectionError, match="Failed to connect to UAV"):
+            await AsyncUAVControl.connect('udpout:127.0.0.1:9', timeout=0.1)
+
+    async def test_takeoff_goto_land(self):
+        vehicle, address = await start_vehicle()
+        uav = await AsyncUAVControl.connect(address, timeout=2)
+        try:
+            await uav.takeoff(10)
+            assert uav.armed
+            assert vehicle.commands[-1][0] == mavlink.MAV_CMD_NAV_TAKEOFF
+
+            await uav.goto(50.001, 50.001, 20)
+            assert vehicle.mission_items[-1].current == 2
+            assert vehicle.mission_items[-1].x == 500010000
+
+            await uav.land()
+            assert vehicle.custom_mode == LAND
+
+            await uav.disarm()
+            assert not uav.armed
+        finally:
+            uav.close()
+            vehicle.close()
+
+    async def test_command_retransmitted_after_lost_ack(self):
+        vehicle, address = await start_vehicle(drop_acks=1)
+        uav = await AsyncUAVControl.connect(address, timeout=2)
+        try:
+            ack = await uav.send_command(mavlink.MAV_CMD_COMPONENT_ARM_DISARM, 1,
+                                         timeout=0.2, retries=2)
+            assert ack.accepted
+            assert [confirmation for _, confirmation in vehicle.commands] == [0, 1]
+        finally:
+            uav.close()
+            vehicle.close()
+
+    async def test_unknown_mode(self):
+        vehicle, address = await start_vehicle()
+        uav = await AsyncUAVControl.connect(address, timeout=2)
+        try:
+            with pytest.raises(ValueError, match="Неизвестный режим: UNKNOWN"):
+                await uav.set_mode('UNKNOWN')
+        finally:
+            uav.close()
+            vehicle.close()
+
+    async def test_many_vehicles_one_loop(self):
+        started = [await start_vehicle(system_id=i + 1) for i in range(50)]
+        uavs = await asyncio.gather(*(AsyncUAVControl.connect(address, timeout=5)
+                                      for _, address in started))
+        try:
+            await asyncio.gather(*(uav.set_mode('GUIDED') for uav in uavs))
+            await asyncio.gather(*(uav.arm() for uav in uavs))
+
+            assert all(vehicle.armed and vehicle.custom_mode == GUIDED
+                       for vehicle, _ in started)
+            assert sorted(uav.target_system for uav in uavs) == list(range(1, 51))
+        finally:
+            for uav in uavs:
+                uav.close()
+            for vehicle, _ in started:
+                vehicle.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,282 @@
+# test_mission_protocol.py
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import pytest
+from pymavlink import mavutil
+from mission_protocol import (MissionCache, MissionItem, MissionUploader, changed_ranges,
+                              items_from_waypoints)
+from telemetry_reader import TelemetryReader
+from test_telemetry_reader import FakeMaster, make_msg
+from uav_control import UAVControl
+import logging
+
+logging.getLogger('uav_control').disabled = True
+logging.getLogger('mission_protocol').disabled = True
+
+mavlink = mavutil.mavlink
+
+
+class FakeMissionVehicle:
+    """Автопилот-заглушка: отвечает на протокол миссии через очередь FakeMaster."""
+
+    def __init__(self, master, drop=(), reject=None):
+        self.master = master
+        self.mission = []
+        self.pending = None  # (start, end) текущего обмена
+        self.drop = set(drop)  # Номера пунктов, ответ на которые теряется один раз
+        self.reject = reject  # Код отказа в MISSION_ACK
+        self.received = []  # Номера принятых пунктов
+        self.counts = 0
+        mav = MagicMock()
+        mav.mission_count_send.side_effect = self.on_count
+        mav.mission_write_partial_list_send.side_effect = self.on_partial
+        mav.mission_item_int_send.side_effect = self.on_item
+        master.mav = mav
+        master.target_system = 1
+        master.target_component = 1
+
+    def request(self, seq):
+        self.master.messages.put(make_msg('MISSION_REQUEST_INT', seq=seq))
+
+    def on_count(self, target_system, target_component, count):
+        self.counts += 1
+        self.mission = (self.mission + [None] * count)[:count]
+        self.pending = (0, count)
+        if count == 0:
+            self.master.messages.put(make_msg('MISSION_ACK', type=mavlink.MAV_MISSION_ACCEPTED))
+        else:
+            self.request(0)
+
+    def on_partial(self, target_system, target_component, start, end):
+        self.pending = (start, end + 1)
+        self.request(start)
+
+    def on_item(self, target_system, target_component, seq, frame, command, current,
+                autocontinue, p1, p2, p3, p4, x, y, z):
+        if seq in self.drop:
+            self.drop.discard(seq)
+            return
+        self.received.append(seq)
+        self.mission[seq] = MissionItem(x / 1e7, y / 1e7, z, command, frame,
+                                        (p1, p2, p3, p4), autocontinue)
+        if seq + 1 < self.pending[1]:
+            self.request(seq + 1)
+        else:
+            result = self.reject if self.reject is not None else mavlink.MAV_MISSION_ACCEPTED
+            self.master.messages.put(make_msg('MISSION_ACK', type=result))
+
+
+def waypoints(count):
+    return items_from_waypoints([(55.75 + i * 1e-4, 48.74, 50.0 + i) for i in range(count)])
+
+
+class TestMissionUploader(unittest.TestCase):
+    def setUp(self):
+        self.master = FakeMaster()
+        self.reader = TelemetryReader(self.master, poll_timeout=0.01).start()
+
+    def tearDown(self):
+        self.reader.stop()
+
+    def test_upload_whole_mission(self):
+        vehicle = FakeMissionVehicle(self.master)
+        items = waypoints(200)
+
+        stats = MissionUploader(self.master, self.reader).upload(items)
+
+        assert vehicle.counts == 1
+        assert [round(item.lat, 7) for item in vehicle.mission] == \
+            [round(item.lat, 7) for item in items]
+        assert stats['items'] == 200
+        assert stats['retransmissions'] == 0
+
+    def test_retransmits_lost_item(self):
+        vehicle = FakeMissionVehicle(self.master, drop={3})
+
+        stats = MissionUploader(self.master, self.reader, timeout=0.05).upload(waypoints(5))
+
+        assert stats['retransmissions'] == 1
+        assert vehicle.received == [0, 1, 2, 3, 4]
+
+    def test_ack_after_repeated_request(self):
+        vehicle = FakeMissionVehicle(self.master)
+        on_item = self.master.mav.mission_item_int_send.side_effect
+
+        def repeat_request(target_system, target_component, seq, *args):
+            if seq in vehicle.received:
+                return  # Повторно отправленный пункт аппарату уже не нужен
+            if seq == 2:
+                vehicle.request(1)  # Повторный запрос пункта перед MISSION_ACK
+            on_item(target_system, target_component, seq, *args)
+
+        self.master.mav.mission_item_int_send.side_effect = repeat_request
+
+        stats = MissionUploader(self.master, self.reader, timeout=0.2, retries=0).upload(
+            waypoints(3))
+
+        assert stats['items'] == 3
+        assert stats['retransmissions'] == 0
+
+    def test_stale_accept_ignored(self):
+        vehicle = FakeMissionVehicle(self.master)
+
+        def stale_ack(target_system, target_component, count):
+            self.master.messages.put(make_msg('MISSION_ACK', type=mavlink.MAV_MISSION_ACCEPTED))
+            vehicle.on_count(target_system, target_component, count)
+
+        self.master.mav.mission_count_send.side_effect = stale_ack
+
+        MissionUploader(self.master, self.reader).upload(waypoints(3))
+
+        assert vehicle.received == [0, 1, 2]
+
+    def test_early_rejection_fails_at_once(self):
+        FakeMissionVehicle(self.master)
+        self.master.mav.mission_count_send.side_effect = lambda *args: self.master.messages.put(
+            make_msg('MISSION_ACK', type=mavlink.MAV_MISSION_NO_SPACE))
+
+        started = time.monotonic()
+        with pytest.raises(RuntimeError, match="Миссия отклонена"):
+            MissionUploader(self.master, self.reader, timeout=1, retries=5).upload(waypoints(3))
+        assert time.monotonic() - started < 0.5
+        assert self.master.mav.mission_count_send.call_count == 1
+
+    def test_rejected_mission(self):
+        FakeMissionVehicle(self.master, reject=mavlink.MAV_MISSION_NO_SPACE)
+
+        with pytest.raises(RuntimeError, match="Миссия отклонена"):
+            MissionUploader(self.master, self.reader).upload(waypoints(2))
+
+    def test_timeout(self):
+        FakeMissionVehicle(self.master)
+        self.master.mav = MagicMock()  # Аппарат не отвечает
+
+        with pytest.raises(TimeoutError):
+            MissionUploader(self.master, self.reader, timeout=0.01, retries=2).upload(waypoints(2))
+        assert self.master.mav.mission_count_send.call_count == 3
+
+    def test_empty_mission(self):
+        FakeMissionVehicle(self.master)
+
+        assert MissionUploader(self.master, self.reader).upload([])['items'] == 0
+
+    def test_without_reader(self):
+        vehicle = FakeMissionVehicle(self.master)
+        self.reader.stop()
+
+        MissionUploader(self.master, None).upload(waypoints(3))
+
+        assert vehicle.received == [0, 1, 2]
+
+
+class TestUAVControlUploadMission(unittest.TestCase):
+    def test_upload_mission(self):
+        master = FakeMaster()
+        vehicle = FakeMissionVehicle(master)
+        uav = UAVControl.__new__(UAVControl)
+        uav.master = master
+
+        stats = uav.upload_mission(waypoints(10))
+
+        assert stats['items'] == 10
+        assert len(vehicle.received) == 10
+
+    def test_upload_mission_failure(self):
+        master = FakeMaster()
+        FakeMissionVehicle(master, reject=mavlink.MAV_MISSION_ERROR)
+        uav = UAVControl.__new__(UAVControl)
+        uav.master = master
+
+        with pytest.raises(RuntimeError, match="Failed to upload mission: Миссия отклонена"):
+            uav.upload_mission(waypoints(1))
+
+
+class TestMissionDiff(unittest.TestCase):
+    def setUp(self):
+        self.master = FakeMaster()
+        self.vehicle = FakeMissionVehicle(self.master)
+        self.reader = TelemetryReader(self.master, poll_timeout=0.01).start()
+        self.uploader = MissionUploader(self.master, self.reader)
+        self.cache = MissionCache()
+
+    def tearDown(self):
+        self.reader.stop()
+
+    def test_changed_ranges(self):
+        old = waypoints(10)
+        new = list(old)
+        for seq in (1, 3, 8):
+            new[seq] = new[seq]._replace(alt=99.0)
+
+        assert changed_ranges(old, new) == [(1, 4), (8, 9)]
+        assert changed_ranges(old, new, merge_gap=0) == [(1, 2), (3, 4), (8, 9)]
+        assert changed_ranges(old, old) == []
+
+    def test_first_sync_uploads_everything(self):
+        stats = self.uploader.sync(waypoints(20), self.cache)
+
+        assert stats['full'] is True
+        assert stats['items'] == 20
+        assert len(self.cache.get(1)) == 20
+
+    def test_single_edit_sends_one_item(self):
+        items = waypoints(200)
+        self.uploader.sync(items, self.cache)
+        self.vehicle.received.clear()
+        items[120] = items[120]._replace(lat=55.8)
+
+        stats = self.uploader.sync(items, self.cache)
+
+        assert stats == {'items': 1, 'retransmissions': 0, 'writes': 1, 'full': False,
+                         'duration': stats['duration']}
+        assert self.vehicle.received == [120]
+        assert round(self.vehicle.mission[120].lat, 7) == 55.8
+        self.master.mav.mission_write_partial_list_send.assert_called_once_with(1, 1, 120, 120)
+
+    def test_unchanged_mission_sends_nothing(self):
+        items = waypoints(5)
+        self.uploader.sync(items, self.cache)
+        self.vehicle.received.clear()
+
+        stats = self.uploader.sync(items, self.cache)
+
+        assert stats['writes'] == 0
+        assert self.vehicle.received == []
+
+    def test_length_change_uploads_everything(self):
+        self.uploader.sync(waypoints(5), self.cache)
+
+        stats = self.uploader.sync(waypoints(6), self.cache)
+
+        assert stats['full'] is True
+        assert self.vehicle.counts == 2
+
+    def test_failure_invalidates_cache(self):
+        items = waypoints(5)
+        self.uploader.sync(items, self.cache)
+        self.vehicle.reject = mavlink.MAV_MISSION_ERROR
+        items[2] = items[2]._replace(alt=1.0)
+
+        with pytest.raises(RuntimeError):
+            self.uploader.sync(items, self.cache)
+        assert self.cache.get(1) is None
+
+    def test_uav_control_update_mission(self):
+        uav = UAVControl.__new__(UAVControl)
+        uav.master = self.master
+        uav.telemetry_reader = self.reader
+        items = waypoints(30)
+        uav.upload_mission(items)
+        self.vehicle.received.clear()
+        items[0] = items[0]._replace(alt=5.0)
+
+        stats = uav.update_mission(items)
+
+        assert stats['items'] == 1
+        assert self.vehicle.received == [0]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,267 @@
+# test_param_manager.py
+import os
+import struct
+import tempfile
+import threading
+import time
+import unittest
+import zlib
+from unittest.mock import MagicMock
+
+import pytest
+from pymavlink import mavutil
+from param_manager import ParamManager
+from telemetry_reader import TelemetryReader
+from test_telemetry_reader import FakeMaster, make_msg
+from uav_control import UAVControl
+import logging
+
+logging.getLogger('uav_control').disabled = True
+logging.getLogger('param_manager').disabled = True
+
+mavlink = mavutil.mavlink
+FIRMWARE = '040500ff-0102030405060708'
+
+
+class FakeParamVehicle:
+    """Автопилот-заглушка: отвечает на протокол параметров через очередь FakeMaster."""
+
+    def __init__(self, master, count=50, drop=(), hash_check=True):
+        self.master = master
+        self.params = {f'PARAM_{i:03d}': float(i) for i in range(count)}
+        self.drop = set(drop)  # Индексы, теряемые в ответе на PARAM_REQUEST_LIST
+        self.hash_check = hash_check  # Поддержка _HASH_CHECK
+        self.list_requests = 0
+        self.read_requests = []
+        mav = MagicMock()
+        mav.param_request_list_send.side_effect = self.on_list
+        mav.param_request_read_send.side_effect = self.on_read
+        mav.param_set_send.side_effect = self.on_set
+        mav.command_long_send.side_effect = self.on_command
+        master.mav = mav
+        master.target_system = 1
+        master.target_component = 1
+        master.mode_mapping = MagicMock(return_value={'GUIDED': 4, 'LAND': 9})
+
+    def value(self, index):
+        name = list(self.params)[index]
+        return make_msg('PARAM_VALUE', param_id=name, param_value=self.params[name],
+                        param_type=mavlink.MAV_PARAM_TYPE_REAL32,
+                        param_count=len(self.params), param_index=index)
+
+    def on_list(self, target_system, target_component):
+        self.list_requests += 1
+        for index in range(len(self.params)):
+            if index not in self.drop:
+                self.master.messages.put(self.value(index))
+
+    def on_read(self, target_system, target_component, param_id, index):
+        if param_id == b'_HASH_CHECK':
+            if self.hash_check:
+                crc = 0
+                for name, value in self.params.items():
+                    crc = zlib.crc32(name.encode() + struct.pack('<f', value), crc)
+                value = struct.unpack('<f', struct.pack('<I', crc))[0]
+                self.master.messages.put(make_msg(
+                    'PARAM_VALUE', param_id='_HASH_CHECK', param_value=value,
+                    param_type=mavlink.MAV_PARAM_TYPE_UINT32,
+                    param_count=len(self.params), param_index=-1))
+            return
+        self.read_requests.append(index)
+        self.master.messages.put(self.value(index))
+
+    def on_set(self, target_system, target_component, param_id, value, param_type):
+        name = param_id.decode('ascii')
+        self.params[name] = value
+        self.master.messages.put(self.value(list(self.params).index(name)))
+
+    def on_command(self, target_system, target_component, command, *params):
+        if command == mavlink.MAV_CMD_REQUEST_MESSAGE:
+            self.master.messages.put(make_msg('AUTOPILOT_VERSION', flight_sw_version=0x040500ff,
+                                              flight_custom_version=[1, 2, 3, 4, 5, 6, 7, 8]))
+
+
+class TestParamManager(unittest.TestCase):
+    def setUp(self):
+        self.master = FakeMaster()
+        self.reader = TelemetryReader(self.master, poll_timeout=0.01).start()
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.reader.stop()
+        self.cache_dir.cleanup()
+
+    def manager(self, **kwargs):
+        return ParamManager(self.master, self.reader, self.cache_dir.name, timeout=0.05, **kwargs)
+
+    def test_fetch_all(self):
+        vehicle = FakeParamVehicle(self.master)
+
+        params = self.manager().fetch_all()
+
+        assert params == vehicle.params
+        assert vehicle.list_requests == 1
+        assert vehicle.read_requests == []
+
+    def test_gaps_are_requested_by_index(self):
+        vehicle = FakeParamVehicle(self.master, drop={0, 7, 49})
+
+        params = self.manager().fetch_all()
+
+        assert len(params) == 50
+        assert vehicle.read_requests == [0, 7, 49]
+        assert vehicle.list_requests == 1
+
+    def test_no_answer(self):
+        FakeParamVehicle(self.master)
+        self.master.mav = MagicMock()  # Аппарат не отвечает
+
+        with pytest.raises(TimeoutError):
+            self.manager(retries=1).fetch_all()
+
+    def test_firmware_hash(self):
+        FakeParamVehicle(self.master)
+
+        assert self.manager().firmware_hash(timeout=1) == FIRMWARE
+
+    def test_reconnect_uses_disk_cache(self):
+        FakeParamVehicle(self.master)
+        self.manager().load()
+        assert os.path.exists(os.path.join(self.cache_dir.name, f'params_1_{FIRMWARE}.json'))
+
+        vehicle = FakeParamVehicle(self.master)
+        manager = self.manager()
+        params = manager.load()
+
+        assert params == vehicle.params
+        assert vehicle.list_requests == 0
+        assert vehicle.read_requests == []  # Проверяется только _HASH_CHECK
+        assert manager.get('PARAM_010') == 10.0
+
+    def test_changed_value_is_refetched(self):
+        # Число параметров то же, но значение изменено другой станцией
+        FakeParamVehicle(self.master)
+        self.manager().load()
+
+        vehicle = FakeParamVehicle(self.master)
+        vehicle.params['PARAM_005'] = 55.0
+        params = self.manager().load()
+
+        assert params['PARAM_005'] == 55.0
+        assert vehicle.list_requests == 1
+
+    def test_cache_without_hash_check(self):
+        # Без _HASH_CHECK кэш не проверить: с verify параметры загружаются заново
+        FakeParamVehicle(self.master, hash_check=False)
+        self.manager().load()
+
+        vehicle = FakeParamVehicle(self.master, hash_check=False)
+        self.manager().load()
+        assert vehicle.list_requests == 1
+
+        vehicle = FakeParamVehicle(self.master, hash_check=False)
+        self.manager().load(verify=False)
+        assert vehicle.list_requests == 0
+
+    def test_stale_cache_is_refetched(self):
+        FakeParamVehicle(self.master, count=10)
+        self.manager().load()
+
+        vehicle = FakeParamVehicle(self.master, count=12)
+        params = self.manager().load()
+
+        assert len(params) == 12
+        assert vehicle.list_requests == 1
+
+    def test_set_updates_cache(self):
+        vehicle = FakeParamVehicle(self.master)
+        manager = self.manager()
+        manager.load()
+
+        assert manager.set('PARAM_003', 42.0) == 42.0
+        assert vehicle.params['PARAM_003'] == 42.0
+
+        FakeParamVehicle(self.master)
+        assert self.manager().load(verify=False)['PARAM_003'] == 42.0
+
+    def test_set_timeout_is_not_extended_by_other_params(self):
+        vehicle = FakeParamVehicle(self.master)
+        manager = self.manager()
+        manager.load()
+        # Аппарат передаёт другие параметры, но не подтверждает запись
+        self.master.mav.param_set_send.side_effect = None
+        stop = threading.Event()
+
+        def chatter():
+            while not stop.wait(0.02):
+                self.master.messages.put(vehicle.value(1))
+
+        threading.Thread(target=chatter, daemon=True).start()
+        start = time.monotonic()
+        try:
+            with pytest.raises(TimeoutError):
+                manager.set('PARAM_003', 42.0, timeout=0.2)
+        finally:
+            stop.set()
+        assert time.monotonic() - start < 1
+
+    def test_set_keeps_cache_verified(self):
+        vehicle = FakeParamVehicle(self.master)
+        manager = self.manager()
+        manager.load()
+        manager.set('PARAM_003', 42.0)
+        vehicle.list_requests = 0
+
+        params = self.manager().load()
+
+        assert params['PARAM_003'] == 42.0
+        assert vehicle.list_requests == 0
+
+    def test_mode_mapping_is_cached(self):
+        FakeParamVehicle(self.master)
+        manager = self.manager()
+        manager.load()
+
+        assert manager.mode_mapping() == {'GUIDED': 4, 'LAND': 9}
+        assert manager.mode_mapping() == {'GUIDED': 4, 'LAND': 9}
+        assert self.master.mode_mapping.call_count == 1
+
+        FakeParamVehicle(self.master)
+        manager = self.manager()
+        manager.load(verify=False)
+        assert manager.mode_mapping()['LAND'] == 9
+        self.master.mode_mapping.assert_not_called()
+
+
+class TestUAVControlParams(unittest.TestCase):
+    def setUp(self):
+        self.master = FakeMaster()
+        self.vehicle = FakeParamVehicle(self.master)
+        self.uav = UAVControl.__new__(UAVControl)
+        self.uav.master = self.master
+
+    def test_load_and_set_parameters(self):
+        params = self.uav.load_parameters()
+
+        assert len(params) == 50
+        assert self.uav.set_param('PARAM_001', 5.0) == 5.0
+
+    def test_set_mode_uses_cached_mapping(self):
+        self.uav.param_manager = ParamManager(self.master)
+        self.master.set_mode = MagicMock()
+
+        self.uav.set_mode('GUIDED')
+        self.uav.set_mode('LAND')
+
+        assert self.master.mode_mapping.call_count == 1
+        self.master.set_mode.assert_called_with(9)
+
+    def test_set_param_failure(self):
+        self.master.mav = MagicMock()
+
+        with pytest.raises(RuntimeError, match="Failed to set parameter PARAM_001"):
+            self.uav.set_param('PARAM_001', 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
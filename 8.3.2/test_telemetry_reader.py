@@ -0,0 +1,214 @@
+# test_telemetry_reader.py
+import queue
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import pytest
+from pymavlink import mavutil
+from telemetry_reader import TelemetryReader, parse_telemetry
+from uav_control import UAVControl
+import logging
+
+logging.getLogger('uav_control').disabled = True
+logging.getLogger('telemetry_reader').disabled = True
+
+
+def make_msg(msg_type, **fields):
+    """Сообщение MAVLink-заглушка с заданным типом и полями."""
+    msg = MagicMock(**fields)
+    msg.get_type.return_value = msg_type
+    return msg
+
+
+class FakeMaster:
+    """Соединение-заглушка: recv_match отдаёт сообщения из очереди."""
+
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.closed = False
+
+    def recv_match(self, blocking=True, timeout=None, **kwargs):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.closed = True
+
+
+def position(lat=50.0, lon=50.0, alt=10.0):
+    return make_msg('GLOBAL_POSITION_INT', lat=int(lat * 1e7), lon=int(lon * 1e7),
+                    alt=int(alt * 1000))
+
+
+class TestTelemetryReader(unittest.TestCase):
+    def setUp(self):
+        self.master = FakeMaster()
+        self.reader = TelemetryReader(self.master, poll_timeout=0.01)
+
+    def tearDown(self):
+        self.reader.stop()
+
+    def test_snapshot_merges_message_types(self):
+        self.reader.handle(position())
+        self.reader.handle(make_msg('ATTITUDE', roll=0.1, pitch=0.2, yaw=-0.3))
+
+        snapshot = self.reader.snapshot()
+        assert snapshot == {'lat': 50.0, 'lon': 50.0, 'alt': 10.0,
+                            'roll': 0.1, 'pitch': 0.2, 'yaw': -0.3}
+        assert set(self.reader.timestamps()) == set(snapshot)
+
+    def test_invalid_values_are_skipped(self):
+        self.reader.handle(position())
+        self.reader.handle(position(lat=100.0))
+
+        assert self.reader.snapshot()['lat'] == 50.0
+
+    def test_background_thread_drains_connection(self):
+        self.reader.start()
+        self.master.messages.put(position())
+        self.master.messages.put(make_msg('VFR_HUD', groundspeed=15.0, airspeed=16.0, heading=90))
+
+        deadline = time.time() + 2
+        while 'heading' not in self.reader.snapshot() and time.time() < deadline:
+            time.sleep(0.005)
+        assert self.reader.snapshot()['lat'] == 50.0
+        assert self.reader.snapshot()['heading'] == 90
+
+    def test_wait_message_with_condition(self):
+        self.reader.start()
+        timer = threading.Timer(0.05, lambda: [
+            self.master.messages.put(make_msg('COMMAND_ACK', command=1, result=0)),
+            self.master.messages.put(make_msg('COMMAND_ACK', command=2, result=0)),
+        ])
+        timer.start()
+
+        msg = self.reader.wait_message('COMMAND_ACK', lambda m: m.command == 2, timeout=2)
+        timer.join()
+
+        assert msg.command == 2
+        assert self.reader.last_message('COMMAND_ACK').command == 2
+
+    def test_wait_message_timeout(self):
+        self.reader.start()
+
+        assert self.reader.wait_message('COMMAND_ACK', timeout=0.05) is None
+
+    def test_parse_telemetry_other_type(self):
+        assert parse_telemetry(make_msg('HEARTBEAT')) == {}
+
+
+    def test_failing_listener_keeps_reader_alive(self):
+        received = []
+
+        def failing(msg):
+            raise RuntimeError("listener failed")
+
+        self.reader.subscribe(failing)
+        self.reader.subscribe(received.append)
+        self.reader.start()
+        self.master.messages.put(position(lat=51.0))
+        self.master.messages.put(position(lat=52.0))
+
+        deadline = time.monotonic() + 1
+        while len(received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(received) == 2
+        assert self.reader.snapshot()['lat'] == 52.0
+
+
+class TestUAVControlWithReader(unittest.TestCase):
+    def setUp(self):
+        self.master = FakeMaster()
+        self.uav = UAVControl.__new__(UAVControl)
+        self.uav.master = self.master
+        self.uav.telemetry_reader = TelemetryReader(self.master, poll_timeout=0.01).start()
+
+    def tearDown(self):
+        self.uav.close()
+
+    def test_get_telemetry_does_not_block(self):
+        assert self.uav.get_telemetry() is None
+
+        self.uav.telemetry_reader.handle(position())
+        self.uav.telemetry_reader.handle(make_msg('SYS_STATUS', voltage_battery=11000,
+                                                  battery_remaining=80))
+
+        start = time.time()
+        telemetry = self.uav.get_telemetry()
+        assert time.time() - start < 0.1
+        assert telemetry == {'lat': 50.0, 'lon': 50.0, 'alt': 10.0,
+                             'battery_voltage': 11.0, 'battery_remaining': 80}
+
+    def test_wait_command_ack_keeps_telemetry(self):
+        takeoff = mavutil.mavlink.MAV_CMD_NAV_TAKEOFF
+        threading.Timer(0.05, lambda: [
+            self.master.messages.put(position()),
+            self.master.messages.put(make_msg('COMMAND_ACK', command=takeoff,
+                                              result=mavutil.mavlink.MAV_RESULT_ACCEPTED)),
+        ]).start()
+
+        assert self.uav.wait_command_ack(takeoff, timeout=2) is True
+        assert self.uav.get_telemetry()['lat'] == 50.0
+
+    def test_recv_message_uses_cache(self):
+        self.uav.telemetry_reader.handle(position(lat=55.0))
+
+        msg = self.uav.recv_message('GLOBAL_POSITION_INT', timeout=0.1)
+
+        assert msg.lat == 550000000
+
+    def heartbeat(self, armed):
+        base_mode = mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED if armed else 0
+        msg = make_msg('HEARTBEAT', base_mode=base_mode)
+        msg.get_srcSystem.return_value = 1
+        return msg
+
+    def test_arm_waits_for_heartbeat_through_reader(self):
+        self.master.target_system = 1
+        self.master.motors_armed_wait = MagicMock()
+        self.master.arducopter_arm = MagicMock(side_effect=lambda: [
+            self.master.messages.put(self.heartbeat(False)),
+            self.master.messages.put(self.heartbeat(True)),
+        ])
+
+        self.uav.arm()
+
+        self.master.motors_armed_wait.assert_not_called()
+
+    def test_arm_times_out_without_armed_heartbeat(self):
+        self.master.target_system = 1
+        self.master.arducopter_arm = MagicMock(
+            side_effect=lambda: self.master.messages.put(self.heartbeat(False)))
+
+        with pytest.raises(RuntimeError, match="Failed to arm UAV"):
+            self.uav.arm(timeout=0.2)
+
+    def test_takeoff_waits_for_fresh_position(self):
+        self.uav.telemetry_reader.handle(position(lat=40.0))
+        self.uav.set_mode = MagicMock()
+        self.uav.arm = MagicMock()
+        self.uav.master.mav = MagicMock()
+        self.uav.master.target_system = 1
+        self.uav.master.target_component = 1
+        self.uav.wait_command_ack = MagicMock(return_value=True)
+        threading.Timer(0.05, lambda: self.master.messages.put(position(lat=55.0))).start()
+
+        self.uav.takeoff(10)
+
+        args = self.uav.master.mav.command_long_send.call_args[0]
+        assert args[8] == 55.0
+
+    def test_close_stops_reader(self):
+        self.uav.close()
+
+        assert self.uav.telemetry_reader is None
+        assert self.master.closed
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,27 +3,49 @@
 """
 
 import time
-import math
 import logging
-from typing import Optional, Dict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Optional, Dict, Sequence
 
 from pymavlink import mavutil
 
+from ack_dispatcher import AckDispatcher, CommandAck
+from mission_protocol import (MISSION_RETRIES, MISSION_TIMEOUT, MissionCache, MissionItem,
+                              MissionUploader)
+from param_manager import ParamManager
+from telemetry_reader import MessageStream, TelemetryReader, parse_telemetry
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ACK_TIMEOUT = 3  # Время ожидания подтверждения одной попытки send_command, с
+ACK_RETRIES = 2  # Число повторных отправок команды без подтверждения
+ARM_TIMEOUT = 10  # Время ожидания смены состояния двигателей по HEARTBEAT, с
+
 
 class UAVControl:
     """
     Класс для управления БПЛА через MAVLink.
     """
 
-    def __init__(self, connection_string: str):
+    # Поток чтения телеметрии; None - сообщения читаются напрямую через recv_match
+    telemetry_reader: Optional[TelemetryReader] = None
+    # Диспетчер подтверждений команд; работает поверх telemetry_reader
+    ack_dispatcher: Optional[AckDispatcher] = None
+    # Миссии, подтверждённые аппаратами; создаётся при первой загрузке
+    mission_cache: Optional[MissionCache] = None
+    # Параметры и режимы полёта аппарата; None - режимы запрашиваются у master
+    param_manager: Optional[ParamManager] = None
+
+    def __init__(self, connection_string: str, start_reader: bool = True,
+                 param_cache_dir: Optional[str] = None):
         """
         Инициализация подключения к БПЛА.
 
         Args:
             connection_string (str): Строка подключения MAVLink.
+            start_reader (bool): Запустить фоновый поток чтения телеметрии.
+            param_cache_dir (Optional[str]): Каталог кэша параметров на диске.
         """
         try:
             self.master = mavutil.mavlink_connection(connection_string)
@@ -33,26 +55,174 @@ class UAVControl:
         except Exception as e:
             logger.error("Ошибка подключения: %s", e)
             raise ConnectionError(f"Failed to connect to UAV: {e}") from e
+        if start_reader:
+            self.telemetry_reader = TelemetryReader(self.master)
+            self.ack_dispatcher = AckDispatcher(self.telemetry_reader)
+            self.telemetry_reader.start()
+        self.param_manager = ParamManager(self.master, self.telemetry_reader, param_cache_dir)
+
+    def close(self) -> None:
+        """
+        Остановка потока телеметрии и закрытие соединения.
+        """
+        if self.telemetry_reader is not None:
+            self.telemetry_reader.stop()
+            self.telemetry_reader = None
+        self.master.close()
+
+    def expect_ack(self, command: int) -> Optional[Future]:
+        """
+        Регистрация ожидания подтверждения до отправки команды.
+
+        Подтверждение, пришедшее до вызова wait_command_ack, не теряется.
+        Без диспетчера подтверждений ничего не делает.
+
+        Args:
+            command (int): Код команды MAVLink.
+
+        Returns:
+            Optional[Future]: Ожидание для cancel_ack или None без диспетчера.
+        """
+        if self.ack_dispatcher is None:
+            return None
+        return self.ack_dispatcher.expect(command, self.master.target_system)
+
+    def cancel_ack(self, future: Optional[Future]) -> None:
+        """
+        Отмена ожидания, зарегистрированного expect_ack.
+
+        Вызывается, если отправка команды или wait_command_ack не состоялись;
+        для уже полученного подтверждения ничего не делает.
+
+        Args:
+            future (Optional[Future]): Результат expect_ack.
+        """
+        if future is not None and self.ack_dispatcher is not None:
+            self.ack_dispatcher.discard(future)
+
+    def send_command(self, command: int, *params: float, timeout: float = ACK_TIMEOUT,
+                     retries: int = ACK_RETRIES) -> Optional[CommandAck]:
+        """
+        Отправка COMMAND_LONG с ожиданием подтверждения и повторами.
+
+        Можно вызывать из нескольких потоков одновременно: подтверждения
+        распределяются по командам диспетчером.
+
+        Args:
+            command (int): Код команды MAVLink.
+            *params (float): До семи параметров команды (недостающие - 0).
+            timeout (float): Время ожидания подтверждения одной попытки, с.
+            retries (int): Число повторных отправок.
+
+        Returns:
+            Optional[CommandAck]: Результат с задержкой подтверждения или None.
+        """
+        if self.ack_dispatcher is None:
+            raise RuntimeError("Диспетчер подтверждений не запущен")
+        values = list(params) + [0] * (7 - len(params))
+        for confirmation in range(retries + 1):
+            future = self.ack_dispatcher.register(command, self.master.target_system)
+            self.master.mav.command_long_send(
+                self.master.target_system,
+                self.master.target_component,
+                command,
+                confirmation,  # Номер повторной отправки
+                *values
+            )
+            try:
+                ack = future.result(timeout)
+            except FutureTimeoutError:
+                self.ack_dispatcher.discard(future)
+                logger.warning("Нет подтверждения команды %s, попытка %s", command,
+                               confirmation + 1)
+                continue
+            logger.info("Команда %s: результат %s за %.3f с", command, ack.result, ack.latency)
+            return ack
+        return None
+
+    def recv_message(self, msg_type: str, timeout: float = 5,
+                     fresh: bool = False) -> Optional[Any]:
+        """
+        Получение сообщения заданного типа.
+
+        При работающем потоке телеметрии возвращается последнее полученное
+        сообщение (или ожидается первое), иначе соединение читается напрямую.
+
+        Args:
+            msg_type (str): Тип сообщения MAVLink.
+            timeout (float): Время ожидания в секундах.
+            fresh (bool): Ждать сообщения, полученного после вызова, а не брать
+                последнее из кэша потока телеметрии.
+
+        Returns:
+            Сообщение MAVLink или None.
+        """
+        if self.telemetry_reader is None:
+            return self.master.recv_match(type=msg_type, blocking=True, timeout=timeout)
+        msg = None if fresh else self.telemetry_reader.last_message(msg_type)
+        if msg is None:
+            msg = self.telemetry_reader.wait_message(msg_type, timeout=timeout)
+        return msg
 
-    def arm(self) -> None:
+    def _wait_armed(self, stream: MessageStream, armed: bool,
+                    timeout: float = ARM_TIMEOUT) -> None:
+        """
+        Ожидание HEARTBEAT аппарата с нужным состоянием двигателей.
+
+        Соединение читает только поток телеметрии: motors_armed_wait
+        вызывает recv_match из другого потока и теряет сообщения.
+
+        Args:
+            stream (MessageStream): Поток HEARTBEAT, открытый до отправки команды.
+            armed (bool): Ожидаемое состояние двигателей.
+            timeout (float): Время ожидания в секундах.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            msg = stream.get(remaining) if remaining > 0 else None
+            if msg is None:
+                raise TimeoutError("Нет HEARTBEAT с ожидаемым состоянием двигателей")
+            if msg.get_srcSystem() != self.master.target_system:
+                continue
+            if bool(msg.base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED) == armed:
+                return
+
+    def arm(self, timeout: float = ARM_TIMEOUT) -> None:
         """
         Arm БПЛА для начала работы двигателей.
+
+        Args:
+            timeout (float): Время ожидания HEARTBEAT с включёнными двигателями, с.
         """
         try:
-            self.master.arducopter_arm()
-            self.master.motors_armed_wait()
+            if self.telemetry_reader is None:
+                self.master.arducopter_arm()
+                self.master.motors_armed_wait()
+            else:
+                with MessageStream(self.master, self.telemetry_reader, ['HEARTBEAT']) as stream:
+                    self.master.arducopter_arm()
+                    self._wait_armed(stream, True, timeout)
             logger.info("БПЛА армирован")
         except Exception as e:
             logger.error("Ошибка армирования БПЛА: %s", e)
             raise RuntimeError(f"Failed to arm UAV: {e}") from e
 
-    def disarm(self) -> None:
+    def disarm(self, timeout: float = ARM_TIMEOUT) -> None:
         """
         Disarm БПЛА для остановки двигателей.
+
+        Args:
+            timeout (float): Время ожидания HEARTBEAT с выключенными двигателями, с.
         """
         try:
-            self.master.arducopter_disarm()
-            self.master.motors_disarmed_wait()
+            if self.telemetry_reader is None:
+                self.master.arducopter_disarm()
+                self.master.motors_disarmed_wait()
+            else:
+                with MessageStream(self.master, self.telemetry_reader, ['HEARTBEAT']) as stream:
+                    self.master.arducopter_disarm()
+                    self._wait_armed(stream, False, timeout)
             logger.info("БПЛА disarmed")
         except Exception as e:
             logger.error("Ошибка disarm БПЛА: %s", e)
@@ -72,26 +242,31 @@ class UAVControl:
             self.set_mode('GUIDED')
             self.arm()
 
-            # Получение текущих координат
-            msg = self.master.recv_match(type='GLOBAL_POSITION_INT', blocking=True, timeout=5)
+            # Получение текущих координат: позиция из кэша могла устареть
+            msg = self.recv_message('GLOBAL_POSITION_INT', timeout=5, fresh=True)
             if msg:
                 current_lat = msg.lat / 1e7
                 current_lon = msg.lon / 1e7
             else:
                 raise RuntimeError("Не удалось получить текущие координаты для взлёта")
 
-            self.master.mav.command_long_send(
-                self.master.target_system,
-                self.master.target_component,
-                mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
-                0,
-                0, 0, 0, 0,
-                current_lat,  # param5: Широта взлёта
-                current_lon,  # param6: Долгота взлёта
-                altitude      # param7: Высота взлёта
-            )
-
-            if not self.wait_command_ack(mavutil.mavlink.MAV_CMD_NAV_LAND):
+            expected = self.expect_ack(mavutil.mavlink.MAV_CMD_NAV_TAKEOFF)
+            try:
+                self.master.mav.command_long_send(
+                    self.master.target_system,
+                    self.master.target_component,
+                    mavutil.mavlink.MAV_CMD_NAV_TAKEOFF,
+                    0,
+                    0, 0, 0, 0,
+                    current_lat,  # param5: Широта взлёта
+                    current_lon,  # param6: Долгота взлёта
+                    altitude      # param7: Высота взлёта
+                )
+                acknowledged = self.wait_command_ack(mavutil.mavlink.MAV_CMD_NAV_TAKEOFF)
+            finally:
+                # Ожидание не должно остаться в диспетчере, если отправка не удалась
+                self.cancel_ack(expected)
+            if not acknowledged:
                 raise RuntimeError("Команда взлёта не подтверждена")
             logger.info("Взлёт на высоту %s метров", altitude)
         except Exception as e:
@@ -115,7 +290,10 @@ class UAVControl:
         Args:
             mode (str): Название режима (например, 'GUIDED', 'LAND').
         """
-        mode_mapping = self.master.mode_mapping()
+        if self.param_manager is not None:
+            mode_mapping = self.param_manager.mode_mapping()
+        else:
+            mode_mapping = self.master.mode_mapping()
         if not isinstance(mode_mapping, dict):
             logger.error("Ошибка: mode_mapping() не вернул словарь")
             raise RuntimeError("Не удалось получить список режимов полёта")
@@ -131,13 +309,57 @@ class UAVControl:
             logger.error("Ошибка установки режима %s: %s", mode, e)
             raise RuntimeError(f"Failed to set mode {mode}: {e}") from e
 
+    def load_parameters(self, verify: bool = True) -> Dict[str, float]:
+        """
+        Загрузка всех параметров аппарата (из кэша на диске, если он актуален).
+
+        Args:
+            verify (bool): Сверить хэш значений кэша (_HASH_CHECK) с аппаратом.
+
+        Returns:
+            Dict[str, float]: Параметры по именам.
+        """
+        if self.param_manager is None:
+            self.param_manager = ParamManager(self.master, self.telemetry_reader)
+        try:
+            return self.param_manager.load(verify=verify)
+        except Exception as e:
+            logger.error("Ошибка загрузки параметров: %s", e)
+            raise RuntimeError(f"Failed to load parameters: {e}") from e
+
+    def set_param(self, name: str, value: float) -> float:
+        """
+        Запись параметра аппарата с ожиданием подтверждения.
+
+        Args:
+            name (str): Имя параметра.
+            value (float): Новое значение.
+
+        Returns:
+            float: Значение, подтверждённое аппаратом.
+        """
+        if self.param_manager is None:
+            self.param_manager = ParamManager(self.master, self.telemetry_reader)
+        try:
+            return self.param_manager.set(name, value)
+        except Exception as e:
+            logger.error("Ошибка записи параметра %s: %s", name, e)
+            raise RuntimeError(f"Failed to set parameter {name}: {e}") from e
+
     def get_telemetry(self) -> Optional[Dict[str, float]]:
         """
         Получение телеметрических данных от БПЛА.
-    
+
+        При работающем потоке телеметрии возвращает без ожидания последние
+        значения всех полей (время их получения - telemetry_reader.timestamps()).
+        Без него ждёт одно сообщение до 5 секунд и возвращает только его поля.
+
         Returns:
             Optional[Dict[str, float]]: Словарь с телеметрическими данными или None.
         """
+        if self.telemetry_reader is not None:
+            telemetry = self.telemetry_reader.snapshot()
+            return telemetry or None
         try:
             msg = self.master.recv_match(
                 type=['GLOBAL_POSITION_INT', 'ATTITUDE', 'VFR_HUD', 'SYS_STATUS'],
@@ -145,36 +367,7 @@ class UAVControl:
                 timeout=5
             )
             if msg:
-                telemetry = {}
-                msg_type = msg.get_type()
-                if msg_type == 'GLOBAL_POSITION_INT':
-                    telemetry['lat'] = msg.lat / 1e7
-                    telemetry['lon'] = msg.lon / 1e7
-                    telemetry['alt'] = msg.alt / 1000
-                    # Проверка диапазонов значений
-                    if not -90.0 <= telemetry['lat'] <= 90.0:
-                        raise ValueError("Некорректная широта")
-                    if not -180.0 <= telemetry['lon'] <= 180.0:
-                        raise ValueError("Некорректная долгота")
-                elif msg_type == 'ATTITUDE':
-                    telemetry['roll'] = msg.roll
-                    telemetry['pitch'] = msg.pitch
-                    telemetry['yaw'] = msg.yaw
-                    # Проверка диапазонов углов
-                    if not -math.pi <= telemetry['roll'] <= math.pi:
-                        raise ValueError("Некорректный крен")
-                    if not -math.pi / 2 <= telemetry['pitch'] <= math.pi / 2:
-                        raise ValueError("Некорректный тангаж")
-                    if not -math.pi <= telemetry['yaw'] <= math.pi:
-                        raise ValueError("Некорректное рыскание")
-                elif msg_type == 'VFR_HUD':
-                    telemetry['groundspeed'] = msg.groundspeed
-                    telemetry['airspeed'] = msg.airspeed
-                    telemetry['heading'] = msg.heading
-                elif msg_type == 'SYS_STATUS':
-                    telemetry['battery_voltage'] = msg.voltage_battery / 1000  # В вольтах
-                    telemetry['battery_remaining'] = msg.battery_remaining  # В процентах
-                return telemetry
+                return parse_telemetry(msg)
             logger.warning("Телеметрия недоступна")
             return None
         except ValueError as e:
@@ -195,16 +388,31 @@ class UAVControl:
         Returns:
             bool: True, если команда подтверждена, False в противном случае.
         """
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            ack_msg = self.master.recv_match(type='COMMAND_ACK', blocking=True, timeout=1)
-            if ack_msg and ack_msg.command == command:
-                if ack_msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
-                    logger.info("Команда %s подтверждена", command)
-                    return True
-                logger.error("Команда %s отклонена с кодом %s", command, ack_msg.result)
-                return False
-        logger.error("Не получено подтверждение для команды %s", command)
+        ack_msg = None
+        if self.ack_dispatcher is not None:
+            future = self.ack_dispatcher.claim(command, self.master.target_system)
+            try:
+                ack_msg = future.result(timeout)
+            except FutureTimeoutError:
+                self.ack_dispatcher.discard(future)
+        elif self.telemetry_reader is not None:
+            ack_msg = self.telemetry_reader.wait_message(
+                'COMMAND_ACK', lambda msg: msg.command == command, timeout)
+        else:
+            start_time = time.time()
+            while time.time() - start_time < timeout:
+                msg = self.master.recv_match(type='COMMAND_ACK', blocking=True, timeout=1)
+                if msg and msg.command == command:
+                    ack_msg = msg
+                    break
+
+        if ack_msg is None:
+            logger.error("Не получено подтверждение для команды %s", command)
+            return False
+        if ack_msg.result == mavutil.mavlink.MAV_RESULT_ACCEPTED:
+            logger.info("Команда %s подтверждена", command)
+            return True
+        logger.error("Команда %s отклонена с кодом %s", command, ack_msg.result)
         return False
 
     def goto(self, lat: float, lon: float, alt: float) -> None:
@@ -249,3 +457,60 @@ class UAVControl:
         except Exception as e:
             logger.error("Ошибка при полёте к точке: %s", e)
             raise RuntimeError(f"Failed to go to waypoint: {e}") from e
+
+    def upload_mission(self, items: Sequence[MissionItem], timeout: float = MISSION_TIMEOUT,
+                       retries: int = MISSION_RETRIES) -> Dict[str, float]:
+        """
+        Загрузка всей миссии за одно рукопожатие.
+
+        В отличие от goto для каждой точки, пункты отправляются в ответ на
+        MISSION_REQUEST_INT по мере их прихода, с повтором по таймауту и
+        завершением по MISSION_ACK. У ArduPilot пункт 0 - домашняя точка.
+
+        Args:
+            items (Sequence[MissionItem]): Пункты миссии.
+            timeout (float): Время ожидания ответа до повторной отправки, с.
+            retries (int): Число повторных отправок подряд.
+
+        Returns:
+            Dict[str, float]: Статистика загрузки (items, retransmissions, duration).
+        """
+        if self.mission_cache is None:
+            self.mission_cache = MissionCache()
+        items = list(items)
+        try:
+            uploader = MissionUploader(self.master, self.telemetry_reader, timeout, retries)
+            stats = uploader.upload(items)
+        except Exception as e:
+            self.mission_cache.invalidate(self.master.target_system)
+            logger.error("Ошибка загрузки миссии: %s", e)
+            raise RuntimeError(f"Failed to upload mission: {e}") from e
+        self.mission_cache.store(self.master.target_system, items)
+        return stats
+
+    def update_mission(self, items: Sequence[MissionItem], timeout: float = MISSION_TIMEOUT,
+                       retries: int = MISSION_RETRIES) -> Dict[str, float]:
+        """
+        Обновление миссии с передачей только изменённых пунктов.
+
+        Сравнивает items с копией, последней подтверждённой аппаратом, и
+        записывает изменённые участки через MISSION_WRITE_PARTIAL_LIST.
+        Без подтверждённой копии или при изменении числа пунктов миссия
+        загружается целиком.
+
+        Args:
+            items (Sequence[MissionItem]): Новая миссия целиком.
+            timeout (float): Время ожидания ответа до повторной отправки, с.
+            retries (int): Число повторных отправок подряд.
+
+        Returns:
+            Dict[str, float]: Статистика (items, writes, retransmissions, duration, full).
+        """
+        if self.mission_cache is None:
+            self.mission_cache = MissionCache()
+        try:
+            uploader = MissionUploader(self.master, self.telemetry_reader, timeout, retries)
+            return uploader.sync(items, self.mission_cache)
+        except Exception as e:
+            logger.error("Ошибка обновления миссии: %s", e)
+            raise RuntimeError(f"Failed to update mission: {e}") from e
@@ -0,0 +1,227 @@
+import numpy as np
+
+from drone_accelerometer import inclination_series
+
+# Кватернионы хранятся как (w, x, y, z); углы Эйлера - (крен, тангаж, рыскание) в градусах
+IDENTITY = np.array([1.0, 0.0, 0.0, 0.0])
+DEFAULT_ALPHA = 0.98  # доля гироскопа в комплементарном фильтре
+
+def quat_multiply(p, q):
+    """Произведение кватернионов p * q (поэлементно по последней оси)."""
+    pw, px, py, pz = np.moveaxis(p, -1, 0)
+    qw, qx, qy, qz = np.moveaxis(q, -1, 0)
+    return np.stack((
+        pw * qw - px * qx - py * qy - pz * qz,
+        pw * qx + px * qw + py * qz - pz * qy,
+        pw * qy - px * qz + py * qw + pz * qx,
+        pw * qz + px * qy - py * qx + pz * qw,
+    ), axis=-1)
+
+def quat_from_rotation(rotation):
+    """Кватернион поворота по вектору rotation = ось * угол (рад)."""
+    angle = np.linalg.norm(rotation, axis=-1, keepdims=True)
+    half = 0.5 * angle
+    # sin(a/2)/a -> 1/2 при малых углах
+    scale = np.where(angle > 1e-12, np.sin(half) / np.where(angle > 1e-12, angle, 1.0), 0.5)
+    return np.concatenate((np.cos(half), rotation * scale), axis=-1)
+
+def quat_to_euler(q):
+    """Углы Эйлера ZYX (крен, тангаж, рыскание) в градусах."""
+    w, x, y, z = np.moveaxis(q, -1, 0)
+    roll = np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    pitch = np.arcsin(np.clip(2 * (w * y - z * x), -1.0, 1.0))
+    yaw = np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    return np.degrees(np.stack((roll, pitch, yaw), axis=-1))
+
+def euler_to_quat(euler):
+    """Кватернион по углам Эйлера ZYX (крен, тангаж, рыскание) в градусах."""
+    roll, pitch, yaw = np.moveaxis(np.radians(euler) / 2, -1, 0)
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    return np.stack((
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy,
+    ), axis=-1)
+
+def accel_tilt(accel):
+    """
+    Крен и тангаж (град) по акселерометру через inclination_series.
+
+    Наклон по Y из data_acs соответствует крену, наклон по X - тангажу
+    с обратным знаком (нос вверх - отрицательное ускорение по X).
+    """
+    inclination = inclination_series(np.asarray(accel, dtype=float))
+    return np.stack((inclination[:, 1], -inclination[:, 0]), axis=-1)
+
+def _wrap(angle):
+    """Приведение углов к диапазону [-180, 180)."""
+    return (angle + 180.0) % 360.0 - 180.0
+
+def _scan_quaternions(increments):
+    """Префиксное произведение кватернионов (Hillis-Steele, log2(N) проходов)."""
+    result = increments.copy()
+    step = 1
+    while step < len(result):
+        result[step:] = quat_multiply(result[:-step], result[step:])
+        step *= 2
+    return result
+
+def _scan_recurrence(alpha, inputs):
+    """Решение x[k] = alpha * x[k-1] + inputs[k], x[-1] = 0, префиксным сканированием."""
+    factor = np.full(len(inputs), alpha)
+    result = inputs.copy()
+    step = 1
+    while step < len(result):
+        result[step:] = result[step:] + factor[step:, None] * result[:-step]
+        factor[step:] = factor[step:] * factor[:-step]
+        step *= 2
+    return result
+
+def integrate_gyro(timestamps, gyro, q0=None):
+    """
+    Интегрирование угловых скоростей в ориентацию.
+
+    Args:
+        timestamps: Метки времени (с) формы (N,).
+        gyro: Угловые скорости в связанной системе (град/с) формы (N, 3);
+            скорость отсчета k действует на интервале до отсчета k + 1.
+        q0: Начальная ориентация (кватернион), по умолчанию - IDENTITY.
+
+    Returns:
+        Массив нормированных кватернионов формы (N, 4).
+    """
+    timestamps = np.asarray(timestamps, dtype=float)
+    gyro = np.asarray(gyro, dtype=float)
+    if gyro.ndim != 2 or gyro.shape[1] != 3 or len(gyro) != len(timestamps):
+        raise ValueError("Ожидаются метки времени (N,) и угловые скорости (N, 3).")
+    if len(gyro) == 0:
+        return np.zeros((0, 4))
+
+    increments = np.empty((len(gyro), 4))
+    increments[0] = IDENTITY if q0 is None else q0
+    rotation = np.radians(gyro[:-1]) * np.diff(timestamps)[:, None]
+    increments[1:] = quat_from_rotation(rotation)
+
+    quaternions = _scan_quaternions(increments)
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    return quaternions
+
+def attitude_series(timestamps, gyro, accel=None, alpha=DEFAULT_ALPHA, q0=None):
+    """
+    Ориентация за весь полет в пакетном режиме.
+
+    Без accel - чистое интегрирование гироскопа. С accel крен и тангаж
+    корректируются комплементарным фильтром:
+    angle[k] = alpha * (angle[k-1] + d_gyro[k]) + (1 - alpha) * accel_tilt[k],
+    где d_gyro - приращение угла по гироскопу; рыскание остается по гироскопу.
+
+    Args:
+        timestamps: Метки времени (с) формы (N,).
+        gyro: Угловые скорости (град/с) формы (N, 3).
+        accel: Ускорения (g) формы (N, 3) или None.
+        alpha: Доля гироскопа в фильтре (0 < alpha <= 1).
+        q0: Начальная ориентация (кватернион).
+
+    Returns:
+        Словарь:
+        - quaternion: Массив кватернионов (N, 4).
+        - euler: Массив углов крен, тангаж, рыскание (N, 3) (град).
+    """
+    quaternions = integrate_gyro(timestamps, gyro, q0)
+    euler = quat_to_euler(quaternions)
+    if accel is None or len(euler) == 0:
+        return {"quaternion": quaternions, "euler": euler}
+    if not 0 < alpha <= 1:
+        raise ValueError("alpha должен быть в диапазоне (0, 1].")
+
+    tilt = accel_tilt(accel)
+    inputs = (1 - alpha) * tilt
+    inputs[0] += alpha * euler[0, :2]
+    inputs[1:] += alpha * _wrap(np.diff(euler[:, :2], axis=0))
+    euler[:, :2] = _wrap(_scan_recurrence(alpha, inputs))
+
+    return {"quaternion": euler_to_quat(euler), "euler": euler}
+
+class AttitudeEstimator:
+    """
+    Потоковая оценка ориентации с предварительно выделенными буферами.
+
+    Результаты совпадают с attitude_series для той же последовательности
+    отсчетов. Последние capacity значений хранятся в кольцевых буферах.
+    """
+
+    def __init__(self, capacity=1024, alpha=DEFAULT_ALPHA, q0=None):
+        """
+        Args:
+            capacity: Размер истории (отсчетов).
+            alpha: Доля гироскопа в комплементарном фильтре.
+            q0: Начальная ориентация (кватернион).
+        """
+        if capacity < 1:
+            raise ValueError("Размер истории должен быть положительным.")
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha должен быть в диапазоне (0, 1].")
+        self.capacity = capacity
+        self.alpha = alpha
+        self.timestamps = np.zeros(capacity)
+        self.quaternions = np.zeros((capacity, 4))
+        self.euler = np.zeros((capacity, 3))
+        self.count = 0
+        self._gyro_quaternion = np.array(IDENTITY if q0 is None else q0, dtype=float)
+        self._gyro_euler = None  # углы по гироскопу на предыдущем отсчете
+        self._tilt = None  # отфильтрованные крен и тангаж
+        self._last_time = None
+        self._last_rate = None
+
+    def update(self, timestamp, gyro, accel=None):
+        """
+        Добавление одного отсчета.
+
+        Args:
+            timestamp: Метка времени (с).
+            gyro: Угловые скорости X, Y, Z (град/с).
+            accel: Ускорения X, Y, Z (g) или None (без коррекции).
+
+        Returns:
+            Кватернион ориентации (w, x, y, z) - строка буфера quaternions.
+        """
+        if self._last_time is not None:
+            rotation = np.radians(self._last_rate) * (timestamp - self._last_time)
+            q = quat_multiply(self._gyro_quaternion, quat_from_rotation(rotation))
+            self._gyro_quaternion = q / np.linalg.norm(q)
+        self._last_time = timestamp
+        self._last_rate = np.asarray(gyro, dtype=float)
+
+        gyro_euler = quat_to_euler(self._gyro_quaternion)
+        euler = gyro_euler.copy()
+        if accel is not None:
+            tilt = accel_tilt([accel])[0]
+            if self._tilt is None:
+                self._tilt = self.alpha * gyro_euler[:2] + (1 - self.alpha) * tilt
+            else:
+                increment = _wrap(gyro_euler[:2] - self._gyro_euler[:2])
+                self._tilt = (self.alpha * (self._tilt + increment)
+                              + (1 - self.alpha) * tilt)
+            euler[:2] = _wrap(self._tilt)
+        self._gyro_euler = gyro_euler
+
+        index = self.count % self.capacity
+        self.timestamps[index] = timestamp
+        self.euler[index] = euler
+        self.quaternions[index] = (euler_to_quat(euler) if accel is not None
+                                   else self._gyro_quaternion)
+        self.count += 1
+        return self.quaternions[index]
+
+    def history(self):
+        """Последние min(count, capacity) значений в хронологическом порядке."""
+        size = min(self.count, self.capacity)
+        order = (self.count - size + np.arange(size)) % self.capacity
+        return {
+            "timestamp": self.timestamps[order],
+            "quaternion": self.quaternions[order],
+            "euler": self.euler[order],
+        }
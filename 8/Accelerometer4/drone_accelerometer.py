@@ -6,6 +6,16 @@ MAX_PAYLOAD = 1500  # максимальная взлетная масса в г
 MAX_FLIGHT_TIME = 30 * 60  # максимальное время полета в секундах
 MAX_CONTROL_DISTANCE = 1000  # максимальная дальность управления в метрах
 POSITIONING_ACCURACY = 1  # точность позиционирования в метрах
+GRAVITY = 9.81  # ускорение свободного падения, добавляемое по оси Z при взлете
+
+def check_limits(weight, flight_time, control_distance):
+    """Проверка параметров БЛА; при превышении выбрасывает ValueError."""
+    if weight > MAX_PAYLOAD:
+        raise ValueError("Превышена максимальная взлетная масса БЛА.")
+    if flight_time > MAX_FLIGHT_TIME:
+        raise ValueError("Превышено максимальное время полета.")
+    if control_distance > MAX_CONTROL_DISTANCE:
+        raise ValueError("Превышена максимальная дальность управления.")
 
 def data_acs(accel_data, weight, flight_time, control_distance):
     """
@@ -23,12 +33,7 @@ def data_acs(accel_data, weight, flight_time, control_distance):
         - inclination: Список углов наклона по осям X, Y (град).
     """
 
-    if weight > MAX_PAYLOAD:
-        raise ValueError("Превышена максимальная взлетная масса БЛА.")
-    if flight_time > MAX_FLIGHT_TIME:
-        raise ValueError("Превышено максимальное время полета.")
-    if control_distance > MAX_CONTROL_DISTANCE:
-        raise ValueError("Превышена максимальная дальность управления.")
+    check_limits(weight, flight_time, control_distance)
 
     acceleration_x = np.mean(accel_data[0])
     acceleration_y = np.mean(accel_data[1])
@@ -42,6 +47,49 @@ def data_acs(accel_data, weight, flight_time, control_distance):
         "inclination": [inclination_x, inclination_y]
     }
 
+def inclination_series(acceleration):
+    """
+    Углы наклона по осям X, Y (град) для массива ускорений формы (N, 3).
+
+    Формулы совпадают с data_acs; тип результата совпадает с типом входа.
+    """
+    x, y, z = acceleration.T
+    inclination = np.empty((len(acceleration), 2), dtype=acceleration.dtype)
+    np.arctan2(x, np.hypot(y, z), out=inclination[:, 0])
+    np.arctan2(y, np.hypot(x, z), out=inclination[:, 1])
+    return np.degrees(inclination, out=inclination)
+
+def data_acs_series(accel_data, weight, flight_time, control_distance,
+                    is_taking_off=False, dtype=np.float64):
+    """
+    Углы наклона для каждого отсчета акселерометра (без усреднения).
+
+    Args:
+        accel_data: Массив ускорений формы (N, 3) по осям X, Y, Z (g).
+        weight: Масса БЛА в граммах.
+        flight_time: Время полета в секундах.
+        control_distance: Дальность управления в метрах.
+        is_taking_off: Признак взлета - одно значение или массив формы (N,);
+            для отсчетов взлета к оси Z добавляется GRAVITY, как в drone_takeoff.py.
+        dtype: Тип вычислений; np.float32 вдвое уменьшает расход памяти.
+
+    Returns:
+        Словарь с обработанными данными:
+        - acceleration: Массив ускорений (N, 3) с учетом взлета (g).
+        - inclination: Массив углов наклона (N, 2) по осям X, Y (град).
+    """
+    check_limits(weight, flight_time, control_distance)
+
+    acceleration = np.array(accel_data, dtype=dtype, ndmin=2)
+    if acceleration.ndim != 2 or acceleration.shape[1] != 3:
+        raise ValueError("Ожидается массив ускорений формы (N, 3).")
+    acceleration[:, 2] += np.asarray(is_taking_off, dtype=dtype) * dtype(GRAVITY)
+
+    return {
+        "acceleration": acceleration,
+        "inclination": inclination_series(acceleration)
+    }
+
 if __name__ == "__main__":
     accel_data = [[2, 2, 2], [5, 5, 5], [8, 8, 8]]
     weight = 1200  # масса БЛА в граммах
@@ -54,10 +54,15 @@ def read_gyro():
     return x_gyro, y_gyro, z_gyro
 
 def check_wifi_connection(host='8.8.8.8', port=53, timeout=3):
-    """Проверка подключения к Wi-Fi, с помощью попытки подключения к интернету."""
+    """Проверка подключения к Wi-Fi, с помощью попытки подключения к интернету.
+
+    Блокирует до timeout секунд; в циклах предполетной проверки используйте
+    link_monitor.LinkMonitor.
+    """
     try:
-        socket.create_connection((host, port), timeout)
-        return True
+        # Сокет закрывается сразу после подключения
+        with socket.create_connection((host, port), timeout):
+            return True
     except OSError:
         return False
 
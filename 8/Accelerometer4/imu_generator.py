@@ -0,0 +1,73 @@
+import numpy as np
+
+GYRO_RANGE = 100  # предел угловой скорости, как в read_gyro
+
+class ImuGenerator:
+    """
+    Синтетические данные гироскопа и акселерометра блоками.
+
+    В отличие от read_gyro, отсчеты генерируются массивами через
+    numpy.random.Generator без циклов Python, а при заданном seed
+    последовательность воспроизводима. Модель отсчета: смещение (bias)
+    плюс гауссов шум (noise), для гироскопа с ограничением GYRO_RANGE.
+    """
+
+    def __init__(self, seed=None, rate=1000.0, gyro_bias=0.0, gyro_noise=1.0,
+                 accel_bias=0.0, accel_noise=0.01, dtype=np.float64):
+        """
+        Args:
+            seed: Начальное значение генератора (None - случайное).
+            rate: Частота дискретизации (Гц).
+            gyro_bias: Смещение гироскопа - число или значения по осям X, Y, Z.
+            gyro_noise: СКО шума гироскопа.
+            accel_bias: Смещение акселерометра (g) - число или значения по осям.
+            accel_noise: СКО шума акселерометра (g).
+            dtype: np.float64 или np.float32.
+        """
+        if rate <= 0:
+            raise ValueError("Частота дискретизации должна быть положительной.")
+        self.rng = np.random.default_rng(seed)
+        self.rate = rate
+        self.gyro_bias = np.asarray(gyro_bias, dtype=dtype)
+        self.gyro_noise = gyro_noise
+        self.accel_bias = np.asarray(accel_bias, dtype=dtype)
+        self.accel_noise = accel_noise
+        self.dtype = dtype
+        self.count = 0  # число выданных отсчетов
+
+    def _noise(self, size, bias, noise):
+        data = self.rng.standard_normal((size, 3), dtype=self.dtype)
+        data *= noise
+        data += bias
+        return data
+
+    def gyro(self, size):
+        """Блок угловых скоростей формы (size, 3)."""
+        data = self._noise(size, self.gyro_bias, self.gyro_noise)
+        return np.clip(data, -GYRO_RANGE, GYRO_RANGE, out=data)
+
+    def accel(self, size):
+        """Блок ускорений формы (size, 3) (g)."""
+        return self._noise(size, self.accel_bias, self.accel_noise)
+
+    def block(self, size):
+        """
+        Блок отсчетов с метками времени.
+
+        Args:
+            size: Число отсчетов.
+
+        Returns:
+            Кортеж (timestamps, accel, gyro): метки времени (с) формы (size,)
+            и массивы формы (size, 3).
+        """
+        timestamps = (self.count + np.arange(size)) / self.rate
+        self.count += size
+        return timestamps, self.accel(size), self.gyro(size)
+
+    def blocks(self, size, count=None):
+        """Генератор блоков block(size); count=None - бесконечно."""
+        produced = 0
+        while count is None or produced < count:
+            yield self.block(size)
+            produced += 1
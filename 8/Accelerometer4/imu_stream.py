@@ -0,0 +1,116 @@
+import numpy as np
+
+from drone_accelerometer import GRAVITY, check_limits
+
+class ImuProcessor:
+    """
+    Потоковая обработка данных акселерометра и гироскопа с фиксированной памятью.
+
+    Отсчеты поступают по одному (update) или небольшими блоками (update_block)
+    и хранятся в кольцевом буфере размера window. Средние по окну считаются
+    по накопленным суммам, поэтому стоимость на отсчет не зависит от окна.
+    Ограничения БЛА проверяются один раз при создании.
+    """
+
+    def __init__(self, weight, flight_time, control_distance, window=100, is_taking_off=False):
+        """
+        Args:
+            weight: Масса БЛА в граммах.
+            flight_time: Время полета в секундах.
+            control_distance: Дальность управления в метрах.
+            window: Размер окна (отсчетов).
+            is_taking_off: Признак взлета; при взлете к среднему ускорению
+                по оси Z добавляется GRAVITY.
+        """
+        check_limits(weight, flight_time, control_distance)
+        if window < 1:
+            raise ValueError("Размер окна должен быть положительным.")
+
+        self.window = window
+        self.is_taking_off = is_taking_off
+        self.count = 0
+        # Столбцы 0-2 - ускорение X, Y, Z (g), 3-5 - угловая скорость X, Y, Z
+        self._samples = np.zeros((window, 6))
+        self._sum = np.zeros(6)
+        self._index = 0
+
+    def _resync(self):
+        # Раз в окно суммы пересчитываются заново, чтобы не копилась ошибка округления
+        self._sum = self._samples.sum(axis=0)
+
+    def update(self, accel, gyro):
+        """
+        Добавление одного отсчета.
+
+        Args:
+            accel: Ускорение по осям X, Y, Z (g).
+            gyro: Угловая скорость по осям X, Y, Z.
+
+        Returns:
+            Словарь с данными по окну (см. result).
+        """
+        sample = np.concatenate((accel, gyro)).astype(float)
+        index = self._index
+        self._sum += sample - self._samples[index]
+        self._samples[index] = sample
+        self._index = (index + 1) % self.window
+        self.count += 1
+        if self._index == 0:
+            self._resync()
+        return self.result()
+
+    def update_block(self, accel, gyro):
+        """
+        Добавление блока отсчетов без цикла по отсчетам.
+
+        Args:
+            accel: Массив ускорений формы (N, 3) (g).
+            gyro: Массив угловых скоростей формы (N, 3).
+
+        Returns:
+            Словарь с данными по окну после последнего отсчета блока.
+        """
+        block = np.hstack((np.asarray(accel, dtype=float), np.asarray(gyro, dtype=float)))
+        if block.ndim != 2 or block.shape[1] != 6:
+            raise ValueError("Ожидаются массивы формы (N, 3).")
+        size = len(block)
+        self.count += size
+        if size >= self.window:
+            # Окно целиком заполняется хвостом блока
+            self._samples[:] = block[-self.window:]
+            self._index = 0
+            self._resync()
+            return self.result()
+
+        indices = (self._index + np.arange(size)) % self.window
+        self._sum += block.sum(axis=0) - self._samples[indices].sum(axis=0)
+        self._samples[indices] = block
+        wrapped = self._index + size >= self.window
+        self._index = (self._index + size) % self.window
+        if wrapped:
+            self._resync()
+        return self.result()
+
+    def result(self):
+        """
+        Returns:
+            Словарь с обработанными данными по окну:
+            - acceleration: Средние ускорения по осям X, Y, Z (g).
+            - inclination: Углы наклона по осям X, Y (град), как в data_acs.
+            - gyro: Средние угловые скорости по осям X, Y, Z.
+        """
+        if self.count == 0:
+            raise ValueError("Нет данных.")
+        mean = self._sum / min(self.count, self.window)
+        acceleration_x, acceleration_y, acceleration_z = mean[:3]
+        if self.is_taking_off:
+            acceleration_z += GRAVITY
+
+        inclination_x = np.degrees(np.arctan2(acceleration_x, np.hypot(acceleration_y, acceleration_z)))
+        inclination_y = np.degrees(np.arctan2(acceleration_y, np.hypot(acceleration_x, acceleration_z)))
+
+        return {
+            "acceleration": [acceleration_x, acceleration_y, acceleration_z],
+            "inclination": [inclination_x, inclination_y],
+            "gyro": mean[3:].tolist()
+        }
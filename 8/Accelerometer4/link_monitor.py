@@ -0,0 +1,135 @@
+import socket
+import threading
+import time
+from collections import deque
+
+class LinkMonitor:
+    """
+    Фоновый контроль канала связи с кэшированием состояния.
+
+    В отличие от check_wifi_connection, проверка (TCP-подключение к заданному
+    узлу) выполняется в отдельном потоке по расписанию, а вызывающий код
+    читает последний результат без ожидания сети. Результат считается
+    действительным в течение ttl секунд; устаревший результат означает
+    отсутствие связи.
+    """
+
+    def __init__(self, host, port, interval=1.0, timeout=0.5, ttl=None, history=32):
+        """
+        Args:
+            host: Адрес проверяемого узла (например, наземной станции).
+            port: TCP-порт узла.
+            interval: Период проверки (с).
+            timeout: Таймаут одного подключения (с).
+            ttl: Время действительности результата (с); по умолчанию
+                три периода проверки.
+            history: Число последних значений RTT для статистики.
+        """
+        if interval <= 0 or timeout <= 0:
+            raise ValueError("Период и таймаут проверки должны быть положительными.")
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.timeout = timeout
+        self.ttl = ttl if ttl is not None else 3 * interval
+        self.rtts = deque(maxlen=history)  # RTT успешных проверок (с)
+        self.probes = 0
+        self.failures = 0
+        self._up = False
+        self._checked_at = None  # time.monotonic() последней проверки
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def probe(self):
+        """
+        Однократная проверка канала (блокирует не дольше timeout).
+
+        Returns:
+            True, если подключение установлено.
+        """
+        start = time.perf_counter()
+        try:
+            with socket.create_connection((self.host, self.port), self.timeout):
+                rtt = time.perf_counter() - start
+            up = True
+        except OSError:
+            up = False
+
+        with self._lock:
+            self.probes += 1
+            if up:
+                self.rtts.append(rtt)
+            else:
+                self.failures += 1
+            self._up = up
+            self._checked_at = time.monotonic()
+        return up
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Запуск фоновых проверок (первая - сразу)."""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="link-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Остановка фоновых проверок."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def is_up(self):
+        """Есть ли связь по последней действительной проверке (без обращения к сети)."""
+        checked_at = self._checked_at
+        if checked_at is None or time.monotonic() - checked_at > self.ttl:
+            return False
+        return self._up
+
+    def wait_first(self, timeout=None):
+        """Ожидание результата первой проверки; возвращает is_up()."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._checked_at is None:
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            time.sleep(0.001)
+        return self.is_up()
+
+    def stats(self):
+        """
+        Returns:
+            Словарь статистики канала:
+            - up: Результат is_up().
+            - age: Возраст последней проверки (с) или None.
+            - probes, failures: Число проверок и неудачных проверок.
+            - rtt_last, rtt_min, rtt_mean, rtt_max: RTT (с) по последним
+              успешным проверкам или None, если их не было.
+        """
+        with self._lock:
+            rtts = list(self.rtts)
+            checked_at = self._checked_at
+            probes, failures = self.probes, self.failures
+        return {
+            "up": self.is_up(),
+            "age": None if checked_at is None else time.monotonic() - checked_at,
+            "probes": probes,
+            "failures": failures,
+            "rtt_last": rtts[-1] if rtts else None,
+            "rtt_min": min(rtts) if rtts else None,
+            "rtt_mean": sum(rtts) / len(rtts) if rtts else None,
+            "rtt_max": max(rtts) if rtts else None,
+        }
@@ -0,0 +1,46 @@
+import numpy as np
+
+from drone_accelerometer import MAX_CONTROL_DISTANCE, MAX_FLIGHT_TIME, MAX_PAYLOAD
+
+# Коды причин отказа (в порядке проверок check_limits)
+OK = 0
+PAYLOAD_EXCEEDED = 1
+FLIGHT_TIME_EXCEEDED = 2
+CONTROL_DISTANCE_EXCEEDED = 3
+
+# Сообщения, совпадающие с текстом ValueError из check_limits
+REASONS = {
+    OK: "БЛА готов к взлету.",
+    PAYLOAD_EXCEEDED: "Превышена максимальная взлетная масса БЛА.",
+    FLIGHT_TIME_EXCEEDED: "Превышено максимальное время полета.",
+    CONTROL_DISTANCE_EXCEEDED: "Превышена максимальная дальность управления.",
+}
+
+def preflight_batch(weight, flight_time, control_distance):
+    """
+    Предполетная проверка множества конфигураций без исключений.
+
+    Args:
+        weight: Массив масс БЛА в граммах.
+        flight_time: Массив планируемого времени полета в секундах.
+        control_distance: Массив дальности управления в метрах.
+
+    Returns:
+        Кортеж (passed, reasons):
+        - passed: Булев массив - конфигурация допустима.
+        - reasons: Массив кодов причин (uint8); для нескольких нарушений
+          указывается первое в порядке проверок data_acs, как у ValueError.
+    """
+    weight, flight_time, control_distance = np.broadcast_arrays(
+        np.asarray(weight), np.asarray(flight_time), np.asarray(control_distance))
+
+    reasons = np.zeros(weight.shape, dtype=np.uint8)
+    # Проверки применяются в обратном порядке, чтобы первая перекрывала остальные
+    reasons[control_distance > MAX_CONTROL_DISTANCE] = CONTROL_DISTANCE_EXCEEDED
+    reasons[flight_time > MAX_FLIGHT_TIME] = FLIGHT_TIME_EXCEEDED
+    reasons[weight > MAX_PAYLOAD] = PAYLOAD_EXCEEDED
+    return reasons == OK, reasons
+
+def reason_messages(reasons):
+    """Текст причины для каждого кода (для отчетов)."""
+    return [REASONS[int(code)] for code in np.ravel(reasons)]
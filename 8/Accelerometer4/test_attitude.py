@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+
+from attitude import (AttitudeEstimator, attitude_series, euler_to_quat, integrate_gyro,
+                      quat_multiply, quat_to_euler)
+from imu_generator import ImuGenerator
+
+def integrate_loop(timestamps, gyro):
+    """Эталон: последовательное интегрирование по отсчетам."""
+    q = np.array([1.0, 0.0, 0.0, 0.0])
+    result = [q]
+    for k in range(1, len(timestamps)):
+        rotation = np.radians(gyro[k - 1]) * (timestamps[k] - timestamps[k - 1])
+        angle = np.linalg.norm(rotation)
+        axis = rotation / angle if angle else rotation
+        dq = np.concatenate(([np.cos(angle / 2)], axis * np.sin(angle / 2)))
+        q = quat_multiply(q, dq)
+        result.append(q)
+    return np.array(result)
+
+class TestAttitude(unittest.TestCase):
+
+    def test_constant_yaw_rate(self):
+        timestamps = np.arange(101) * 0.01
+        gyro = np.tile([0.0, 0.0, 90.0], (101, 1))
+
+        euler = attitude_series(timestamps, gyro)["euler"]
+
+        self.assertAlmostEqual(euler[-1][2], 90.0)
+        self.assertAlmostEqual(euler[-1][0], 0.0)
+
+    def test_scan_matches_loop(self):
+        timestamps, _, gyro = ImuGenerator(seed=7, rate=100.0, gyro_noise=30.0).block(300)
+
+        quaternions = integrate_gyro(timestamps, gyro)
+
+        np.testing.assert_allclose(quaternions, integrate_loop(timestamps, gyro), atol=1e-9)
+
+    def test_euler_roundtrip(self):
+        euler = np.array([[10.0, -20.0, 30.0], [-170.0, 45.0, 179.0]])
+
+        np.testing.assert_allclose(quat_to_euler(euler_to_quat(euler)), euler, atol=1e-9)
+
+    def test_tilt_correction_removes_gyro_bias(self):
+        generator = ImuGenerator(seed=8, rate=100.0, gyro_bias=[2.0, 0.0, 0.0], gyro_noise=0.1,
+                                 accel_bias=[0.0, 0.0, 1.0], accel_noise=0.01)
+        timestamps, accel, gyro = generator.block(3000)
+
+        drifting = attitude_series(timestamps, gyro)["euler"]
+        corrected = attitude_series(timestamps, gyro, accel, alpha=0.98)["euler"]
+
+        self.assertGreater(abs(drifting[-1][0]), 50.0)
+        self.assertLess(abs(corrected[-1][0]), 2.0)
+
+    def test_streaming_matches_batch(self):
+        generator = ImuGenerator(seed=9, rate=200.0, gyro_noise=20.0,
+                                 accel_bias=[0.1, -0.1, 1.0], accel_noise=0.05)
+        timestamps, accel, gyro = generator.block(200)
+        estimator = AttitudeEstimator(capacity=64)
+
+        for t, a, g in zip(timestamps, accel, gyro):
+            estimator.update(t, g, a)
+
+        expected = attitude_series(timestamps, gyro, accel)
+        history = estimator.history()
+        np.testing.assert_allclose(history["timestamp"], timestamps[-64:])
+        np.testing.assert_allclose(history["euler"], expected["euler"][-64:], atol=1e-6)
+        np.testing.assert_allclose(history["quaternion"], expected["quaternion"][-64:], atol=1e-8)
+
+    def test_invalid_shapes(self):
+        with self.assertRaises(ValueError):
+            integrate_gyro([0.0, 1.0], [[0.0, 0.0, 0.0]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import numpy as np
 import unittest
-from drone_accelerometer import data_acs
+from drone_accelerometer import data_acs, data_acs_series
 
 class TestIntegrationDataAcs(unittest.TestCase):
 
@@ -56,5 +56,41 @@ class TestIntegrationDataAcs(unittest.TestCase):
 
         self.assertEqual(str(context.exception), "Превышена максимальная дальность управления.")
 
+class TestDataAcsSeries(unittest.TestCase):
+
+    def test_series_matches_data_acs(self):
+        accel_data = np.array([[2.0, 5.0, 8.0], [0.0, 0.0, 1.0], [-1.0, 0.5, 0.8]])
+
+        result = data_acs_series(accel_data, 1200, 1600, 800)
+
+        self.assertEqual(result["inclination"].shape, (3, 2))
+        for i, sample in enumerate(accel_data):
+            expected = data_acs([[sample[0]], [sample[1]], [sample[2]]], 1200, 1600, 800)
+            self.assertAlmostEqual(result["inclination"][i][0], expected["inclination"][0])
+            self.assertAlmostEqual(result["inclination"][i][1], expected["inclination"][1])
+
+    def test_taking_off_per_sample(self):
+        accel_data = np.zeros((2, 3))
+
+        result = data_acs_series(accel_data, 1200, 1600, 800, is_taking_off=[True, False])
+
+        self.assertAlmostEqual(result["acceleration"][0][2], 9.81)
+        self.assertAlmostEqual(result["acceleration"][1][2], 0.0)
+        self.assertAlmostEqual(result["inclination"][0][0], 0.0)
+
+    def test_float32(self):
+        accel_data = np.array([[2.0, 5.0, 8.0]] * 4)
+
+        result = data_acs_series(accel_data, 1200, 1600, 800, dtype=np.float32)
+
+        self.assertEqual(result["inclination"].dtype, np.float32)
+        self.assertAlmostEqual(float(result["inclination"][0][0]), 11.96946312460731, places=4)
+
+    def test_limits(self):
+        with self.assertRaises(ValueError) as context:
+            data_acs_series(np.zeros((1, 3)), 1600, 10, 500)
+
+        self.assertEqual(str(context.exception), "Превышена максимальная взлетная масса БЛА.")
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+
+from imu_generator import GYRO_RANGE, ImuGenerator
+
+class TestImuGenerator(unittest.TestCase):
+
+    def test_reproducible(self):
+        first = ImuGenerator(seed=42).block(100)
+        second = ImuGenerator(seed=42).block(100)
+
+        for a, b in zip(first, second):
+            np.testing.assert_array_equal(a, b)
+
+    def test_shapes_and_timestamps(self):
+        generator = ImuGenerator(seed=1, rate=200.0)
+
+        generator.block(4)
+        timestamps, accel, gyro = generator.block(4)
+
+        self.assertEqual(accel.shape, (4, 3))
+        self.assertEqual(gyro.shape, (4, 3))
+        np.testing.assert_allclose(timestamps, [0.02, 0.025, 0.03, 0.035])
+
+    def test_bias_and_noise(self):
+        generator = ImuGenerator(seed=3, gyro_bias=[1.0, -2.0, 0.5], gyro_noise=0.1,
+                                 accel_bias=[0.0, 0.0, 1.0], accel_noise=0.01)
+
+        _, accel, gyro = generator.block(20000)
+
+        np.testing.assert_allclose(gyro.mean(axis=0), [1.0, -2.0, 0.5], atol=0.01)
+        np.testing.assert_allclose(gyro.std(axis=0), 0.1, rtol=0.05)
+        np.testing.assert_allclose(accel.mean(axis=0), [0.0, 0.0, 1.0], atol=0.001)
+
+    def test_gyro_range(self):
+        gyro = ImuGenerator(seed=4, gyro_noise=1000.0).gyro(1000)
+
+        self.assertTrue(np.all(np.abs(gyro) <= GYRO_RANGE))
+
+    def test_float32_blocks(self):
+        blocks = list(ImuGenerator(seed=5, dtype=np.float32).blocks(16, count=3))
+
+        self.assertEqual(len(blocks), 3)
+        self.assertEqual(blocks[-1][2].dtype, np.float32)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            ImuGenerator(rate=0)
+
+if __name__ == "__main__":
+    unittest.main()
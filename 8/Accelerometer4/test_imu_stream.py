@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+
+from drone_accelerometer import data_acs
+from imu_stream import ImuProcessor
+
+class TestImuProcessor(unittest.TestCase):
+
+    def test_window_matches_data_acs(self):
+        rng = np.random.default_rng(1)
+        accel = rng.normal(size=(50, 3))
+        gyro = rng.normal(size=(50, 3))
+        processor = ImuProcessor(1200, 1600, 800, window=8)
+
+        for a, g in zip(accel, gyro):
+            result = processor.update(a, g)
+
+        expected = data_acs(accel[-8:].T, 1200, 1600, 800)
+        np.testing.assert_allclose(result["acceleration"], expected["acceleration"])
+        np.testing.assert_allclose(result["inclination"], expected["inclination"])
+        np.testing.assert_allclose(result["gyro"], gyro[-8:].mean(axis=0))
+
+    def test_partial_window(self):
+        processor = ImuProcessor(1200, 1600, 800, window=10)
+
+        processor.update([2.0, 5.0, 8.0], [1.0, 0.0, 0.0])
+        result = processor.update([2.0, 5.0, 8.0], [3.0, 0.0, 0.0])
+
+        self.assertAlmostEqual(result["inclination"][0], 11.96946312460731)
+        self.assertAlmostEqual(result["gyro"][0], 2.0)
+
+    def test_block_matches_single(self):
+        rng = np.random.default_rng(2)
+        accel = rng.normal(size=(37, 3))
+        gyro = rng.normal(size=(37, 3))
+        single = ImuProcessor(1200, 1600, 800, window=6)
+        block = ImuProcessor(1200, 1600, 800, window=6)
+
+        for a, g in zip(accel, gyro):
+            expected = single.update(a, g)
+        for start in range(0, 37, 4):
+            result = block.update_block(accel[start:start + 4], gyro[start:start + 4])
+
+        np.testing.assert_allclose(result["acceleration"], expected["acceleration"])
+        np.testing.assert_allclose(result["gyro"], expected["gyro"])
+
+        result = block.update_block(accel[-20:], gyro[-20:])
+        np.testing.assert_allclose(result["gyro"], gyro[-6:].mean(axis=0))
+
+    def test_taking_off(self):
+        processor = ImuProcessor(1200, 1600, 800, window=4, is_taking_off=True)
+
+        result = processor.update([0.0, 0.0, 0.0], [0.0, 0.0, 0.0])
+
+        self.assertAlmostEqual(result["acceleration"][2], 9.81)
+
+    def test_limits_checked_once(self):
+        with self.assertRaises(ValueError) as context:
+            ImuProcessor(1600, 10, 500)
+
+        self.assertEqual(str(context.exception), "Превышена максимальная взлетная масса БЛА.")
+
+    def test_no_data(self):
+        with self.assertRaises(ValueError):
+            ImuProcessor(1200, 1600, 800).result()
+
+if __name__ == "__main__":
+    unittest.main()
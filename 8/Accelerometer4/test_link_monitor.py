@@ -0,0 +1,70 @@
+import socket
+import time
+import unittest
+
+from link_monitor import LinkMonitor
+
+def free_port():
+    """Порт, на котором заведомо никто не слушает."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class TestLinkMonitor(unittest.TestCase):
+
+    def setUp(self):
+        # Локальная замена наземной станции: подключения принимаются ядром
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(16)
+        self.port = self.server.getsockname()[1]
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_probe_up(self):
+        monitor = LinkMonitor("127.0.0.1", self.port)
+
+        self.assertTrue(monitor.probe())
+        stats = monitor.stats()
+
+        self.assertTrue(stats["up"])
+        self.assertEqual(stats["probes"], 1)
+        self.assertEqual(stats["failures"], 0)
+        self.assertGreater(stats["rtt_last"], 0)
+
+    def test_probe_down(self):
+        monitor = LinkMonitor("127.0.0.1", free_port())
+
+        self.assertFalse(monitor.probe())
+        stats = monitor.stats()
+
+        self.assertFalse(stats["up"])
+        self.assertEqual(stats["failures"], 1)
+        self.assertIsNone(stats["rtt_mean"])
+
+    def test_status_expires(self):
+        monitor = LinkMonitor("127.0.0.1", self.port, ttl=0.05)
+
+        self.assertFalse(monitor.is_up())  # проверок еще не было
+        monitor.probe()
+        self.assertTrue(monitor.is_up())
+        time.sleep(0.1)
+        self.assertFalse(monitor.is_up())
+
+    def test_background_thread(self):
+        with LinkMonitor("127.0.0.1", self.port, interval=0.01) as monitor:
+            self.assertTrue(monitor.wait_first(timeout=2))
+            time.sleep(0.05)
+
+        stats = monitor.stats()
+        self.assertGreater(stats["probes"], 1)
+        self.assertLessEqual(stats["rtt_min"], stats["rtt_mean"])
+        self.assertLessEqual(stats["rtt_mean"], stats["rtt_max"])
+
+    def test_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            LinkMonitor("127.0.0.1", self.port, interval=0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+
+from drone_accelerometer import check_limits
+from preflight import (CONTROL_DISTANCE_EXCEEDED, FLIGHT_TIME_EXCEEDED, OK,
+                       PAYLOAD_EXCEEDED, REASONS, preflight_batch, reason_messages)
+
+class TestPreflightBatch(unittest.TestCase):
+
+    def test_reason_codes(self):
+        weight = np.array([1200, 1600, 1200, 1200, 1600])
+        flight_time = np.array([1600, 1600, 2000, 1600, 2000])
+        control_distance = np.array([800, 800, 800, 1200, 1200])
+
+        passed, reasons = preflight_batch(weight, flight_time, control_distance)
+
+        np.testing.assert_array_equal(passed, [True, False, False, False, False])
+        np.testing.assert_array_equal(reasons, [OK, PAYLOAD_EXCEEDED, FLIGHT_TIME_EXCEEDED,
+                                                CONTROL_DISTANCE_EXCEEDED, PAYLOAD_EXCEEDED])
+
+    def test_matches_check_limits(self):
+        rng = np.random.default_rng(0)
+        weight = rng.integers(1000, 2000, 200)
+        flight_time = rng.integers(1000, 2500, 200)
+        control_distance = rng.integers(500, 1500, 200)
+
+        _, reasons = preflight_batch(weight, flight_time, control_distance)
+
+        for row, message in enumerate(reason_messages(reasons)):
+            try:
+                check_limits(weight[row], flight_time[row], control_distance[row])
+                self.assertEqual(message, REASONS[OK])
+            except ValueError as e:
+                self.assertEqual(message, str(e))
+
+    def test_broadcast_scalars(self):
+        passed, reasons = preflight_batch([1200, 1500, 1501], 1600, 800)
+
+        np.testing.assert_array_equal(passed, [True, True, False])
+        self.assertEqual(reasons.dtype, np.uint8)
+
+if __name__ == "__main__":
+    unittest.main()